@@ -1,45 +1,94 @@
-from pytest_harvest.common import get_fixture_value, HARVEST_PREFIX
-from pytest_harvest.fixture_cache import saved_fixture
-from pytest_harvest.results_bags import create_results_bag_fixture, ResultsBag
-from pytest_harvest.results_session import get_session_synthesis_dct, PYTEST_OBJ_NAME, filter_session_items,\
-    get_all_pytest_param_names, get_all_pytest_fixture_names, get_pytest_status, get_pytest_params, \
-    get_pytest_param_names, is_pytest_incomplete, pytest_item_matches_filter
-from pytest_harvest.plugin import FIXTURE_STORE, get_fixture_store, get_session_results_dct, get_module_results_dct, \
-    get_session_results_df, get_module_results_df, get_filtered_results_df
-from pytest_harvest.xdist_api import is_main_process, get_xdist_worker_id
-
-
-try:
-    # -- Distribution mode --
-    # import from _version.py generated by setuptools_scm during release
-    from ._version import version as __version__
-except ImportError:
-    # -- Source mode --
-    # use setuptools_scm to get the current version from src using git
-    from setuptools_scm import get_version as _gv
-    from pathlib import Path as _Path
-    __version__ = _gv(_Path(__file__).parent.parent.parent)
+from importlib import import_module
+
+# The public symbols, by submodule. They are imported on first access only (PEP 562 module `__getattr__`), so that
+# importing this package stays cheap: pytest imports it in every process (and every xdist worker) through our plugin
+# entry point, and the plugin only imports the submodules that it needs.
+_LAZY_SYMBOLS = {
+    'common': ('get_fixture_value', 'HARVEST_PREFIX', 'new_run_id'),
+    'fixture_cache': ('saved_fixture', 'evict_saved_fixtures'),
+    'mmap_store': ('MmapFixtureStore',),
+    'results_bags': ('create_results_bag_fixture', 'ResultsBag', 'TypedResultsBag', 'get_results_bag_schema'),
+    'results_session': ('get_session_synthesis_dct', 'iter_session_synthesis', 'get_session_synthesis_columns',
+                        'PYTEST_OBJ_NAME', 'TEST_ID_COLUMN', 'filter_session_items', 'get_all_pytest_param_names',
+                        'get_all_pytest_fixture_names', 'get_pytest_status', 'get_pytest_params',
+                        'get_pytest_param_names', 'is_pytest_incomplete', 'pytest_item_matches_filter',
+                        'SynthesisCache', 'get_synthesis_cache', 'ModuleResultsCache', 'get_module_results_cache',
+                        'SessionItemsIndex', 'get_session_items_index', 'get_test_id_formatter', 'format_test_ids',
+                        'synthesis_rows_to_columns'),
+    'results_arrow': ('columns_to_arrow_table', 'write_synthesis_parquet'),
+    'results_jsonl': ('JsonlResultsSink', 'read_jsonl_results'),
+    'results_sqlite': ('SqliteResultsStore',),
+    'results_history': ('ResultsHistory', 'ResultsBaseline'),
+    'plugin': ('FIXTURE_STORE', 'get_fixture_store', 'get_session_results_dct', 'get_module_results_dct',
+               'get_session_results_df', 'get_module_results_df', 'get_filtered_results_df',
+               'get_session_results_arrow', 'write_session_results_parquet', 'columns_to_frame',
+               'get_params_indexed_results_df'),
+    'xdist_api': ('is_main_process', 'get_xdist_worker_id'),
+}
+_SYMBOLS_MODULES = {name: module_name for module_name, names in _LAZY_SYMBOLS.items() for name in names}
+
+
+def _get_version():
+    try:
+        # -- Distribution mode --
+        # import from _version.py generated by setuptools_scm during release
+        from ._version import version
+    except ImportError:
+        # -- Source mode --
+        # use setuptools_scm to get the current version from src using git
+        from setuptools_scm import get_version as _gv
+        from pathlib import Path as _Path
+        version = _gv(_Path(__file__).parent.parent.parent)
+    return version
+
+
+def __getattr__(name):
+    """Imports the public symbols and submodules (and computes `__version__`) on first access."""
+    if name == '__version__':
+        value = _get_version()
+    elif name in _SYMBOLS_MODULES:
+        value = getattr(import_module('%s.%s' % (__name__, _SYMBOLS_MODULES[name])), name)
+    elif name in _LAZY_SYMBOLS:
+        value = import_module('%s.%s' % (__name__, name))
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    # next accesses will not go through this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
     '__version__',
 
     # submodules
-    'fixture_cache', 'results_bags', 'results_session',
+    'fixture_cache', 'mmap_store', 'results_bags', 'results_session', 'results_arrow', 'results_jsonl',
+    'results_sqlite', 'results_history',
 
-    # symbols imported above
+    # symbols imported lazily above
     'get_fixture_value', 'HARVEST_PREFIX',
-    'saved_fixture',
-    'create_results_bag_fixture', 'ResultsBag',
+    'saved_fixture', 'evict_saved_fixtures', 'MmapFixtureStore',
+    'create_results_bag_fixture', 'ResultsBag', 'TypedResultsBag', 'get_results_bag_schema',
     # session related
-    'get_session_synthesis_dct', 'PYTEST_OBJ_NAME', 'get_all_pytest_param_names', 'get_all_pytest_fixture_names',
-    'filter_session_items',
+    'get_session_synthesis_dct', 'iter_session_synthesis', 'get_session_synthesis_columns', 'PYTEST_OBJ_NAME',
+    'TEST_ID_COLUMN', 'get_all_pytest_param_names', 'get_all_pytest_fixture_names',
+    'filter_session_items', 'get_test_id_formatter', 'format_test_ids',
+    'SynthesisCache', 'get_synthesis_cache', 'ModuleResultsCache', 'get_module_results_cache', 'SessionItemsIndex',
+    'get_session_items_index',
+    'synthesis_rows_to_columns', 'columns_to_arrow_table', 'write_synthesis_parquet', 'JsonlResultsSink',
+    'read_jsonl_results', 'SqliteResultsStore', 'new_run_id', 'ResultsHistory', 'ResultsBaseline',
     # item related
     'get_pytest_status', 'get_pytest_params', 'get_pytest_param_names', 'is_pytest_incomplete',
     'pytest_item_matches_filter',
 
     # fixture equivalent methods
     'FIXTURE_STORE', 'get_session_results_dct', 'get_module_results_dct', 'get_session_results_df',
-    'get_module_results_df', 'get_filtered_results_df', 'get_fixture_store',
+    'get_module_results_df', 'get_filtered_results_df', 'get_fixture_store', 'get_session_results_arrow',
+    'write_session_results_parquet', 'columns_to_frame', 'get_params_indexed_results_df',
 
     # xdist api
     'is_main_process', 'get_xdist_worker_id'
@@ -1,3 +1,6 @@
+from time import strftime
+from uuid import uuid4
+
 import pytest
 
 
@@ -29,6 +32,12 @@ else:
     yield_fixture = pytest.fixture
 
 
+def new_run_id():
+    # type: (...) -> str
+    """Returns a new unique run id, starting with the current date and time so that run ids sort chronologically"""
+    return "%s-%s" % (strftime("%Y%m%d-%H%M%S"), uuid4().hex[:8])
+
+
 def get_scope(request):
     """
     Utility method to return the scope of a pytest request
@@ -41,3 +50,19 @@ def get_scope(request):
         return 'function'
     else:
         return 'module'
+
+
+def get_qualified_name(obj):
+    """
+    Returns the qualified name "<module>.<qualname>" of `obj` (typically a test function), or its string representation
+    if it does not have one. This is used to store the `pytest_obj` of the synthesis in text-based formats.
+
+    :param obj:
+    :return:
+    """
+    if obj is None:
+        return None
+    try:
+        return "%s.%s" % (obj.__module__, obj.__qualname__)
+    except AttributeError:
+        return str(obj)
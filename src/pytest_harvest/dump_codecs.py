@@ -0,0 +1,198 @@
+import pickle
+import struct
+from io import BytesIO
+
+try:  # python 3.5+
+    from typing import Any, BinaryIO, Iterator, Optional, Tuple
+except ImportError:
+    pass
+
+
+DUMP_MAGIC = b'HARVEST\x00'
+"""The first bytes of the dumps written by `write_dump`, followed by the format version and the codec name"""
+
+DUMP_FORMAT_VERSION = 1
+
+_SEGMENT_LENGTH = struct.Struct('>Q')
+
+
+def _open_gzip(fileobj, mode, level):
+    import gzip  # pylint: disable=import-outside-toplevel
+    # note: mtime=0 so that the dumps of identical contents are identical
+    return gzip.GzipFile(fileobj=fileobj, mode=mode, compresslevel=6 if level is None else level, mtime=0)
+
+
+def _open_lzma(fileobj, mode, level):
+    import lzma  # pylint: disable=import-outside-toplevel
+    return lzma.LZMAFile(fileobj, mode=mode, preset=level if mode == 'wb' else None)
+
+
+def _open_lz4(fileobj, mode, level):
+    try:
+        import lz4.frame  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise Exception("There was an error importing `lz4` module. The 'lz4' dump codec can not be used in this "
+                        "session.") from e
+    return lz4.frame.LZ4FrameFile(fileobj, mode=mode, compression_level=0 if level is None else level)
+
+
+def _open_zstd(fileobj, mode, level):
+    try:
+        # python 3.14+
+        from compression import zstd  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise Exception("There was an error importing `zstandard` module. The 'zstd' dump codec can not be used "
+                            "in this session.") from e
+        if mode == 'wb':
+            return zstandard.ZstdCompressor(level=3 if level is None else level).stream_writer(fileobj, closefd=False)
+        else:
+            return zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    else:
+        return zstd.ZstdFile(fileobj, mode=mode[0], level=level if mode == 'wb' else None)
+
+
+DUMP_CODECS = {
+    'none': None,
+    'gzip': _open_gzip,
+    'lzma': _open_lzma,
+    'lz4': _open_lz4,
+    'zstd': _open_zstd,
+}
+"""The available dump codecs, {name: function(fileobj, mode, level) returning a file object}. 'lz4' requires the
+`lz4` package, and 'zstd' requires python 3.14+ or the `zstandard` package."""
+
+DUMP_CODEC_ALIASES = {
+    'zlib': 'gzip',
+}
+"""Alternate names of the dump codecs, {alias: codec name}. 'zlib' is kept for the configurations and dumps that used
+this former name of the 'gzip' codec."""
+
+
+def parse_codec(codec  # type: str
+                ):
+    # type: (...) -> Tuple[str, Optional[int]]
+    """
+    Parses a codec specification, that is, a codec name in `DUMP_CODECS` (or an alias in `DUMP_CODEC_ALIASES`)
+    optionally followed by a colon and a compression level, for example 'gzip' or 'lzma:3'.
+
+    :param codec: the codec specification
+    :return: a tuple (codec name, level or None)
+    """
+    name, _, level = codec.strip().partition(':')
+    name = DUMP_CODEC_ALIASES.get(name, name)
+    if name not in DUMP_CODECS:
+        raise ValueError("Invalid dump codec %r. It should be one of %s, optionally followed by ':<level>'."
+                         % (codec, sorted(DUMP_CODECS)))
+    try:
+        return name, (int(level) if level else None)
+    except ValueError as e:
+        raise ValueError("Invalid compression level in dump codec %r" % codec) from e
+
+
+def check_codec(codec  # type: str
+                ):
+    """
+    Raises an error if `codec` is not a valid codec specification (see `parse_codec`), or if the optional package it
+    requires is not installed.
+    """
+    name, level = parse_codec(codec)
+    if DUMP_CODECS[name] is not None:
+        with DUMP_CODECS[name](BytesIO(), 'wb', level):
+            pass
+
+
+def write_dump(fileobj,      # type: BinaryIO
+               obj,          # type: Any
+               codec='none'  # type: str
+               ):
+    """
+    Pickles `obj` into binary file `fileobj`, compressed with `codec`. The pickle is streamed into the compressor so
+    that the uncompressed pickle is never held in memory. A small header is written first, so that `read_dump` can
+    detect the codec automatically.
+
+    :param fileobj: a binary file object open for writing
+    :param obj: the object to dump
+    :param codec: a codec specification, see `parse_codec`. Default: 'none' (no compression)
+    """
+    name, level = parse_codec(codec)
+    name_bytes = name.encode('ascii')
+    fileobj.write(DUMP_MAGIC + bytes((DUMP_FORMAT_VERSION, len(name_bytes))) + name_bytes)
+    if DUMP_CODECS[name] is None:
+        pickle.dump(obj, fileobj, protocol=pickle.HIGHEST_PROTOCOL)
+    else:
+        with DUMP_CODECS[name](fileobj, 'wb', level) as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_dump(fileobj  # type: BinaryIO
+              ):
+    # type: (...) -> Any
+    """
+    Loads an object dumped with `write_dump` from binary file `fileobj`, whatever its codec. Plain pickle files (such
+    as the xdist worker dumps of previous versions) are also supported.
+
+    :param fileobj: a binary file object open for reading, positioned at the beginning of the dump
+    :return: the loaded object
+    """
+    start = fileobj.tell()
+    if fileobj.read(len(DUMP_MAGIC)) != DUMP_MAGIC:
+        # a plain pickle
+        fileobj.seek(start)
+        return pickle.load(fileobj)
+
+    version, name_length = fileobj.read(2)
+    if version > DUMP_FORMAT_VERSION:
+        raise ValueError("Unsupported dump format version %s, please upgrade pytest-harvest" % version)
+    name = fileobj.read(name_length).decode('ascii')
+    try:
+        opener = DUMP_CODECS[DUMP_CODEC_ALIASES.get(name, name)]
+    except KeyError as e:
+        raise ValueError("Unknown dump codec %r" % name) from e
+    if opener is None:
+        return pickle.load(fileobj)
+    else:
+        with opener(fileobj, 'rb', None) as f:
+            return pickle.load(f)
+
+
+def append_segment(fileobj,      # type: BinaryIO
+                   obj,          # type: Any
+                   codec='none'  # type: str
+                   ):
+    """
+    Appends `obj` at the end of an append-only file of segments, as a dump (see `write_dump`) prefixed with its length.
+    The file is flushed so that the segment survives a crash of the current process.
+
+    :param fileobj: a binary file object open for appending
+    :param obj: the object to dump
+    :param codec: a codec specification, see `parse_codec`. Default: 'none' (no compression)
+    """
+    buffer = BytesIO()
+    write_dump(buffer, obj, codec)
+    fileobj.write(_SEGMENT_LENGTH.pack(buffer.tell()))
+    fileobj.write(buffer.getbuffer())
+    fileobj.flush()
+
+
+def iter_segments(fileobj  # type: BinaryIO
+                  ):
+    # type: (...) -> Iterator[Any]
+    """
+    Loads the objects appended with `append_segment` to binary file `fileobj`, in order. A last segment that was not
+    completely written (because the writing process was killed) is ignored.
+
+    :param fileobj: a binary file object open for reading
+    :return: an iterator on the loaded objects
+    """
+    while True:
+        header = fileobj.read(_SEGMENT_LENGTH.size)
+        if len(header) < _SEGMENT_LENGTH.size:
+            return
+        length, = _SEGMENT_LENGTH.unpack(header)
+        data = fileobj.read(length)
+        if len(data) < length:
+            return
+        yield read_dump(BytesIO(data))
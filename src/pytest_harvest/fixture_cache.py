@@ -1,5 +1,6 @@
 from collections import OrderedDict
 from inspect import isgeneratorfunction
+from weakref import ref
 
 from decopatch import DECORATED, function_decorator
 from makefun import wraps, add_signature_parameters
@@ -185,14 +186,21 @@ def _store_fixture_and_views(store_,
     """
     fix_val = _get_underlying_fixture(fixture_value)
 
+    # the inverted index of the store, if it has already been created
+    nodeid_index = _get_attached_nodeid_index(store_)
+
     if save_raw:
         # store the fixture value itself
         store_[main_key][node_id] = fix_val
+        if nodeid_index is not None:
+            nodeid_index.add(node_id, main_key)
 
     if views is not None:
         for key, proc in views.items():
             # store each view
             store_[key][node_id] = proc(fix_val)
+            if nodeid_index is not None:
+                nodeid_index.add(node_id, key)
 
 
 def _get_underlying_fixture(f):
@@ -201,3 +209,143 @@ def _get_underlying_fixture(f):
         return get_underlying_fixture(f)
     except ImportError:
         return f
+
+
+_NODEID_INDEXES = dict()
+"""The `NodeIdIndex` of each fixture store {id(store): (weak reference to the store, index)}. The indexes are not
+attached to the stores themselves so that they are not pickled with them, for example in the xdist workers dumps."""
+
+
+class NodeIdIndex(object):
+    """
+    An inverted index {nodeid: [fixture keys]} of a fixture store {fixture key: {nodeid: value}}, so that the entries
+    stored for a given test node can be retrieved without looking into all the fixture entries of the store.
+
+    It is updated by `_store_fixture_and_views` each time a fixture is saved. Since stores are plain dict-like objects
+    that users can also modify directly, the dictionary and number of entries of each fixture key are remembered so
+    that the index can be rebuilt when needed (see `sync`). Modifications that keep both unchanged are detected when
+    entries are read with `get_entries`.
+    """
+    __slots__ = ('_keys_by_nodeid', '_sizes', '_dicts', '_ranks')
+
+    def __init__(self, store):
+        self._keys_by_nodeid = dict()  # {nodeid: [fixture keys]}
+        self._sizes = dict()           # {fixture key: nb entries}
+        self._dicts = dict()           # {fixture key: {nodeid: value}}
+        self._ranks = dict()           # {fixture key: position in store}
+        self.rebuild(store)
+
+    def rebuild(self, store):
+        """Rebuilds the whole index from the contents of `store`"""
+        self._keys_by_nodeid.clear()
+        self._sizes.clear()
+        self._dicts = dict(store.items())
+        for key, fixture_dct in store.items():
+            for nodeid in fixture_dct:
+                self.add(nodeid, key)
+        self._ranks = {key: i for i, key in enumerate(store)}
+
+    def sync(self, store):
+        """Makes sure that the index is up to date with the contents of `store`, rebuilding it if needed"""
+        sizes = dict()
+        replaced = False
+        for key, fixture_dct in store.items():
+            if len(fixture_dct) > 0:
+                sizes[key] = len(fixture_dct)
+                # note: the dictionaries of keys created by `_store_fixture_and_views` are remembered here
+                replaced = replaced or self._dicts.setdefault(key, fixture_dct) is not fixture_dct
+        if replaced or sizes != self._sizes:
+            # the store was modified without the index being updated
+            self.rebuild(store)
+        elif len(self._ranks) != len(store):
+            # new empty fixture keys have been added
+            self._ranks = {key: i for i, key in enumerate(store)}
+
+    def add(self, nodeid, key):
+        """Registers that an entry was added for node `nodeid` under fixture key `key` in the store"""
+        try:
+            self._keys_by_nodeid[nodeid].append(key)
+        except KeyError:
+            self._keys_by_nodeid[nodeid] = [key]
+        self._sizes[key] = self._sizes.get(key, 0) + 1
+
+    def discard(self, nodeid):
+        """Registers that all entries of node `nodeid` were removed from the store. Returns their fixture keys"""
+        keys = self._keys_by_nodeid.pop(nodeid, ())
+        for key in keys:
+            self._sizes[key] -= 1
+            if self._sizes[key] == 0:
+                del self._sizes[key]
+        return keys
+
+    def get_keys(self, nodeid):
+        """Returns the fixture keys for which an entry exists in the store for `nodeid`, in the store order"""
+        keys = self._keys_by_nodeid.get(nodeid, ())
+        if len(keys) > 1:
+            return sorted(keys, key=self._ranks.__getitem__)
+        return keys
+
+    def get_entries(self, store, nodeid):
+        """
+        Returns the list of (fixture key, value) entries of node `nodeid` in `store`, in the store order. If an entry
+        is missing, the store was modified in a way that `sync` could not detect: the index is rebuilt.
+        """
+        try:
+            return [(key, store[key][nodeid]) for key in self.get_keys(nodeid)]
+        except KeyError:
+            self.rebuild(store)
+            return [(key, store[key][nodeid]) for key in self.get_keys(nodeid)]
+
+
+def _get_attached_nodeid_index(store):
+    """Returns the `NodeIdIndex` attached to `store` if any, or None"""
+    try:
+        store_ref, nodeid_index = _NODEID_INDEXES[id(store)]
+    except KeyError:
+        return None
+    return nodeid_index if store_ref() is store else None
+
+
+def _attach_nodeid_index(store, nodeid_index):
+    """Attaches `nodeid_index` to `store` until the store is garbage-collected, if possible"""
+    store_id = id(store)
+    try:
+        store_ref = ref(store, lambda _: _NODEID_INDEXES.pop(store_id, None))
+    except TypeError:
+        # this store can not be weakly referenced (e.g. a plain dict)
+        return
+    _NODEID_INDEXES[store_id] = (store_ref, nodeid_index)
+
+
+def get_nodeid_index(store):
+    """
+    Returns an up-to-date `NodeIdIndex` for `store`. The index is attached to the store when possible so that it is
+    then maintained incrementally when fixtures are saved, otherwise (for example for a plain `dict`) a new index is
+    built at each call.
+
+    :param store: a fixture store, that is, a dict-like {fixture key: {nodeid: value}}
+    :return:
+    """
+    nodeid_index = _get_attached_nodeid_index(store)
+    if nodeid_index is None:
+        nodeid_index = NodeIdIndex(store)
+        _attach_nodeid_index(store, nodeid_index)
+    else:
+        nodeid_index.sync(store)
+    return nodeid_index
+
+
+def evict_saved_fixtures(store, nodeid):
+    """
+    Removes all entries stored for test node `nodeid` from `store`, for example once they have been written to disk.
+    The inverted index of the store is updated accordingly.
+
+    :param store: a fixture store, that is, a dict-like {fixture key: {nodeid: value}}
+    :param nodeid: the node id of the test node
+    :return: the list of fixture keys for which an entry was removed
+    """
+    nodeid_index = get_nodeid_index(store)
+    keys = nodeid_index.discard(nodeid)
+    for key in keys:
+        del store[key][nodeid]
+    return list(keys)
@@ -0,0 +1,199 @@
+import mmap
+import os
+import pickle
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from weakref import WeakValueDictionary, finalize
+
+try:  # python 3.5+
+    from typing import Iterator, Tuple
+except ImportError:
+    pass
+
+
+_OPEN_STORES = WeakValueDictionary()
+"""The `MmapFixtureStore`s that are not closed, by id. See `spill_mmap_stores`"""
+
+
+class MmapSegment(object):
+    """
+    An append-only file of pickled values, read back through a memory map. Each value is identified by its
+    (offset, length) in the file, returned by `append`.
+    """
+    __slots__ = ('path', '_file', '_size', '_mmap', '_finalizer', '__weakref__')
+
+    def __init__(self,
+                 path=None  # type: str
+                 ):
+        """
+        :param path: the path of the segment file. It is overwritten if it exists. By default a temporary file is
+            created, and removed when the segment is closed or garbage-collected.
+        """
+        if path is None:
+            import tempfile  # pylint: disable=import-outside-toplevel
+            fd, path = tempfile.mkstemp(prefix='harvest-', suffix='.seg')
+            os.close(fd)
+            temporary = True
+        else:
+            temporary = False
+        self.path = path
+        self._file = open(path, 'w+b')
+        self._size = 0
+        self._mmap = None
+        self._finalizer = finalize(self, _close_segment_file, self._file, path if temporary else None)
+
+    def append(self, value):
+        # type: (...) -> Tuple[int, int]
+        """Pickles `value` at the end of the file and returns its (offset, length)"""
+        offset = self._size
+        pickle.dump(value, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._size = self._file.tell()
+        return offset, self._size - offset
+
+    def read(self, offset, length):
+        """Loads the value stored at (offset, length)"""
+        if self._mmap is None or offset + length > len(self._mmap):
+            # the file has grown since it was mapped
+            self._file.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return pickle.loads(self._mmap[offset:offset + length])
+
+    @property
+    def size(self):
+        # type: (...) -> int
+        """The size of the file in bytes"""
+        return self._size
+
+    def close(self):
+        """Closes the file (and removes it if it is a temporary file). The segment can not be used anymore."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._finalizer()
+
+
+def _close_segment_file(file, path_to_remove):
+    """Closes a segment file and removes it if `path_to_remove` is not None"""
+    file.close()
+    if path_to_remove is not None:
+        try:
+            os.remove(path_to_remove)
+        except OSError:
+            pass
+
+
+class MmapFixtureDict(MutableMapping):
+    """
+    The {nodeid: value} dictionary of a fixture key in a `MmapFixtureStore`. New values are kept in memory until they
+    are spilled (see `spill`), they are then pickled into the segment file of the store and only their offset is kept
+    in memory. Spilled values are loaded from the file at each access, and are not kept in memory.
+
+    The insertion order of node ids is preserved, as in the `OrderedDict`s of the default fixture store.
+    """
+    __slots__ = ('_segment', '_entries', '_pending')
+
+    def __init__(self, segment):
+        self._segment = segment
+        self._entries = OrderedDict()  # {nodeid: (offset, length), or None if the value is pending}
+        self._pending = dict()         # {nodeid: value}
+
+    def __getitem__(self, nodeid):
+        location = self._entries[nodeid]
+        if location is None:
+            return self._pending[nodeid]
+        return self._segment.read(*location)
+
+    def __setitem__(self, nodeid, value):
+        self._entries[nodeid] = None
+        self._pending[nodeid] = value
+
+    def __delitem__(self, nodeid):
+        # note: the space used in the file is not reclaimed, the segment is append-only
+        del self._entries[nodeid]
+        self._pending.pop(nodeid, None)
+
+    def __iter__(self):
+        # type: (...) -> Iterator[str]
+        return iter(self._entries)
+
+    def __reversed__(self):
+        return reversed(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, list(self._entries))
+
+    def spill(self, nodeid=None):
+        """
+        Pickles the pending value(s) into the segment file, so that they do not use memory anymore.
+
+        :param nodeid: the node id of the value to spill. By default all pending values are spilled.
+        """
+        nodeids = list(self._pending) if nodeid is None else ((nodeid,) if nodeid in self._pending else ())
+        for _nodeid in nodeids:
+            self._entries[_nodeid] = self._segment.append(self._pending.pop(_nodeid))
+
+
+class MmapFixtureStore(OrderedDict):
+    """
+    An out-of-core fixture store, that can be used wherever a `fixture_store` is accepted (for example in
+    `@saved_fixture(store)`, `create_results_bag_fixture(store)` and the `fixture_store` argument of all synthesis
+    functions), when the stored values are too large to be all kept in memory until the end of the session.
+
+    Each fixture key contains a `MmapFixtureDict`. Its values are pickled into a single append-only segment file once
+    the corresponding test node is complete (the `pytest-harvest` plugin calls `spill(nodeid)` after each test
+    teardown), and only their offset in the file is kept in memory. They are loaded lazily through a memory map each
+    time they are accessed. Note that the synthesis caches (`use_cache=True`, used by the `*_results_*` fixtures) keep
+    a reference on the rows they return, and therefore on the loaded values: for very large values, prefer
+    `get_session_synthesis_dct` or `iter_session_synthesis` with the default `use_cache=False`.
+
+    The store is only valid in the current process: with `pytest-xdist`, each worker has its own store.
+    """
+
+    def __init__(self,
+                 path=None  # type: str
+                 ):
+        """
+        :param path: the path of the segment file. It is overwritten if it exists. By default a temporary file is
+            created, and removed when the store is closed or garbage-collected.
+        """
+        super(MmapFixtureStore, self).__init__()
+        self.segment = MmapSegment(path)
+        _OPEN_STORES[id(self)] = self
+
+    def __setitem__(self, key, fixture_dct):
+        # note: the plugin (`saved_fixture`) creates each fixture key with an empty dictionary
+        if not isinstance(fixture_dct, MmapFixtureDict):
+            entries = fixture_dct
+            fixture_dct = MmapFixtureDict(self.segment)
+            fixture_dct.update(entries)
+        super(MmapFixtureStore, self).__setitem__(key, fixture_dct)
+
+    def spill(self, nodeid=None):
+        """
+        Pickles the pending values of all fixture keys into the segment file.
+
+        :param nodeid: the node id of the values to spill. By default all pending values are spilled.
+        """
+        for fixture_dct in self.values():
+            fixture_dct.spill(nodeid)
+
+    def close(self):
+        """Closes the segment file (and removes it if it is a temporary file). The store can not be used anymore."""
+        _OPEN_STORES.pop(id(self), None)
+        self.segment.close()
+
+
+def spill_mmap_stores(nodeid):
+    """
+    Spills the values of node `nodeid` in all `MmapFixtureStore`s that are not closed. This is called by the
+    `pytest-harvest` plugin once each test node is complete.
+
+    :param nodeid: the node id of the complete test node
+    """
+    for store in list(_OPEN_STORES.values()):
+        store.spill(nodeid)
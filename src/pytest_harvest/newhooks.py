@@ -27,9 +27,14 @@ def pytest_harvest_xdist_worker_dump(worker_id, session_items, fixture_store):
 
 
 @pytest.mark.firstresult
-def pytest_harvest_xdist_load():
+def pytest_harvest_xdist_load(module_names, restored_workers):
     """ called when xdist distribution is enabled, on xdist master, the first time pytest-harvest needs to access
-    persisted information. Should return a dictionary {worker_id: (session_items, fixture_store)}"""
+    persisted information. Should return a dictionary {worker_id: (session_items, fixture_store)}.
+
+    If `module_names` is not None, only the results of the tests in these modules are needed: plugins may then only
+    return the material of the workers that ran tests in these modules. Each worker's material should be complete,
+    since it is not loaded again afterwards: `restored_workers` is the set of the ids of the workers already restored
+    by a previous call, that plugins do not need to load again."""
 
 
 @pytest.mark.firstresult
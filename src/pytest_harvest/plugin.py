@@ -1,18 +1,103 @@
+import json
+import os
 import pickle
+import sys
 from collections import OrderedDict
 from logging import warning
+from numbers import Number
 from shutil import rmtree
+from time import monotonic
 import pytest
 
 from pathlib import Path
-from typing import Union, Iterable, Mapping, Any
-
-from pytest_harvest.common import HARVEST_PREFIX
-from pytest_harvest.results_bags import create_results_bag_fixture
-from pytest_harvest.results_session import get_session_synthesis_dct, get_persistable_session_items
+from typing import Union, Iterable, Mapping, Any, List
+
+from pytest_harvest.common import HARVEST_PREFIX, get_qualified_name, new_run_id
+from pytest_harvest.fixture_cache import evict_saved_fixtures, get_nodeid_index
+from pytest_harvest.results_bags import create_results_bag_fixture, get_results_bag_schema
+from pytest_harvest.results_session import get_session_synthesis_dct, get_session_synthesis_columns, \
+    iter_session_synthesis, get_persistable_session_items, get_persistable_session_item, get_all_pytest_param_names, \
+    get_synthesis_cache, get_module_results_cache, get_item_module_name, _copy_synthesis_row, get_session_items_index, \
+    get_pytest_status, is_pytest_incomplete, TEST_ID_COLUMN, PYTEST_OBJ_NAME, RESULTS_BASELINE_ATTR, \
+    update_pytest_status, SlimReport
+# note: the optional features modules (results_arrow, results_jsonl, results_sqlite, results_history, mmap_store,
+# dump_codecs) are imported only when they are used, to keep the plugin import time low in each pytest process and
+# xdist worker
 from pytest_harvest.xdist_api import is_xdist_master, is_xdist_worker, get_xdist_worker_id
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup('harvest', 'pytest-harvest')
+    group.addoption('--harvest-slim-reports', action='store_true', dest='harvest_slim_reports', default=False,
+                    help="only keep the outcome, duration and start/stop timestamps of each test phase report, instead "
+                         "of the full pytest report. This lowers memory usage and the size of xdist worker dumps.")
+    parser.addini('harvest_slim_reports', type='bool', default=False,
+                  help="same as the --harvest-slim-reports option.")
+    group.addoption('--harvest-parquet', action='store', dest='harvest_parquet', default=None, metavar='PATH',
+                    help="write the session results (the same contents than `get_session_results_df`) to a parquet "
+                         "file at PATH at the end of the session. This requires `pyarrow`.")
+    group.addoption('--harvest-jsonl', action='store', dest='harvest_jsonl', default=None, metavar='PATH',
+                    help="append the results row of each test to a JSON-lines file at PATH as soon as the test is "
+                         "complete, so that they are not lost if the session is killed. With xdist, each worker "
+                         "writes to its own file, with the worker id inserted before the extension.")
+    parser.addini('harvest_jsonl', default=None, help="same as the --harvest-jsonl option.")
+    group.addoption('--harvest-jsonl-evict', action='store_true', dest='harvest_jsonl_evict', default=False,
+                    help="remove the entries of each test from the default fixture store once they have been written "
+                         "by --harvest-jsonl, so that memory does not grow with the number of tests.")
+    parser.addini('harvest_jsonl_evict', type='bool', default=False,
+                  help="same as the --harvest-jsonl-evict option.")
+    parser.addini('harvest_jsonl_fsync_interval', default='1.0',
+                  help="the minimum number of seconds between two syncs to disk of the --harvest-jsonl file.")
+    group.addoption('--harvest-sqlite', action='store', dest='harvest_sqlite', default=None, metavar='PATH',
+                    help="store the results of each test (status of each phase, parameters, saved fixtures and "
+                         "results bags entries) in the sqlite database at PATH, under a new run id for this session.")
+    parser.addini('harvest_sqlite', default=None, help="same as the --harvest-sqlite option.")
+    group.addoption('--harvest-xdist-stream', action='store_true', dest='harvest_xdist_stream', default=False,
+                    help="with pytest-xdist, send the harvested results of each test from the workers to the master as "
+                         "soon as the test is complete, instead of dumping them in a file at the end of the session.")
+    parser.addini('harvest_xdist_stream', type='bool', default=False,
+                  help="same as the --harvest-xdist-stream option.")
+    group.addoption('--harvest-xdist-dir', action='store', dest='harvest_xdist_dir', default=None, metavar='PATH',
+                    help="with pytest-xdist, the folder where the workers write their harvested results, for example "
+                         "on a tmpfs such as /dev/shm. Each session uses its own subfolder. Default: "
+                         "'.xdist_harvested' in the current directory.")
+    parser.addini('harvest_xdist_dir', default=XDIST_DEFAULT_DIR, help="same as the --harvest-xdist-dir option.")
+    parser.addini('harvest_xdist_dump_codec', default='none',
+                  help="the compression codec of the xdist worker dumps: 'none' (default), 'gzip', 'lzma', 'lz4' "
+                       "(requires `lz4`) or 'zstd' (requires python 3.14+ or `zstandard`), optionally followed by "
+                       "':<level>', for example 'gzip:1'.")
+    parser.addini('harvest_xdist_checkpoint_tests', default='0',
+                  help="with pytest-xdist, make each worker checkpoint the results of its completed tests every N "
+                       "tests, in an append-only segments file, so that they are not lost if the worker crashes. "
+                       "Default: 0 (disabled).")
+    parser.addini('harvest_xdist_checkpoint_interval', default='0',
+                  help="with pytest-xdist, make each worker checkpoint the results of its completed tests every T "
+                       "seconds (checked after each test). Default: 0 (disabled).")
+    group.addoption('--harvest-history', action='store_true', dest='harvest_history', default=False,
+                    help="keep a history of the test durations (and of the `harvest_history_fields` results bag "
+                         "fields) of the last runs in the pytest cache, and compare the durations with a baseline. "
+                         "Slowdowns are reported in the terminal summary.")
+    parser.addini('harvest_history', type='bool', default=False, help="same as the --harvest-history option.")
+    group.addoption('--harvest-history-tag', action='store', dest='harvest_history_tag', default=None, metavar='TAG',
+                    help="a tag for this run in the --harvest-history, so that it can be used as a named baseline.")
+    group.addoption('--harvest-baseline', action='store', dest='harvest_baseline', default=None, metavar='BASELINE',
+                    help="the baseline used by --harvest-history: 'last' (the previous run, default), 'median' (the "
+                         "median of the runs in the history) or the tag of a previous run.")
+    parser.addini('harvest_baseline', default='last', help="same as the --harvest-baseline option.")
+    group.addoption('--harvest-slowdown-threshold', action='store', dest='harvest_slowdown_threshold', default=None,
+                    type=float, metavar='RATIO',
+                    help="the relative duration increase above which a test is flagged as a slowdown by "
+                         "--harvest-history. Default: 0.2 (+20%%).")
+    parser.addini('harvest_slowdown_threshold', default='0.2', help="same as the --harvest-slowdown-threshold option.")
+    parser.addini('harvest_slowdown_min_duration', default='0.001',
+                  help="tests lasting less than this number of seconds in both the current run and the baseline are "
+                       "never flagged as slowdowns by --harvest-history.")
+    parser.addini('harvest_history_fields', type='linelist', default=[],
+                  help="the names of the numeric `results_bag` fields to keep in the --harvest-history.")
+    parser.addini('harvest_history_size', default='10',
+                  help="the number of untagged runs to keep in the --harvest-history.")
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
@@ -34,8 +119,68 @@ def pytest_runtest_makereport(item, call):
 
     # set a report attribute for each phase of a call, which can
     # be "setup", "call", "teardown"
+    if getattr(item.config, '_harvest_slim_reports', False):
+        # only keep what we need, so that the rest of the report can be garbage-collected
+        setattr(item, HARVEST_PREFIX + rep.when, SlimReport.from_report(rep))
+    else:
+        setattr(item, HARVEST_PREFIX + rep.when, rep)
+
+    # maintain the compact status record of this item
+    was_complete = not is_pytest_incomplete(item)
+    update_pytest_status(item, rep)
+
+    # the synthesis row for this node has to be recomputed
+    get_synthesis_cache(item.session).invalidate(item.nodeid)
+    if was_complete or not is_pytest_incomplete(item):
+        # the module results only contain complete items
+        get_module_results_cache(item.session).invalidate_module(get_item_module_name(item))
+
+    # the node is complete: write it to the JSON-lines sink and sqlite database if any
+    if rep.when == 'teardown':
+        _write_item_results(item)
+
+        # the values of the node can now be moved out of memory in the out-of-core stores if any. Note: if the module
+        # was not imported, no `MmapFixtureStore` was created
+        mmap_store = sys.modules.get('pytest_harvest.mmap_store', None)
+        if mmap_store is not None:
+            mmap_store.spill_mmap_stores(item.nodeid)
+
+
+def _write_item_results(item):
+    """
+    Writes the results of `item` to the JSON-lines sink (with the same contents than in `get_session_results_df`)
+    and to the sqlite database (with the same contents than in `get_session_results_dct`) if they are enabled, and
+    optionally evicts its entries from the default fixture store.
+    """
+    config = item.config
+    jsonl_sink = getattr(config, '_harvest_jsonl_sink', None)
+    sqlite_store = getattr(config, '_harvest_sqlite_store', None)
+
+    if jsonl_sink is not None:
+        for test_id, row in iter_session_synthesis(item.session, items=(item,), durations_in_ms=True,
+                                                   test_id_format='full', status_details=False, flatten=True,
+                                                   fixture_store=FIXTURE_STORE, flatten_more='results_bag'):
+            jsonl_sink.write_row(test_id, row)
 
-    setattr(item, HARVEST_PREFIX + rep.when, rep)
+    if sqlite_store is not None:
+        sqlite_store.write_rows(iter_session_synthesis(item.session, items=(item,), durations_in_ms=True,
+                                                       test_id_format='full', status_details=True, pytest_prefix=False,
+                                                       flatten=False, fixture_store=FIXTURE_STORE))
+
+    if jsonl_sink is not None and config._harvest_jsonl_evict:
+        fixture_names = evict_saved_fixtures(FIXTURE_STORE, item.nodeid)
+        # only the results of this item are affected by this removal
+        get_synthesis_cache(item.session).evict(item.nodeid, FIXTURE_STORE, fixture_names)
+        get_module_results_cache(item.session).evict(get_item_module_name(item), FIXTURE_STORE, fixture_names)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_finish(session):
+    """
+    We use this hook to build the index of session items once the collection is complete, so that filtered syntheses
+    (e.g. `module_results_dct`) only have to look at the matching items.
+    """
+    get_session_items_index(session)
 
 
 # ------------- To collect benchmark results ------------
@@ -126,7 +271,8 @@ def get_session_results_dct(session_or_request,
     results_dct = get_session_synthesis_dct(session_or_request, durations_in_ms=True,
                                             test_id_format='full', status_details=True, pytest_prefix=False,
                                             fixture_store=fixture_store,
-                                            flatten=False, flatten_more=results_bag_fixture_name)
+                                            flatten=False, flatten_more=results_bag_fixture_name,
+                                            use_cache=True)
 
     # We do not want to post-process according to steps here, this fixture should have as a contract that the keys
     # are the True test ids.
@@ -174,14 +320,24 @@ def get_module_results_dct(session_or_request,
         "results_bag"
     :return:
     """
-    # in case of xdist, make sure persisted workers results have been reloaded
-    possibly_restore_xdist_workers_structs(session_or_request)
+    # in case of xdist, make sure persisted workers results of this module have been reloaded
+    possibly_restore_xdist_workers_structs(session_or_request, module_name=module_name)
 
-    results_dct = get_session_synthesis_dct(session_or_request, durations_in_ms=True,
-                                            filter=module_name, pytest_prefix=False,
-                                            test_id_format='function', status_details=True,
-                                            fixture_store=fixture_store,
-                                            flatten=False, flatten_more=results_bag_fixture_name)
+    # the module results are cached until one of the module items changes
+    def create_results(stores):
+        return get_session_synthesis_dct(session_or_request, durations_in_ms=True,
+                                         filter=module_name, pytest_prefix=False,
+                                         test_id_format='function', status_details=True,
+                                         fixture_store=stores,
+                                         flatten=False, flatten_more=results_bag_fixture_name,
+                                         use_cache=True)
+
+    def copy_results(results):
+        return OrderedDict((test_id, _copy_synthesis_row(row, ('status_details', 'params', 'fixtures')))
+                           for test_id, row in results.items())
+
+    results_dct = _get_module_results(session_or_request, module_name, ('dct', results_bag_fixture_name),
+                                      fixture_store, create_results, copy_results)
 
     # We do not want to post-process according to steps here, this fixture should have as a contract that the keys
     # are the True test ids.
@@ -212,8 +368,9 @@ def module_results_dct(request, fixture_store):
 
 
 def get_session_results_df(session_or_request,
-                           fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
-                           results_bag_fixture_name='results_bag'  # type: str
+                           fixture_store=FIXTURE_STORE,             # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                           results_bag_fixture_name='results_bag',  # type: str
+                           engine='pandas'                          # type: str
                            ):
     # type: (...) -> pd.DataFrame
     """
@@ -226,27 +383,25 @@ def get_session_results_df(session_or_request,
     :param fixture_store: an optional fixture store
     :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
         "results_bag"
+    :param engine: the dataframe library to use, one of 'pandas' (default), 'polars' or 'arrow'. See
+        `columns_to_frame` for details.
     :return:
     """
-    try:
-        import pandas as pd  # pylint: disable=import-outside-toplevel
-    except ImportError as e:
-        raise Exception("There was an error importing `pandas` module. Fixture `session_results_df` and method"
-                                 "`get_session_results_df` can not be used in this session.") from e
-
     # in case of xdist, make sure persisted workers results have been reloaded
     possibly_restore_xdist_workers_structs(session_or_request)
 
-    # get the synthesis dictionary, merged with default fixture store and flattening default results_bag
-    session_results_dct = get_session_synthesis_dct(session_or_request, durations_in_ms=True,
-                                                    test_id_format='full', status_details=False,
-                                                    fixture_store=fixture_store,
-                                                    flatten=True, flatten_more=results_bag_fixture_name)
+    # get the columnar synthesis, merged with default fixture store and flattening default results_bag
+    session_results_cols = get_session_synthesis_columns(session_or_request, durations_in_ms=True,
+                                                         test_id_format='full', status_details=False,
+                                                         fixture_store=fixture_store,
+                                                         flatten_more=results_bag_fixture_name,
+                                                         use_cache=True)
 
-    # convert to a pandas dataframe
-    results_df = pd.DataFrame.from_dict(session_results_dct, orient='index')
-    results_df = results_df.loc[list(session_results_dct.keys()), :]  # fix rows order
-    results_df.index.name = 'test_id'  # set index name
+    # convert to a dataframe
+    param_names = get_all_pytest_param_names(session_or_request.session)
+    results_df = columns_to_frame(session_results_cols, param_names=param_names, engine=engine,
+                                  what="Fixture `session_results_df` and method `get_session_results_df`",
+                                  dtypes=get_results_bag_schema(fixture_store, results_bag_fixture_name))
 
     # We do not want to post-process according to steps here, this fixture should have as a contract that the keys
     # are the True test ids.
@@ -265,6 +420,78 @@ def get_session_results_df(session_or_request,
     return results_df
 
 
+def _iter_session_results(session_or_request,
+                          fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                          results_bag_fixture_name='results_bag'  # type: str
+                          ):
+    """
+    Returns an iterator over the flattened synthesis rows with the same options than in `get_session_results_df`.
+    """
+    return iter_session_synthesis(session_or_request, durations_in_ms=True, test_id_format='full',
+                                  status_details=False, fixture_store=fixture_store, flatten=True,
+                                  flatten_more=results_bag_fixture_name, use_cache=False)
+
+
+def get_session_results_arrow(session_or_request,
+                              fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                              results_bag_fixture_name='results_bag'  # type: str
+                              ):
+    # type: (...) -> pa.Table
+    """
+    Helper method to get the same contents than `get_session_results_df`, as a `pyarrow.Table`. The table is built
+    directly from the columnar synthesis, without creating a pandas `DataFrame`. The test id is the first column
+    ('test_id') and the `pytest_obj` column contains the qualified name of the test functions.
+
+    :param session_or_request: the pytest session or request
+    :param fixture_store: an optional fixture store
+    :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
+        "results_bag"
+    :return:
+    """
+    # in case of xdist, make sure persisted workers results have been reloaded
+    possibly_restore_xdist_workers_structs(session_or_request)
+
+    # get the columnar synthesis, merged with default fixture store and flattening default results_bag
+    session_results_cols = get_session_synthesis_columns(session_or_request, durations_in_ms=True,
+                                                         test_id_format='full', status_details=False,
+                                                         fixture_store=fixture_store,
+                                                         flatten_more=results_bag_fixture_name,
+                                                         use_cache=True)
+
+    from pytest_harvest.results_arrow import columns_to_arrow_table  # pylint: disable=import-outside-toplevel
+    return columns_to_arrow_table(session_results_cols,
+                                  dtypes=get_results_bag_schema(fixture_store, results_bag_fixture_name))
+
+
+def write_session_results_parquet(session_or_request,
+                                  path,                                   # type: str
+                                  fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                                  results_bag_fixture_name='results_bag'  # type: str
+                                  ):
+    # type: (...) -> int
+    """
+    Writes the same contents than `get_session_results_arrow` to a parquet file, in record batches so that the whole
+    table is never held in memory. This is what the `--harvest-parquet` option uses at the end of the session.
+
+    :param session_or_request: the pytest session or request
+    :param path: the path of the parquet file to write
+    :param fixture_store: an optional fixture store
+    :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
+        "results_bag"
+    :return: the number of rows written
+    """
+    # in case of xdist, make sure persisted workers results have been reloaded
+    possibly_restore_xdist_workers_structs(session_or_request)
+
+    def rows_factory():
+        return _iter_session_results(session_or_request, fixture_store=fixture_store,
+                                     results_bag_fixture_name=results_bag_fixture_name)
+
+    from pytest_harvest.results_arrow import write_synthesis_parquet  # pylint: disable=import-outside-toplevel
+    return write_synthesis_parquet(path, rows_factory,
+                                   dtypes=get_results_bag_schema(fixture_store, results_bag_fixture_name))
+
+
 @pytest.fixture(scope='function')
 def session_results_df(request, fixture_store):
     """
@@ -284,8 +511,9 @@ def session_results_df(request, fixture_store):
 def get_filtered_results_df(session,
                             filter=None,                            # type: Any
                             test_id_format='full',                  # type: str
-                            fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
-                            results_bag_fixture_name='results_bag'  # type: str
+                            fixture_store=FIXTURE_STORE,             # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                            results_bag_fixture_name='results_bag',  # type: str
+                            engine='pandas'                          # type: str
                             ):
     # type: (...) -> pd.DataFrame
     """
@@ -296,29 +524,27 @@ def get_filtered_results_df(session,
     :param fixture_store: an optional fixture store
     :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
         "results_bag"
+    :param engine: the dataframe library to use, one of 'pandas' (default), 'polars' or 'arrow'. See
+        `columns_to_frame` for details.
     :return:
     """
-    try:
-        import pandas as pd  # pylint: disable=import-outside-toplevel
-    except ImportError as e:
-        raise Exception("There was an error importing `pandas` module. Fixture `session_results_df` and "
-                                 "methods `get_filtered_results_df` and `get_module_results_df` can not be used in this"
-                                 " session. ") from e
-
-    # in case of xdist, make sure persisted workers results have been reloaded
-    possibly_restore_xdist_workers_structs(session)
-
-    # get the synthesis dictionary, merged with default fixture store and flattening default results_bag
-    module_results_dct = get_session_synthesis_dct(session, durations_in_ms=True,
-                                                   filter=filter,
-                                                   test_id_format=test_id_format, status_details=False,
-                                                   fixture_store=fixture_store,
-                                                   flatten=True, flatten_more=results_bag_fixture_name)
-
-    # convert to a pandas dataframe
-    results_df = pd.DataFrame.from_dict(module_results_dct, orient='index')
-    results_df = results_df.loc[list(module_results_dct.keys()), :]  # fix rows order
-    results_df.index.name = 'test_id'  # set index name
+    # in case of xdist, make sure persisted workers results have been reloaded (only for the module if possible)
+    possibly_restore_xdist_workers_structs(session, module_name=filter if isinstance(filter, str) else None)
+
+    # get the columnar synthesis, merged with default fixture store and flattening default results_bag
+    module_results_cols = get_session_synthesis_columns(session, durations_in_ms=True,
+                                                        filter=filter,
+                                                        test_id_format=test_id_format, status_details=False,
+                                                        fixture_store=fixture_store,
+                                                        flatten_more=results_bag_fixture_name,
+                                                        use_cache=True)
+
+    # convert to a dataframe
+    param_names = get_all_pytest_param_names(session, filter=filter)
+    results_df = columns_to_frame(module_results_cols, param_names=param_names, engine=engine,
+                                  what="Fixture `module_results_df` and methods `get_filtered_results_df` and "
+                                       "`get_module_results_df`",
+                                  dtypes=get_results_bag_schema(fixture_store, results_bag_fixture_name))
 
     # We do not want to post-process according to steps here, this fixture should have as a contract that the keys
     # are the True test ids.
@@ -337,10 +563,158 @@ def get_filtered_results_df(session,
     return results_df
 
 
+DF_ENGINES = ('pandas', 'polars', 'arrow')
+
+
+def columns_to_frame(columns,          # type: Mapping[str, List[Any]]
+                     param_names=(),   # type: Iterable[str]
+                     engine='pandas',  # type: str
+                     what=None,        # type: str
+                     dtypes=None       # type: Mapping[str, type]
+                     ):
+    """
+    Creates a dataframe from a columnar synthesis (see `get_session_synthesis_columns`), with the library selected by
+    `engine`. In all cases the frame is built directly from the columns, without converting through another library:
+
+     - 'pandas' (default): a `pandas.DataFrame` indexed by test id, with categorical 'status' column and parameter
+       columns containing repeated non-numeric values.
+     - 'polars': a `polars.DataFrame` where the test id is the first column (polars has no index), with the same
+       categorical columns than for pandas. The `pytest_obj` column contains the qualified name of the test functions,
+       and columns that polars can not convert contain the string representation of their values.
+     - 'arrow': a `pyarrow.Table`, see `columns_to_arrow_table`.
+
+    :param columns: a dictionary {column_name: list of values} containing a 'test_id' column
+    :param param_names: the names of the parameter columns
+    :param engine: one of 'pandas' (default), 'polars' or 'arrow'.
+    :param what: an optional description of the caller, used in the error message if the library is not installed.
+    :param dtypes: an optional dictionary {column_name: python type}, typically the schema of a `TypedResultsBag`.
+        Columns with type `int`, `float`, `bool` or `str` are directly created with the corresponding native dtype
+        (nullable `Int64` and `boolean` for pandas) instead of being inferred from their values.
+    :return:
+    """
+    what = what or "`columns_to_frame(engine=%r)`" % engine
+    if engine == 'pandas':
+        try:
+            import pandas as pd  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise Exception("There was an error importing `pandas` module. %s can not be used in this session."
+                            % what) from e
+        return _columns_to_df(pd, columns, param_names=param_names, dtypes=dtypes)
+
+    elif engine == 'polars':
+        try:
+            import polars as pl  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise Exception("There was an error importing `polars` module. %s can not be used with engine='polars' in "
+                            "this session." % what) from e
+        return _columns_to_polars(pl, columns, param_names=param_names, dtypes=dtypes)
+
+    elif engine == 'arrow':
+        from pytest_harvest.results_arrow import columns_to_arrow_table  # pylint: disable=import-outside-toplevel
+        return columns_to_arrow_table(columns, dtypes=dtypes)
+
+    else:
+        raise ValueError("Invalid `engine`: %r. It should be one of %s" % (engine, DF_ENGINES))
+
+
+def _columns_to_polars(pl, columns, param_names=(), dtypes=None):
+    """
+    Creates a polars DataFrame from a columnar synthesis (see `get_session_synthesis_columns`), with the same column
+    dtypes rules than `_columns_to_df`. The test id is the first column.
+
+    :param pl: the polars module
+    :param columns: a dictionary {column_name: list of values} containing a 'test_id' column
+    :param param_names: the names of the parameter columns
+    :param dtypes: an optional dictionary {column_name: python type}
+    :return:
+    """
+    polars_dtypes = {int: pl.Int64, float: pl.Float64, bool: pl.Boolean, str: pl.String}
+    dtypes = {col_name: polars_dtypes[t] for col_name, t in (dtypes or {}).items() if t in polars_dtypes}
+
+    series = []
+    for col_name, values in columns.items():
+        if col_name in dtypes:
+            # known dtype: no inference
+            series.append(pl.Series(col_name, values, dtype=dtypes[col_name]))
+            continue
+        if col_name == PYTEST_OBJ_NAME:
+            values = [get_qualified_name(v) for v in values]
+        try:
+            s = pl.Series(col_name, values)
+        except (TypeError, ValueError, OverflowError, pl.exceptions.PolarsError):
+            s = None
+        if s is None or s.dtype == pl.Object:
+            # objects that polars can not convert: use their string representation
+            s = pl.Series(col_name, [None if v is None else str(v) for v in values], dtype=pl.String)
+        if s.dtype == pl.String and (col_name == 'status'
+                                     or (col_name in param_names and _is_repeated_non_numeric(values))):
+            s = s.cast(pl.Categorical)
+        series.append(s)
+
+    return pl.DataFrame(series)
+
+
+def _columns_to_df(pd, columns, param_names=(), dtypes=None):
+    """
+    Creates a pandas DataFrame from a columnar synthesis (see `get_session_synthesis_columns`), indexed by test id,
+    without any intermediate row-oriented structure. Column dtypes are set in a single pass:
+
+     - the 'status' column is categorical,
+     - parameter columns containing repeated, non-numeric values are categorical,
+     - columns with a known type in `dtypes` are directly created with the corresponding dtype,
+     - other columns are converted by pandas, so that numeric columns (e.g. in results bags) get a numeric dtype.
+
+    :param pd: the pandas module
+    :param columns: a dictionary {column_name: list of values} containing a 'test_id' column
+    :param param_names: the names of the parameter columns
+    :param dtypes: an optional dictionary {column_name: python type}
+    :return:
+    """
+    pandas_dtypes = {int: 'Int64', float: 'float64', bool: 'boolean', str: 'string'}
+    dtypes = {col_name: pandas_dtypes[t] for col_name, t in (dtypes or {}).items() if t in pandas_dtypes}
+
+    index = pd.Index(columns[TEST_ID_COLUMN], name=TEST_ID_COLUMN)
+    data = OrderedDict()
+    for col_name, values in columns.items():
+        if col_name == TEST_ID_COLUMN:
+            continue
+        if col_name in dtypes:
+            # known dtype: no inference
+            values = pd.Series(values, index=index, dtype=dtypes[col_name])
+        elif col_name == 'status' or (col_name in param_names and _is_repeated_non_numeric(values)):
+            try:
+                values = pd.Categorical(values)
+            except (TypeError, ValueError):
+                # values that pandas can not handle as categories (e.g. not sortable)
+                pass
+        data[col_name] = values
+
+    return pd.DataFrame(data, index=index)
+
+
+def _is_repeated_non_numeric(values):
+    """Returns True if `values` contains hashable, non-numeric values, some of them being repeated"""
+    nb_values = 0
+    distinct_values = set()
+    for v in values:
+        if v is None:
+            continue
+        elif isinstance(v, Number):
+            return False
+        try:
+            distinct_values.add(v)
+        except TypeError:
+            # not hashable
+            return False
+        nb_values += 1
+    return len(distinct_values) < nb_values
+
+
 def get_module_results_df(session,
                           module_name,                            # type: str
-                          fixture_store=FIXTURE_STORE,            # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
-                          results_bag_fixture_name='results_bag'  # type: str
+                          fixture_store=FIXTURE_STORE,             # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                          results_bag_fixture_name='results_bag',  # type: str
+                          engine='pandas'                          # type: str
                           ):
     """
     Helper method to get exactly the same object than the `module_results_df` fixture, from a session object.
@@ -353,10 +727,53 @@ def get_module_results_df(session,
     :param fixture_store: an optional fixture store
     :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
         "results_bag"
+    :param engine: the dataframe library to use, one of 'pandas' (default), 'polars' or 'arrow'. See
+        `columns_to_frame` for details.
+    :return:
+    """
+    # in case of xdist, make sure persisted workers results of this module have been reloaded
+    possibly_restore_xdist_workers_structs(session, module_name=module_name)
+
+    # the module results are cached until one of the module items changes
+    def create_results(stores):
+        return get_filtered_results_df(session=session, test_id_format='function', filter=module_name,
+                                       fixture_store=stores, results_bag_fixture_name=results_bag_fixture_name,
+                                       engine=engine)
+
+    def copy_results(results_df):
+        if engine == 'pandas':
+            return results_df.copy()
+        elif engine == 'polars':
+            return results_df.clone()
+        else:
+            # arrow tables are immutable
+            return results_df
+
+    return _get_module_results(session, module_name, ('df', results_bag_fixture_name, engine),
+                               fixture_store, create_results, copy_results)
+
+
+def _get_module_results(session_or_request, module_name, key, fixture_store, create_results, copy_results):
+    """
+    Returns a copy of the module results of kind `key` for module `module_name`, from the session's
+    `ModuleResultsCache`. They are created with `create_results(stores)` if they are not in the cache.
+
+    :param session_or_request: the pytest session or request
+    :param module_name: the name of the module
+    :param key: a hashable representation of the kind of results and of their options
+    :param fixture_store: the fixture store (or iterable of fixture stores) used to create the results
+    :param create_results: a function creating the results from a tuple of fixture stores
+    :param copy_results: a function returning a copy of the results, so that the cached results can not be modified
     :return:
     """
-    return get_filtered_results_df(session=session, test_id_format='function', filter=module_name,
-                                   fixture_store=fixture_store, results_bag_fixture_name=results_bag_fixture_name)
+    session = getattr(session_or_request, 'session', session_or_request)
+    stores = (fixture_store,) if hasattr(fixture_store, 'items') else tuple(fixture_store)
+    cache = get_module_results_cache(session)
+    results = cache.get(session, module_name, key, stores)
+    if results is None:
+        results = create_results(stores)
+        cache.set(module_name, key, stores, results)
+    return copy_results(results)
 
 
 @pytest.fixture(scope='function')
@@ -375,61 +792,418 @@ def module_results_df(request, fixture_store):
     return get_module_results_df(request.session, module_name=request.module.__name__, fixture_store=fixture_store)
 
 
+FUNCTION_LEVEL_NAME = 'function'
+
+
+def get_params_indexed_results_df(session_or_request,
+                                  filter=None,                             # type: Any
+                                  fixture_store=FIXTURE_STORE,             # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                                  results_bag_fixture_name='results_bag',  # type: str
+                                  sort=False                               # type: bool
+                                  ):
+    # type: (...) -> pd.DataFrame
+    """
+    Returns the same contents than `get_filtered_results_df`, in a pandas `DataFrame` indexed by a `MultiIndex` with
+    one level for the test function name ('function') and one level for each parameter (see
+    `get_all_pytest_param_names`). This is typically useful for benchmark grids: the frame can directly be pivoted
+    with `unstack`, or aggregated with `groupby(level=...)`.
+
+    Each level is built once from the columnar synthesis as a categorical (codes + categories), so that parameter
+    values do not need to be hashed again for each pivot or group-by. The test id is kept as the first column since
+    several tests may have the same function and parameters.
+
+    :param session_or_request: the pytest session or request
+    :param filter: any filter, see `get_session_synthesis_dct` for details
+    :param fixture_store: an optional fixture store
+    :param results_bag_fixture_name: an optional name for results bag fixture in the fixture store. Default is
+        "results_bag"
+    :param sort: if True, the rows are sorted according to the index (the order of the categories in each level)
+        instead of being in the session order. This makes selections with `.loc` faster on large frames.
+    :return:
+    """
+    try:
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise Exception("There was an error importing `pandas` module. Method `get_params_indexed_results_df` can not "
+                        "be used in this session.") from e
+
+    # in case of xdist, make sure persisted workers results have been reloaded
+    possibly_restore_xdist_workers_structs(session_or_request)
+
+    # get the columnar synthesis, merged with default fixture store and flattening default results_bag
+    results_cols = get_session_synthesis_columns(session_or_request, durations_in_ms=True, filter=filter,
+                                                 test_id_format='full', status_details=False,
+                                                 fixture_store=fixture_store, flatten_more=results_bag_fixture_name,
+                                                 use_cache=True)
+    # note: incomplete items are filtered out of the synthesis, so their parameters should not be used
+    param_names = get_all_pytest_param_names(session_or_request.session, filter=filter, filter_incomplete=True)
+
+    # the index levels: function name and parameters
+    functions = [getattr(obj, '__qualname__', None) or str(obj) for obj in results_cols[PYTEST_OBJ_NAME]]
+    levels = [_to_categorical(pd, functions)]
+    level_names = [FUNCTION_LEVEL_NAME]
+    for param_name in param_names:
+        levels.append(_to_categorical(pd, results_cols.pop(param_name, [None] * len(functions))))
+        level_names.append(param_name)
+
+    # the other columns
+    results_df = _columns_to_df(pd, results_cols, dtypes=get_results_bag_schema(fixture_store,
+                                                                                 results_bag_fixture_name))
+    results_df.reset_index(inplace=True)
+    results_df.index = pd.MultiIndex.from_arrays(levels, names=level_names)
+    if sort:
+        results_df.sort_index(inplace=True)
+    return results_df
+
+
+def _to_categorical(pd, values):
+    """Returns a pandas `Categorical` for `values`, using their string representation if they are not hashable"""
+    try:
+        return pd.Categorical(values)
+    except TypeError:
+        return pd.Categorical([None if v is None else str(v) for v in values])
+
+
 # ----- Support for pytest-xdist: we need to persist results across worker processes
 def pytest_addhooks(pluginmanager):
     from pytest_harvest import newhooks
     pluginmanager.add_hookspecs(newhooks)
 
 
+XDIST_DEFAULT_DIR = '.xdist_harvested'
+"""The default harvest folder of `DefaultXDistHarvester`, see the `--harvest-xdist-dir` option"""
+
+XDIST_RUN_DIR_KEY = 'harvest_xdist_run_dir'
+"""The `workerinput` key used by `DefaultXDistHarvester` to send the path of the results folder of the run to workers"""
+
+XDIST_LOAD_THREADS = 8
+"""The maximum number of threads used by `DefaultXDistHarvester` to read the workers dumps on the master"""
+
+
+def _load_worker_dump(results_path, worker_id):
+    """
+    Loads the (session_items, fixture_store) dumped by a xdist worker, whatever its codec. If the worker has no full
+    dump (it checkpoints its results, or it crashed), the segments it has checkpointed are merged.
+    """
+    from pytest_harvest.dump_codecs import read_dump, iter_segments  # pylint: disable=import-outside-toplevel
+    pkl_file = results_path / ('%s.pkl' % worker_id)
+    if pkl_file.exists():
+        with pkl_file.open('rb') as f:
+            return read_dump(f)
+
+    session_items, fixture_store = [], OrderedDict()
+    with (results_path / ('%s.seg' % worker_id)).open('rb') as f:
+        for _session_items, _fixture_store in iter_segments(f):
+            session_items += _session_items
+            for key, entries in _fixture_store.items():
+                try:
+                    fixture_store[key].update(entries)
+                except KeyError:
+                    fixture_store[key] = entries
+    return session_items, fixture_store
+
+
 class DefaultXDistHarvester(object):
     """
-    A pytest plugin which stores results from xdist nodes and gathers everything in the final master worker session
+    A pytest plugin which stores results from xdist nodes and gathers everything in the final master worker session.
+
+    By default each worker dumps all its results in a file at the end of the session. If checkpoints are enabled
+    (`harvest_xdist_checkpoint_tests` or `harvest_xdist_checkpoint_interval`), each worker rather appends the results
+    of the tests completed since the previous checkpoint to a segments file, so that they are not lost if the worker
+    crashes. As for the `StreamingXDistHarvester`, fixture store entries that are added for a test node after it has
+    been checkpointed are then not gathered.
     """
     def __init__(self, config):
-        # Folder in which temporary worker's results will be stored
-        self.results_path = Path('./.xdist_harvested/')
+        # Folder in which temporary worker's results will be stored: a unique subfolder of the harvest folder for each
+        # run, so that concurrent sessions do not interfere. Workers receive its path from the master.
+        workerinput = getattr(config, 'workerinput', None)
+        if workerinput is not None and XDIST_RUN_DIR_KEY in workerinput:
+            self.results_path = Path(workerinput[XDIST_RUN_DIR_KEY])
+            self.remove_harvest_dir = False
+        else:
+            harvest_dir = config.getoption('harvest_xdist_dir') or config.getini('harvest_xdist_dir')
+            self.results_path = Path(harvest_dir).absolute() / new_run_id()
+            # the harvest folder may be removed at the end of the session only if it belongs to us, that is, if it is
+            # the default one or if it does not exist yet. A folder provided by the user is never removed.
+            self.remove_harvest_dir = harvest_dir == XDIST_DEFAULT_DIR or not self.results_path.parent.exists()
+        # Compression codec of the dumps
+        self.codec = config.getini('harvest_xdist_dump_codec')
+        if self.codec != 'none':
+            from pytest_harvest.dump_codecs import check_codec  # pylint: disable=import-outside-toplevel
+            check_codec(self.codec)
+
+        # Checkpoints (not needed when results are streamed to the master)
+        self.checkpoint_tests = int(config.getini('harvest_xdist_checkpoint_tests'))
+        self.checkpoint_interval = float(config.getini('harvest_xdist_checkpoint_interval'))
+        self.checkpoints = (self.checkpoint_tests > 0 or self.checkpoint_interval > 0) \
+            and not (config.getoption('harvest_xdist_stream') or config.getini('harvest_xdist_stream'))
+        self.session = None
+        self._last_checkpoint = None
+        self._pending_items = []  # the items completed since the last checkpoint
+
+    def pytest_sessionstart(self, session):
+        self.session = session
+        self._last_checkpoint = monotonic()
+
+    def pytest_runtest_logreport(self, report):
+        session = self.session
+        if not self.checkpoints or session is None or report.when != 'teardown' or not is_xdist_worker(session):
+            return
+        item = get_session_items_index(session).get_item(report.nodeid)
+        if item is not None:
+            self._pending_items.append(item)
+        if len(self._pending_items) >= self.checkpoint_tests > 0 \
+                or monotonic() - self._last_checkpoint >= self.checkpoint_interval > 0:
+            self._checkpoint(get_xdist_worker_id(session), FIXTURE_STORE)
+
+    def _checkpoint(self, worker_id, fixture_store):
+        """Appends the items completed since the last checkpoint and their fixture store entries to the segments"""
+        from pytest_harvest.dump_codecs import append_segment  # pylint: disable=import-outside-toplevel
+        items, self._pending_items = self._pending_items, []
+        self._last_checkpoint = monotonic()
+        if len(items) == 0:
+            return
+
+        index = get_nodeid_index(fixture_store)
+        entries = OrderedDict()
+        for item in items:
+            for key, value in index.get_entries(fixture_store, item.nodeid):
+                try:
+                    entries[key][item.nodeid] = value
+                except KeyError:
+                    entries[key] = OrderedDict([(item.nodeid, value)])
+
+        # note: the file is never overwritten, so that a restarted worker with the same id keeps the previous segments
+        with open(str(self.results_path / ('%s.seg' % worker_id)), 'ab') as f:
+            first_segment = f.tell() == 0
+            try:
+                append_segment(f, ([get_persistable_session_item(item) for item in items], entries), self.codec)
+            except Exception as e:
+                warning("Error while pickling worker %s's harvested results: [%s] %s", (worker_id, e.__class__, e))
+        self._update_modules_index(worker_id, set(get_item_module_name(item) for item in items), create=first_segment)
+
+    def _update_modules_index(self, worker_id, module_names, create):
+        """
+        Updates the small index of the modules of the tests run by a worker, so that the master can load only what it
+        needs. The index is removed if the module of a test is unknown.
+
+        :param create: True to create the index with `module_names` only. If False, `module_names` are added to the
+            existing index, if any.
+        """
+        index_file = self.results_path / ('%s.modules.json' % worker_id)
+        if not create:
+            try:
+                with index_file.open() as f:
+                    module_names = module_names.union(json.load(f))
+            except (OSError, ValueError):
+                # no index: some previous tests are in unknown modules
+                return
+        if None in module_names:
+            if index_file.exists():
+                index_file.unlink()
+        else:
+            with index_file.open('w') as f:
+                json.dump(sorted(module_names), f)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        # xdist hook, called on the master for each worker (including restarted ones)
+        node.workerinput[XDIST_RUN_DIR_KEY] = str(self.results_path)
 
     @pytest.hookimpl(trylast=True)
     def pytest_harvest_xdist_init(self):
-        # reset the recipient folder
-        if self.results_path.exists():
-            rmtree(str(self.results_path))
-        self.results_path.mkdir(exist_ok=False)
+        # create the recipient folder of this run
+        self.results_path.mkdir(parents=True, exist_ok=False)
         return True
 
     @pytest.hookimpl(trylast=True)
     def pytest_harvest_xdist_worker_dump(self, worker_id, session_items, fixture_store):
+        if self.checkpoints:
+            # a last checkpoint
+            self._checkpoint(worker_id, fixture_store)
+            return True
+
+        from pytest_harvest.dump_codecs import write_dump  # pylint: disable=import-outside-toplevel
         with open(str(self.results_path / ('%s.pkl' % worker_id)), 'wb') as f:
             try:
-                pickle.dump((session_items, fixture_store), f)
+                write_dump(f, (session_items, fixture_store), self.codec)
             except Exception as e:
                 warning("Error while pickling worker %s's harvested results: [%s] %s", (worker_id, e.__class__, e))
+        self._update_modules_index(worker_id, set(get_item_module_name(item) for item in session_items
+                                                  if not is_pytest_incomplete(item)), create=True)
         return True
 
     @pytest.hookimpl(trylast=True)
-    def pytest_harvest_xdist_load(self):
+    def pytest_harvest_xdist_load(self, module_names, restored_workers):
+        worker_ids = sorted(set(f.stem for pattern in ('*.pkl', '*.seg') for f in self.results_path.glob(pattern))
+                            - restored_workers)
+        if module_names is not None:
+            worker_ids = [wid for wid in worker_ids if self._may_contain_modules(wid, module_names)]
+
+        # the files are read in parallel, which is faster for large files or network-mounted workspaces
         workers_saved_material = dict()
-        for pkl_file in self.results_path.glob('*.pkl'):
-            wid = pkl_file.stem
-            with pkl_file.open('rb') as f:
-                workers_saved_material[wid] = pickle.load(f)
+        if len(worker_ids) > 0:
+            from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+            with ThreadPoolExecutor(max_workers=min(XDIST_LOAD_THREADS, len(worker_ids))) as pool:
+                for wid, material in zip(worker_ids, pool.map(lambda _wid: _load_worker_dump(self.results_path, _wid),
+                                                              worker_ids)):
+                    workers_saved_material[wid] = material
         return workers_saved_material
 
+    def _may_contain_modules(self, worker_id, module_names):
+        """Returns False if the modules index of worker `worker_id` shows that it did not run tests in `module_names`"""
+        try:
+            with open(str(self.results_path / ('%s.modules.json' % worker_id))) as f:
+                return not set(module_names).isdisjoint(json.load(f))
+        except (OSError, ValueError):
+            # no index
+            return True
+
     @pytest.hookimpl(trylast=True)
     def pytest_harvest_xdist_cleanup(self):
-        # delete all temporary pickle files
+        # delete the folder of this run, and the harvest folder if it is ours and no other session is using it
         rmtree(str(self.results_path))
+        if self.remove_harvest_dir:
+            try:
+                self.results_path.parent.rmdir()
+            except OSError:
+                pass
+        return True
+
+
+HARVEST_RECORD_ATTR = 'harvest_record'
+"""The name of the report attribute used by `StreamingXDistHarvester` to send each test record to the xdist master"""
+
+
+class StreamingXDistHarvester(object):
+    """
+    An alternative to `DefaultXDistHarvester`, enabled with the `--harvest-xdist-stream` option. Instead of dumping all
+    their results in a file at the end of the session, xdist workers send a compact record of each test to the master
+    as soon as it is complete: the persistable item and its fixture store entries are pickled and attached to the
+    teardown report, that xdist serializes and sends to the master. The master gathers the records as they arrive, so
+    nothing is written on disk. Once the results have been restored in the master session (the first time they are
+    accessed, possibly during the session), the records that arrive are directly added to the session results.
+
+    Note that fixture store entries that are added for a test node after its teardown are not sent to the master.
+    """
+    def __init__(self, config):
+        self.session = None
+        # the material received on the master {worker_id: (session_items, fixture_store)}
+        self.workers_material = OrderedDict()
+        # True once the material has been loaded by `possibly_restore_xdist_workers_structs`
+        self.loaded = False
+
+    def pytest_sessionstart(self, session):
+        self.session = session
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_logreport(self, report):
+        # note: this wraps the other implementations, in particular the one of xdist that serializes the report on the
+        # workers to send it to the master
+        session = self.session
+        if session is not None and report.when == 'teardown':
+            if is_xdist_worker(session):
+                self._attach_record(session, report)
+            elif is_xdist_master(session):
+                self._receive_record(session, report)
+
+        yield
+
+        # the record was sent to the master: do not keep it in the report, that is also kept by the item
+        if getattr(report, HARVEST_RECORD_ATTR, None) is not None:
+            delattr(report, HARVEST_RECORD_ATTR)
+
+    def _attach_record(self, session, report):
+        """On a worker, attaches the record of the test node of teardown report `report` to it"""
+        item = get_session_items_index(session).get_item(report.nodeid)
+        if item is not None:
+            entries = OrderedDict(get_nodeid_index(FIXTURE_STORE).get_entries(FIXTURE_STORE, item.nodeid))
+            try:
+                record = pickle.dumps((get_persistable_session_item(item), entries))
+            except Exception as e:
+                warning("Error while pickling harvested results of %s: [%s] %s", item.nodeid, e.__class__, e)
+            else:
+                setattr(report, HARVEST_RECORD_ATTR, record)
+
+    def _receive_record(self, session, report):
+        """On the master, gathers the record attached to teardown report `report` if any, and removes it"""
+        record = getattr(report, HARVEST_RECORD_ATTR, None)
+        if record is None:
+            return
+
+        # the record is not needed in the report anymore
+        delattr(report, HARVEST_RECORD_ATTR)
+        item, entries = pickle.loads(record)
+        if self.loaded:
+            # the results were already restored in the session: add this record directly
+            _restore_worker_material(session, [item], OrderedDict(
+                (key, OrderedDict([(item.nodeid, value)])) for key, value in entries.items()))
+            get_module_results_cache(session).invalidate_module(get_item_module_name(item))
+            return
+        wid = getattr(report, 'worker_id', None) or getattr(getattr(report, 'node', None), 'workerid', None)
+        session_items, store = self.workers_material.setdefault(wid, ([], OrderedDict()))
+        session_items.append(item)
+        for key, value in entries.items():
+            try:
+                store[key][item.nodeid] = value
+            except KeyError:
+                store[key] = OrderedDict([(item.nodeid, value)])
+
+    def pytest_harvest_xdist_init(self):
+        self.workers_material.clear()
+        self.loaded = False
+        return True
+
+    def pytest_harvest_xdist_worker_dump(self, worker_id, session_items, fixture_store):
+        # everything was already sent to the master
+        return True
+
+    def pytest_harvest_xdist_load(self, module_names, restored_workers):
+        # note: all the material is returned whatever `module_names`, so everything is restored in the session now
+        self.loaded = True
+        return OrderedDict((wid, material) for wid, material in self.workers_material.items()
+                           if wid not in restored_workers)
+
+    def pytest_harvest_xdist_cleanup(self):
         return True
 
 
 @pytest.mark.trylast
 def pytest_configure(config):
+    config._harvest_slim_reports = config.getoption('harvest_slim_reports') or config.getini('harvest_slim_reports')
     config.pluginmanager.register(DefaultXDistHarvester(config))
+    if config.getoption('harvest_xdist_stream') or config.getini('harvest_xdist_stream'):
+        # its hooks are called before the ones of the default harvester, and bypass them
+        config.pluginmanager.register(StreamingXDistHarvester(config), 'harvest_xdist_stream')
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_sessionstart(session):
     """ This should run first as it creates the temporary folder when run on the xdist master."""
+    config = session.config
+    jsonl_path = config.getoption('harvest_jsonl') or config.getini('harvest_jsonl')
+    if jsonl_path and not is_xdist_master(session):
+        # note: on the xdist master no test is run, the workers write the rows
+        if is_xdist_worker(session):
+            # each worker has its own file
+            root, ext = os.path.splitext(jsonl_path)
+            jsonl_path = "%s.%s%s" % (root, get_xdist_worker_id(session), ext)
+        fsync_interval = float(config.getini('harvest_jsonl_fsync_interval'))
+        from pytest_harvest.results_jsonl import JsonlResultsSink  # pylint: disable=import-outside-toplevel
+        config._harvest_jsonl_sink = JsonlResultsSink(jsonl_path, fsync_interval=fsync_interval)
+        config._harvest_jsonl_evict = config.getoption('harvest_jsonl_evict') or config.getini('harvest_jsonl_evict')
+
+    sqlite_path = config.getoption('harvest_sqlite') or config.getini('harvest_sqlite')
+    if sqlite_path and not is_xdist_worker(session):
+        # note: with xdist, the master writes the results of all workers at the end of the session
+        from pytest_harvest.results_sqlite import SqliteResultsStore  # pylint: disable=import-outside-toplevel
+        config._harvest_sqlite_store = SqliteResultsStore(sqlite_path)
+
+    history_enabled = config.getoption('harvest_history') or config.getini('harvest_history')
+    if history_enabled and not is_xdist_worker(session) and getattr(config, 'cache', None) is not None:
+        # note: with xdist, the master compares the results of all workers at the end of the session
+        _load_results_baseline(session)
+
     if is_xdist_master(session):
         # perform cleanup
         session.config.hook.pytest_harvest_xdist_init()
@@ -441,6 +1215,10 @@ def pytest_sessionstart(session):
 @pytest.hookimpl(trylast=True)
 def pytest_sessionfinish(session):
     """ This should run last as it deletes the persisted items when run on the xdist master."""
+    jsonl_sink = getattr(session.config, '_harvest_jsonl_sink', None)
+    if jsonl_sink is not None:
+        jsonl_sink.close()
+
     if is_xdist_worker(session):
         # persist fixture store and report items in a pickle file with this id
         wid = get_xdist_worker_id(session)
@@ -448,39 +1226,147 @@ def pytest_sessionfinish(session):
         session.config.hook.pytest_harvest_xdist_worker_dump(worker_id=wid, session_items=session_items,
                                                              fixture_store=FIXTURE_STORE)
 
-    elif is_xdist_master(session):
-        # final master cleanup
-        session.config.hook.pytest_harvest_xdist_cleanup()
-
     else:
-        # xdist not enabled - nothing to do
-        pass
+        # export the results if required (this reloads the workers results in case of xdist)
+        parquet_path = session.config.getoption('harvest_parquet')
+        if parquet_path is not None:
+            write_session_results_parquet(session, parquet_path)
 
+        sqlite_store = getattr(session.config, '_harvest_sqlite_store', None)
+        if sqlite_store is not None:
+            if is_xdist_master(session):
+                sqlite_store.write_rows(get_session_results_dct(session).items())
+            sqlite_store.close()
 
-def possibly_restore_xdist_workers_structs(session):
+        if getattr(session.config, '_harvest_history', None) is not None:
+            _update_results_history(session)
+
+        if is_xdist_master(session):
+            # final master cleanup
+            session.config.hook.pytest_harvest_xdist_cleanup()
+
+
+def _load_results_baseline(session):
     """
-    If this is the xdist master
-    :param session:
+    Loads the `ResultsHistory` from the pytest cache, and attaches the `ResultsBaseline` of the session to it so that
+    the synthesis rows contain the baseline information.
+    """
+    from pytest_harvest.results_history import (  # pylint: disable=import-outside-toplevel
+        ResultsHistory, ResultsBaseline)
+
+    config = session.config
+    history = ResultsHistory.load(config.cache, max_runs=int(config.getini('harvest_history_size')))
+    baseline = config.getoption('harvest_baseline') or config.getini('harvest_baseline')
+    threshold = config.getoption('harvest_slowdown_threshold')
+    if threshold is None:
+        threshold = float(config.getini('harvest_slowdown_threshold'))
+
+    baseline_durations = history.get_baseline(baseline)
+    if baseline_durations is None and baseline not in ('last', 'median'):
+        warning("[pytest-harvest] No run with tag %r was found in the results history. No baseline will be used."
+                % baseline)
+    baseline_fields = {field: history.get_baseline(baseline, field=field) or {}
+                       for field in config.getini('harvest_history_fields')}
+
+    config._harvest_history = history
+    setattr(session, RESULTS_BASELINE_ATTR,
+            ResultsBaseline(baseline_durations or {}, fields=baseline_fields, threshold=threshold,
+                            min_duration=float(config.getini('harvest_slowdown_min_duration'))))
+
+
+def _update_results_history(session):
+    """
+    Adds the durations of the passed tests of this session (and the `harvest_history_fields` of their results bags)
+    to the results history, and remembers the slowdowns compared to the baseline for the terminal summary.
+    """
+    config = session.config
+
+    # in case of xdist, make sure persisted workers results have been reloaded
+    possibly_restore_xdist_workers_structs(session)
+
+    durations = OrderedDict()
+    for item in session.items:
+        (test_status, test_duration), _ = get_pytest_status(item)
+        if test_status == 'passed' and test_duration is not None:
+            durations[item.nodeid] = test_duration
+    from pytest_harvest.results_history import get_numeric_fields  # pylint: disable=import-outside-toplevel
+    fields = get_numeric_fields(FIXTURE_STORE.get('results_bag', {}), config.getini('harvest_history_fields'))
+
+    config._harvest_slowdowns = getattr(session, RESULTS_BASELINE_ATTR).get_slowdowns(durations)
+    config._harvest_history.add_run(durations, fields=fields, tag=config.getoption('harvest_history_tag'))
+    config._harvest_history.save(config.cache)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Reports the slowdowns detected by the --harvest-history option, if any"""
+    slowdowns = getattr(config, '_harvest_slowdowns', None)
+    if slowdowns:
+        baseline = config.getoption('harvest_baseline') or config.getini('harvest_baseline')
+        terminalreporter.write_sep("=", "pytest-harvest: %s slowdown(s) compared to baseline '%s'"
+                                   % (len(slowdowns), baseline), yellow=True)
+        for nodeid, base, duration, change in slowdowns:
+            change_str = "" if change is None else " (%+.0f%%)" % (change * 100)
+            terminalreporter.write_line("%s: %.2fms -> %.2fms%s" % (nodeid, base * 1000, duration * 1000, change_str))
+
+
+def possibly_restore_xdist_workers_structs(session_or_request,
+                                           module_name=None  # type: str
+                                           ):
+    """
+    If this is the xdist master, loads the session items and fixture store entries persisted by the xdist workers
+    (with the `pytest_harvest_xdist_load` hook) into `session.items` and `FIXTURE_STORE`, if this was not already done.
+
+    :param session_or_request: the pytest session or request
+    :param module_name: an optional module name. If provided, only the material of the workers that ran tests in this
+        module may be loaded, the other workers are loaded later if needed.
     :return:
     """
-    if is_xdist_master(session) and hasattr(FIXTURE_STORE, 'disabled'):
+    if is_xdist_master(session_or_request) and hasattr(FIXTURE_STORE, 'disabled'):
+        session = getattr(session_or_request, 'session', session_or_request)
+        try:
+            restored_workers = session._harvest_restored_workers
+            restored_modules = session._harvest_restored_modules
+        except AttributeError:
+            # first time
+            assert len(FIXTURE_STORE) == 0  # make sure nothing was added in there in between
+            session.items = []
+            restored_workers = session._harvest_restored_workers = set()
+            restored_modules = session._harvest_restored_modules = set()
+        else:
+            if module_name is not None and module_name in restored_modules:
+                return
+
         # load saved session items and fixtures
-        workers_saved_material = session.config.hook.pytest_harvest_xdist_load()
+        workers_saved_material = session.config.hook.pytest_harvest_xdist_load(
+            module_names=None if module_name is None else [module_name], restored_workers=frozenset(restored_workers))
 
         # restore them into the same variables used by pytest-harvest
-        delattr(FIXTURE_STORE, 'disabled')
-        assert len(FIXTURE_STORE) == 0  # make sure nothing was added in there in between
-        session.items = []
+        get_synthesis_cache(session).clear()
+        get_module_results_cache(session).clear()
         for wid, (session_items, store) in workers_saved_material.items():
-            # session items
-            session.items += session_items
-
-            # saved fixtures
-            for fixture_name, _saved_fixture_dct in store.items():
-                try:
-                    saved_fixture_dct = FIXTURE_STORE[fixture_name]
-                except KeyError:
-                    FIXTURE_STORE[fixture_name] = _saved_fixture_dct
-                else:
-                    assert len(set(saved_fixture_dct.keys()).intersection(set(_saved_fixture_dct.keys()))) == 0
-                    saved_fixture_dct.update(_saved_fixture_dct)
+            if wid in restored_workers:
+                continue
+            restored_workers.add(wid)
+            _restore_worker_material(session, session_items, store)
+
+        if module_name is None:
+            # everything is loaded
+            delattr(FIXTURE_STORE, 'disabled')
+        else:
+            restored_modules.add(module_name)
+
+
+def _restore_worker_material(session, session_items, store):
+    """Adds the session items and fixture store entries of a xdist worker to `session.items` and `FIXTURE_STORE`"""
+    # session items
+    session.items += session_items
+
+    # saved fixtures
+    for fixture_name, _saved_fixture_dct in store.items():
+        try:
+            saved_fixture_dct = FIXTURE_STORE[fixture_name]
+        except KeyError:
+            FIXTURE_STORE[fixture_name] = _saved_fixture_dct
+        else:
+            assert len(set(saved_fixture_dct.keys()).intersection(set(_saved_fixture_dct.keys()))) == 0
+            saved_fixture_dct.update(_saved_fixture_dct)
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from itertools import islice
+
+try:  # python 3.5+
+    from typing import Any, Callable, Iterable, List, Mapping, Tuple
+except ImportError:
+    pass
+
+from pytest_harvest.common import get_qualified_name
+from pytest_harvest.results_session import PYTEST_OBJ_NAME, TEST_ID_COLUMN, synthesis_rows_to_columns
+
+
+PARQUET_BATCH_SIZE = 10000
+"""The default number of rows written in each parquet record batch by `write_synthesis_parquet`"""
+
+
+def _import_pyarrow(what):
+    """Imports and returns the `pyarrow` module, raising an explicit error if it is not installed"""
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise Exception("There was an error importing `pyarrow` module. %s can not be used in this session." % what) \
+            from e
+    return pa
+
+
+def _to_arrow_array(pa, col_name, values, arrow_type=None):
+    """
+    Converts a list of python values into an arrow array, of type `arrow_type` if provided. The pytest objects are
+    converted to their qualified name, and columns that arrow can not convert are converted to strings.
+    """
+    if col_name == PYTEST_OBJ_NAME:
+        values = [get_qualified_name(v) for v in values]
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowException, TypeError, ValueError, OverflowError):
+        # objects that arrow can not convert: use their string representation
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _unify_arrow_types(pa, arrow_types):
+    """Returns an arrow type able to hold values of all types in `arrow_types`"""
+    arrow_types = set(t for t in arrow_types if not pa.types.is_null(t))
+    if len(arrow_types) == 0:
+        return pa.null()
+    elif len(arrow_types) == 1:
+        return arrow_types.pop()
+    elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in arrow_types):
+        return pa.float64()
+    else:
+        return pa.string()
+
+
+def _get_arrow_types(pa, dtypes):
+    """Converts a dictionary {column_name: python type} into {column_name: arrow type}, for the supported types"""
+    arrow_types = {int: pa.int64(), float: pa.float64(), bool: pa.bool_(), str: pa.string()}
+    return {col_name: arrow_types[t] for col_name, t in (dtypes or {}).items() if t in arrow_types}
+
+
+def columns_to_arrow_table(columns,     # type: Mapping[str, List[Any]]
+                           dtypes=None  # type: Mapping[str, type]
+                           ):
+    """
+    Converts a columnar synthesis (see `get_session_synthesis_columns`) into a `pyarrow.Table`. Column types are
+    inferred by arrow, the `pytest_obj` column contains the qualified name of the test functions, and columns that
+    arrow can not convert contain the string representation of their values.
+
+    :param columns: a dictionary {column_name: list of values}
+    :param dtypes: an optional dictionary {column_name: python type} (for example the schema of a `TypedResultsBag`).
+        Columns with type `int`, `float`, `bool` or `str` are directly created with the corresponding arrow type.
+    :return: a `pyarrow.Table`
+    """
+    pa = _import_pyarrow("`columns_to_arrow_table`")
+    arrow_types = _get_arrow_types(pa, dtypes)
+    return pa.table(OrderedDict((col_name, _to_arrow_array(pa, col_name, values, arrow_types.get(col_name)))
+                                for col_name, values in columns.items()))
+
+
+def _iter_column_batches(rows,       # type: Iterable[Tuple[str, Mapping[str, Any]]]
+                         batch_size  # type: int
+                         ):
+    """Yields a columnar synthesis (see `synthesis_rows_to_columns`) for each batch of `batch_size` rows"""
+    rows = iter(rows)
+    while True:
+        columns = synthesis_rows_to_columns(islice(rows, batch_size))
+        if len(columns[TEST_ID_COLUMN]) == 0:
+            # no more rows
+            return
+        yield columns
+
+
+def write_synthesis_parquet(path,                           # type: str
+                            rows_factory,                   # type: Callable[[], Iterable[Tuple[str, Mapping]]]
+                            batch_size=PARQUET_BATCH_SIZE,  # type: int
+                            dtypes=None                     # type: Mapping[str, type]
+                            ):
+    # type: (...) -> int
+    """
+    Writes the flattened synthesis rows to a parquet file, one record batch of `batch_size` rows at a time, so that
+    the whole synthesis is never held in memory.
+
+    Since the parquet schema has to be known before writing, the rows are iterated twice: a first pass determines the
+    columns and their arrow types, and the second pass writes the batches. This is why a factory creating the rows
+    iterable is required, for example `lambda: iter_session_synthesis(session, flatten=True, ...)`.
+
+    :param path: the path of the parquet file to write
+    :param rows_factory: a callable without arguments returning a new iterable of flattened synthesis
+        `(test_id, row)` tuples each time it is called.
+    :param batch_size: the number of rows in each record batch
+    :param dtypes: an optional dictionary {column_name: python type}, see `columns_to_arrow_table`. The type of these
+        columns does not need to be inferred in the first pass.
+    :return: the number of rows written
+    """
+    pa = _import_pyarrow("`write_synthesis_parquet` and the --harvest-parquet option")
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    # (1) determine the schema
+    arrow_types = _get_arrow_types(pa, dtypes)
+    col_types = OrderedDict()
+    for columns in _iter_column_batches(rows_factory(), batch_size):
+        for col_name, values in columns.items():
+            known_type = arrow_types.get(col_name)
+            col_types.setdefault(col_name, []).append(known_type if known_type is not None
+                                                      else _to_arrow_array(pa, col_name, values).type)
+    schema = pa.schema([(col_name, _unify_arrow_types(pa, arrow_types)) for col_name, arrow_types in col_types.items()])
+
+    # (2) write the batches
+    nb_rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for columns in _iter_column_batches(rows_factory(), batch_size):
+            batch_len = len(columns[TEST_ID_COLUMN])
+            arrays = [_to_arrow_array(pa, field.name, columns.get(field.name, [None] * batch_len), field.type)
+                      for field in schema]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            nb_rows += batch_len
+
+    return nb_rows
@@ -1,4 +1,6 @@
-from typing import Type, Union, Any, Dict
+from collections import OrderedDict
+from numbers import Number
+from typing import Type, Union, Any, Dict, Iterable, Mapping, Optional
 
 from pytest_harvest.common import yield_fixture
 from pytest_harvest.fixture_cache import saved_fixture
@@ -47,20 +49,114 @@ class ResultsBag(dict):
 assert isinstance(ResultsBag(), dict)
 
 
+def _check_schema(schema  # type: Mapping[str, Type[Any]]
+                  ):
+    # type: (...) -> Mapping[str, Type[Any]]
+    """Checks that `schema` is a dict-like {field name: type} and returns a copy of it"""
+    schema = OrderedDict(schema)
+    for field, field_type in schema.items():
+        if not isinstance(field, str) or not isinstance(field_type, type):
+            raise TypeError("Invalid results bag schema entry %r: %r. A schema should be a dict-like "
+                            "{field name: type}" % (field, field_type))
+    return schema
+
+
+def _coerce_value(field, field_type, value):
+    """Returns `value` converted to `field_type`, or raises a `TypeError` if this is not possible without loss"""
+    if value is None or isinstance(value, field_type):
+        return value
+    try:
+        if field_type is bool:
+            # bool(x) is True for most objects, only accept 0 and 1 (including numpy booleans)
+            if value not in (0, 1):
+                raise ValueError()
+        coerced = field_type(value)
+        if isinstance(value, Number) and coerced != value:
+            # for example int(1.5)
+            raise ValueError()
+    except (TypeError, ValueError) as e:
+        raise TypeError("Invalid value for results bag field %r: %r can not be converted to %s"
+                        % (field, value, field_type.__name__)) from e
+    return coerced
+
+
+class TypedResultsBag(ResultsBag):
+    """
+    A `ResultsBag` with a schema: a dict-like {field name: type}. When a field of the schema is set, its value is
+    validated and converted to the declared type (for example an integer stored in a `float` field becomes a float),
+    and a `TypeError` is raised if this is not possible. `None` is always accepted. Fields that are not in the schema
+    can still be set, without validation.
+
+    The schema is then used to create typed result columns in the `[module/session]_results_df` fixtures and their
+    associated getter functions.
+    """
+
+    def __init__(self, schema, *args, **kwargs):
+        # the schema is not an entry of the dict
+        object.__setattr__(self, '__schema__', _check_schema(schema))
+        super(TypedResultsBag, self).__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        # note: during unpickling, the entries are restored before the schema. They were already validated.
+        field_type = getattr(self, '__schema__', {}).get(key, None)
+        if field_type is not None:
+            value = _coerce_value(key, field_type, value)
+        super(TypedResultsBag, self).__setitem__(key, value)
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def __repr__(self):
+        return "TypedResultsBag:\n" + dict.__repr__(self)
+
+
+def get_results_bag_schema(fixture_store,  # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                           name            # type: str
+                           ):
+    # type: (...) -> Optional[Mapping[str, Type[Any]]]
+    """
+    Returns the schema of the results bags stored under key `name` in `fixture_store`, or `None` if they are not
+    `TypedResultsBag`s. Only the first stored results bag is inspected, since they are all created by the same fixture.
+
+    :param fixture_store: a fixture store or an iterable of fixture stores
+    :param name: the name of the results bag fixture in the store
+    :return:
+    """
+    stores = (fixture_store,) if hasattr(fixture_store, 'items') else fixture_store
+    for store in stores:
+        for bag in store.get(name, {}).values():
+            return getattr(bag, '__schema__', None)
+    return None
+
+
 def _results_bag_fixture_impl(bag_type=None,                  # type: Type[Any]
+                              schema=None,                    # type: Mapping[str, Type[Any]]
                               ):
     """
     Implementation of a results bag fixture. It creates a `ResultsBag` by default, or an object of custom `bag_type`.
 
     Note: we do not measure time here anymore because it is less precise than pytest duration
 
-    :param bag_type: the type of object to create as results bag. Default: `ResultsBag`
+    :param bag_type: the type of object to create as results bag. Default: `ResultsBag`, or `TypedResultsBag` if a
+        schema is provided.
+    :param schema: an optional schema for the results bag
     :return:
     """
 
     # Create the results bag
-    bag_type = ResultsBag if bag_type is None else bag_type
-    results_bag = bag_type()
+    if schema is None:
+        bag_type = ResultsBag if bag_type is None else bag_type
+        results_bag = bag_type()
+    else:
+        bag_type = TypedResultsBag if bag_type is None else bag_type
+        results_bag = bag_type(schema)
 
     # Yield it - note: we do not measure time anymore because it is less precise than pytest duration
     # start = datetime.now()
@@ -74,21 +170,34 @@ def _results_bag_fixture_impl(bag_type=None,                  # type: Type[Any]
 def create_results_bag_fixture(store,                        # type: Union[str, Dict[str, Any]]
                                name='results_bag',             # type: str
                                bag_type=None,                  # type: Type[Any]
+                               schema=None,                    # type: Mapping[str, Type[Any]]
                                ):
     """
     Creates a "results bag" fixture with name `name` stored in the given store (under key=`name`). By default results
     bags are instances of `ResultsBag` but you can provide another `bag_type` if needed.
 
+    If a `schema` is provided, results bags are `TypedResultsBag`s: the values of the fields declared in the schema
+    are validated and converted to the declared type when they are set. The corresponding columns in the
+    `[module/session]_results_df` fixtures and their associated getter functions then have a native dtype.
+
     :param store: a dict-like object or a fixture name corresponding to a dict-like object. in this dictionary, a new
         entry will be added for the fixture. This entry will contain a dictionary <test_id>: <fixture_value> for each
         test node.
     :param name: the name associated with the stored fixture in the global store. By default this is 'results_bag'.
-    :param bag_type: the type of object to create as a results bag. Default: `ResultsBag`
+    :param bag_type: the type of object to create as a results bag. Default: `ResultsBag`, or `TypedResultsBag` if a
+        `schema` is provided. In that case a custom `bag_type` should be a subclass of `TypedResultsBag`.
+    :param schema: an optional dict-like {field name: type}, for example `{'accuracy': float, 'nb_iter': int}`.
     :return:
     """
+    if schema is not None:
+        schema = _check_schema(schema)
+        if bag_type is not None and not issubclass(bag_type, TypedResultsBag):
+            raise ValueError("`bag_type` should be a subclass of `TypedResultsBag` when a `schema` is provided, found "
+                             "%r" % bag_type)
+
     # Create the same function than _results_bag_fixture_impl but with preset arguments (same than functools.partial)
     def _results_bag():
-        gen = _results_bag_fixture_impl(bag_type=bag_type)
+        gen = _results_bag_fixture_impl(bag_type=bag_type, schema=schema)
         for res in gen:
             yield res
 
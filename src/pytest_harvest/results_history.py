@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from numbers import Number
+from statistics import median
+from time import time
+
+try:  # python 3.5+
+    from typing import Any, Iterable, List, Mapping, Optional, Tuple
+except ImportError:
+    pass
+
+from pytest_harvest.common import new_run_id
+from pytest_harvest.results_session import RESULTS_BASELINE_ATTR
+
+
+HISTORY_CACHE_KEY = 'harvest/history'
+"""The key of the results history in the pytest cache (`config.cache`)"""
+
+
+class ResultsHistory(object):
+    """
+    A compact history of the durations (in seconds) of the passed tests and of some numeric results bag fields, for the
+    last `max_runs` runs. Runs with a tag are kept even when they are older than that, so that they can be used as a
+    named baseline.
+
+    It is stored as json in the pytest cache (typically under `.pytest_cache`), see `load` and `save`.
+    """
+    __slots__ = ('runs', 'max_runs')
+
+    def __init__(self,
+                 runs=(),     # type: Iterable[Mapping[str, Any]]
+                 max_runs=10  # type: int
+                 ):
+        """
+        :param runs: the runs, from the oldest to the most recent. Each run is a dictionary with keys 'run_id', 'tag',
+            'time', 'durations' ({nodeid: duration}) and 'fields' ({field: {nodeid: value}}).
+        :param max_runs: the maximum number of untagged runs to keep.
+        """
+        self.runs = list(runs)
+        self.max_runs = max_runs
+
+    @classmethod
+    def load(cls, cache, max_runs=10):
+        """Loads the history from a pytest cache (`config.cache`). An empty history is returned if there is none."""
+        return cls(runs=cache.get(HISTORY_CACHE_KEY, {}).get('runs', ()), max_runs=max_runs)
+
+    def save(self, cache):
+        """Saves the history in a pytest cache (`config.cache`)"""
+        cache.set(HISTORY_CACHE_KEY, {'runs': self.runs})
+
+    def add_run(self,
+                durations,    # type: Mapping[str, float]
+                fields=None,  # type: Mapping[str, Mapping[str, float]]
+                tag=None,     # type: str
+                run_id=None   # type: str
+                ):
+        """
+        Adds a run to the history, and removes the oldest untagged runs if there are more than `max_runs`.
+
+        :param durations: a dictionary {nodeid: duration in seconds}
+        :param fields: an optional dictionary {field name: {nodeid: value}}
+        :param tag: an optional tag for this run, to use it as a named baseline later
+        :param run_id: an optional run id. By default a new one is created.
+        """
+        self.runs.append(OrderedDict([('run_id', run_id or new_run_id()), ('tag', tag), ('time', time()),
+                                      ('durations', dict(durations)), ('fields', dict(fields or {}))]))
+        nb_untagged = sum(1 for run in self.runs if run['tag'] is None)
+        if nb_untagged > self.max_runs:
+            to_remove = nb_untagged - self.max_runs
+            kept_runs = []
+            for run in self.runs:
+                if to_remove > 0 and run['tag'] is None:
+                    to_remove -= 1
+                else:
+                    kept_runs.append(run)
+            self.runs = kept_runs
+
+    def get_baseline(self,
+                     baseline='last',  # type: str
+                     field=None        # type: str
+                     ):
+        # type: (...) -> Optional[Mapping[str, float]]
+        """
+        Returns the baseline values {nodeid: value} for the durations (default) or for a results bag `field`.
+
+        :param baseline: 'last' to use the most recent run, 'median' to use the median of all runs in the history
+            (computed for each node independently), or the tag of a run to use the most recent run with this tag.
+        :param field: an optional results bag field name. By default the durations are returned.
+        :return: a dictionary {nodeid: value}, or None if there is no such baseline in the history.
+        """
+        def _get_values(run):
+            return run['durations'] if field is None else run['fields'].get(field, {})
+
+        if baseline == 'median':
+            if len(self.runs) == 0:
+                return None
+            all_values = dict()
+            for run in self.runs:
+                for nodeid, value in _get_values(run).items():
+                    all_values.setdefault(nodeid, []).append(value)
+            return {nodeid: median(values) for nodeid, values in all_values.items()}
+
+        elif baseline == 'last':
+            return _get_values(self.runs[-1]) if len(self.runs) > 0 else None
+
+        else:
+            for run in reversed(self.runs):
+                if run['tag'] == baseline:
+                    return _get_values(run)
+            return None
+
+
+class ResultsBaseline(object):
+    """
+    The baseline durations (in seconds) and results bag field values of the tests, computed at the beginning of the
+    session from the `ResultsHistory`. When the `--harvest-history` option is set, it is attached to the session and
+    the synthesis rows are extended with the baseline information (see `fill_row`).
+
+    A test is considered slower than the baseline if its duration is more than `(1 + threshold)` times the baseline
+    duration. Tests where both durations are less than `min_duration` seconds are never flagged, to avoid noise.
+    """
+    __slots__ = ('durations', 'fields', 'threshold', 'min_duration')
+
+    def __init__(self,
+                 durations,          # type: Mapping[str, float]
+                 fields=None,        # type: Mapping[str, Mapping[str, float]]
+                 threshold=0.2,      # type: float
+                 min_duration=0.001  # type: float
+                 ):
+        self.durations = durations
+        self.fields = fields or {}
+        self.threshold = threshold
+        self.min_duration = min_duration
+
+    def get_change(self, nodeid, duration):
+        # type: (...) -> Tuple[Optional[float], Optional[float], bool]
+        """
+        Compares `duration` (in seconds) with the baseline of `nodeid`.
+
+        :return: a tuple (baseline duration, relative change, is_slowdown). The relative change is for example 0.5 if
+            `duration` is 50% more than the baseline. The first two elements are None if there is no baseline.
+        """
+        base = self.durations.get(nodeid, None)
+        if base is None or duration is None:
+            return base, None, False
+        change = (duration - base) / base if base > 0 else None
+        is_slowdown = duration > base * (1 + self.threshold) and max(duration, base) >= self.min_duration
+        return base, change, is_slowdown
+
+    def fill_row(self, item_dct, nodeid, duration, durations_in_ms=False, pytest_prefix=''):
+        """
+        Adds the baseline information to a synthesis row: the baseline duration, the relative duration change, a
+        boolean indicating if it is a slowdown, and the baseline of each results bag field of the history.
+
+        :param item_dct: the synthesis row to fill
+        :param nodeid: the node id of the test
+        :param duration: the duration of the test, in the unit of the synthesis
+        :param durations_in_ms: True if the durations of the synthesis are in milliseconds
+        :param pytest_prefix: the prefix of the synthesis status and duration entries
+        """
+        factor = 1000 if durations_in_ms else 1
+        base, change, is_slowdown = self.get_change(nodeid, None if duration is None else duration / factor)
+        item_dct[pytest_prefix + "baseline_duration_" + ('ms' if durations_in_ms else 's')] = \
+            None if base is None else base * factor
+        item_dct[pytest_prefix + "duration_change"] = change
+        item_dct[pytest_prefix + "slowdown"] = is_slowdown
+        for field, values in self.fields.items():
+            item_dct["baseline_" + field] = values.get(nodeid, None)
+
+    def get_slowdowns(self,
+                      durations  # type: Mapping[str, float]
+                      ):
+        # type: (...) -> List[Tuple[str, float, float, float]]
+        """
+        Returns the list of tests that are slower than the baseline, as (nodeid, baseline, duration, change) tuples
+        sorted by decreasing relative change.
+
+        :param durations: a dictionary {nodeid: duration in seconds}
+        """
+        slowdowns = []
+        for nodeid, duration in durations.items():
+            base, change, is_slowdown = self.get_change(nodeid, duration)
+            if is_slowdown:
+                slowdowns.append((nodeid, base, duration, change))
+        slowdowns.sort(key=lambda s: -(s[3] if s[3] is not None else float('inf')))
+        return slowdowns
+
+
+def get_numeric_fields(results_bags,  # type: Mapping[str, Mapping[str, Any]]
+                       field_names    # type: Iterable[str]
+                       ):
+    # type: (...) -> Mapping[str, Mapping[str, float]]
+    """
+    Extracts the numeric values of the given fields from the results bags {nodeid: results bag}.
+
+    :return: a dictionary {field name: {nodeid: value}}
+    """
+    fields = OrderedDict()
+    for field in field_names:
+        fields[field] = {nodeid: float(bag[field]) for nodeid, bag in results_bags.items()
+                         if isinstance(bag.get(field, None), Number) and not isinstance(bag[field], bool)}
+    return fields
@@ -0,0 +1,112 @@
+import json
+import os
+from time import monotonic
+
+try:  # python 3.5+
+    from typing import Any, Mapping
+except ImportError:
+    pass
+
+from pytest_harvest.common import get_qualified_name
+from pytest_harvest.results_session import PYTEST_OBJ_NAME, TEST_ID_COLUMN
+
+
+def _to_json_value(obj):
+    """Default json encoder for the values of a synthesis row that are not natively serializable"""
+    if callable(obj):
+        return get_qualified_name(obj)
+    try:
+        # numpy scalars
+        return obj.item()
+    except (AttributeError, ValueError):
+        return str(obj)
+
+
+class JsonlResultsSink(object):
+    """
+    An append-only JSON-lines file where one flattened synthesis row is written per test node, as soon as the node
+    is complete. Since each line is a complete json document, the rows of the tests that completed before a crash
+    (OOM, CI timeout...) can still be read even if the session did not end properly.
+
+    Each line is written to the file (and flushed from the python buffers to the OS) as soon as its row is added, so
+    that it survives a crash of the process. Only the syncs to disk with `os.fsync`, that protect against a crash of
+    the machine, are rate-limited: they happen at most every `fsync_interval` seconds. `close` syncs everything.
+    """
+    __slots__ = ('path', 'fsync_interval', '_file', '_last_fsync', 'nb_rows')
+
+    def __init__(self,
+                 path,                # type: str
+                 fsync_interval=1.0,  # type: float
+                 ):
+        """
+        :param path: the path of the file. If it already exists, new rows are appended to it.
+        :param fsync_interval: the minimum number of seconds between two syncs of the file to disk. Use 0 to sync at
+            each write.
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._file = open(path, 'a', encoding='utf-8')
+        self._last_fsync = monotonic()
+        self.nb_rows = 0
+
+    def write_row(self,
+                  test_id,  # type: str
+                  row       # type: Mapping[str, Any]
+                  ):
+        """
+        Appends a flattened synthesis row to the file. The test id is stored under key 'test_id', and the test object
+        under key 'pytest_obj' is replaced with its qualified name.
+
+        :param test_id: the test id
+        :param row: the flattened synthesis row, see `get_session_synthesis_dct(flatten=True)`
+        """
+        line_dct = {TEST_ID_COLUMN: test_id}
+        line_dct.update(row)
+        if PYTEST_OBJ_NAME in line_dct:
+            line_dct[PYTEST_OBJ_NAME] = get_qualified_name(line_dct[PYTEST_OBJ_NAME])
+        self._file.write(json.dumps(line_dct, default=_to_json_value) + '\n')
+        self.nb_rows += 1
+        self.flush()
+
+    def flush(self, fsync=None):
+        """
+        Flushes the file, and syncs it to disk if `fsync_interval` has elapsed since the last sync.
+
+        :param fsync: an optional boolean to force (`True`) or prevent (`False`) the sync to disk.
+        """
+        self._file.flush()
+
+        now = monotonic()
+        if fsync is None:
+            fsync = now - self._last_fsync >= self.fsync_interval
+        if fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        """Syncs the file to disk and closes it."""
+        if not self._file.closed:
+            self.flush(fsync=True)
+            self._file.close()
+
+
+def read_jsonl_results(path  # type: str
+                       ):
+    """
+    Reads a JSON-lines file written by `JsonlResultsSink` and returns its rows as a dictionary {test_id: row}, in
+    the same format than `get_session_synthesis_dct(flatten=True)`. An incomplete last line (for example if the
+    session was killed while writing it) is ignored.
+
+    :param path: the path of the file
+    :return: a dictionary {test_id: row}
+    """
+    results = dict()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # truncated line
+                continue
+            results[row.pop(TEST_ID_COLUMN)] = row
+    return results
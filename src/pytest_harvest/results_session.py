@@ -1,13 +1,14 @@
-from packaging.version import Version
-
 import pytest
 import sys
 from collections import OrderedDict, namedtuple
-from itertools import chain
+from itertools import islice
+from weakref import WeakKeyDictionary, ref
 
 
-pytest81 = Version(pytest.__version__) >= Version("8.1.0")
-pytest53 = Version(pytest.__version__) >= Version("5.3.0")
+# note: we do not use `packaging.version` here, to keep the plugin import time low
+_pytest_version = tuple(int(v) for v in pytest.__version__.split('.')[:2])
+pytest81 = _pytest_version >= (8, 1)
+pytest53 = _pytest_version >= (5, 3)
 if pytest53:
     def is_lazy_value_or_tupleitem_with_int_base(o):
         return False
@@ -25,16 +26,19 @@ else:
             return False
 
 try: # python 3.5+
-    from typing import Union, Iterable, Mapping, Any
+    from typing import Union, Callable, Iterable, Iterator, List, Mapping, Any, Tuple
 except ImportError:
     pass
 
 from pytest_harvest.common import HARVEST_PREFIX
-from _pytest.doctest import DoctestItem
+from pytest_harvest.fixture_cache import get_nodeid_index
 
 
 PYTEST_OBJ_NAME = 'pytest_obj'
 
+RESULTS_BASELINE_ATTR = '_harvest_baseline'
+"""The name of the session attribute where the `ResultsBaseline` of the session is stored, if any"""
+
 
 def get_session_synthesis_dct(session_or_request,
                               test_id_format='full',   # type: str
@@ -45,7 +49,8 @@ def get_session_synthesis_dct(session_or_request,
                               filter_incomplete=True,  # type: bool
                               flatten=False,           # type: bool
                               fixture_store=None,      # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
-                              flatten_more=None        # type: Union[str, Iterable[str], Mapping[str, str]]
+                              flatten_more=None,       # type: Union[str, Iterable[str], Mapping[str, str]]
+                              use_cache=False          # type: bool
                               ):
     # type: (...) -> Mapping[str, Mapping[str, Any]]
     """
@@ -84,6 +89,10 @@ def get_session_synthesis_dct(session_or_request,
     Finally a `flatten_output` option allows users to get a flat dictionary output instead of nested status details,
     parameters dict, and storage dicts.
 
+    When `use_cache=True`, the synthesis rows of completed test nodes are kept in the session's `SynthesisCache` so
+    that subsequent calls with the same options only recompute the rows of nodes that changed since then. This is
+    what the `[module/session]_results_[dct/df]` fixtures use.
+
     :param session: a pytest session object.
     :param test_id_format: one of 'function', 'class', 'module', or 'full' (default), or a custom test id processing
         function.
@@ -110,11 +119,58 @@ def get_session_synthesis_dct(session_or_request,
     :param flatten_more: a singleton, iterable or dictionary containing fixture names to flatten one level more in case
         flatten=True. If a dictionary is provided, the key should be the fixture name, and the value should be a prefix
         used for flattening its contents
+    :param use_cache: a boolean (default `False`) indicating if the synthesis rows should be read from and stored in
+        the session's synthesis cache (see `get_synthesis_cache`). Rows are invalidated by the `pytest-harvest` plugin
+        each time a new report is available for a node, and when new entries are added to the fixture store(s).
     :return: a dictionary where the keys are pytest node ids. Each value is also a dictionary, containing information
         available from pytest concerning the test node, and optionally storage contents if `storage_dcts` is provided.
     """
-    res_dct = OrderedDict()
+    return OrderedDict(iter_session_synthesis(session_or_request, test_id_format=test_id_format,
+                                              status_details=status_details, durations_in_ms=durations_in_ms,
+                                              pytest_prefix=pytest_prefix, filter=filter,
+                                              filter_incomplete=filter_incomplete, flatten=flatten,
+                                              fixture_store=fixture_store, flatten_more=flatten_more,
+                                              use_cache=use_cache))
+
+
+def iter_session_synthesis(session_or_request,
+                           test_id_format='full',   # type: str
+                           status_details=False,    # type: bool
+                           durations_in_ms=False,   # type: bool
+                           pytest_prefix=None,      # type: bool
+                           filter=None,             # type: Any
+                           filter_incomplete=True,  # type: bool
+                           flatten=False,           # type: bool
+                           fixture_store=None,      # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                           flatten_more=None,       # type: Union[str, Iterable[str], Mapping[str, str]]
+                           use_cache=False,         # type: bool
+                           items=None               # type: Iterable[Any]
+                           ):
+    # type: (...) -> Iterator[Tuple[str, Mapping[str, Any]]]
+    """
+    Generator version of `get_session_synthesis_dct`: yields a `(test_id, row)` tuple for each test node, lazily,
+    instead of building the whole synthesis dictionary in memory. This is typically useful to write the rows of a very
+    large session directly to disk.
+
+    All options have the same meaning than in `get_session_synthesis_dct`, see this function for details. Note that
+    if a custom `test_id_format` function returns the same test id for two nodes, both rows are yielded.
+
+    :param items: an optional iterable of session items to use instead of all the session items. `filter` is still
+        applied on them. This is typically used to get the synthesis row of a single item as soon as it is complete.
+    :return: a generator of `(test_id, row)` tuples, in the session items order.
+    """
+    return _iter_session_synthesis(session_or_request, test_id_format, status_details, durations_in_ms, pytest_prefix,
+                                   filter, filter_incomplete, flatten, fixture_store, flatten_more, use_cache, items)
+
 
+def _iter_session_synthesis(session_or_request, test_id_format, status_details, durations_in_ms, pytest_prefix, filter,
+                            filter_incomplete, flatten, fixture_store, flatten_more, use_cache, items,
+                            columns=None  # type: _SynthesisColumns
+                            ):
+    """
+    Implementation of `iter_session_synthesis`. If `columns` is provided, the rows are not yielded but written into it
+    directly (flatten mode only), so that no row dictionary is created, except for the rows stored in the cache.
+    """
     # extract session if needed
     if hasattr(session_or_request, 'session') and session_or_request.session is not session_or_request:
         request = session_or_request
@@ -123,48 +179,15 @@ def get_session_synthesis_dct(session_or_request,
         request = None
         session = session_or_request
 
-    # Optional test id formatter
-    if test_id_format == 'function':
-        def test_id_format(test_id):
-            """
-            from: path/to/test_file.py::TestClass::test_fun[param-param2]
-            to:                                    test_fun[param-param2]
-            """
-            # Old
-            # return test_id.split('::')[-1]
-            # New: resistant to '::' in param names
-            try:
-                # is there a bracket indicating parameters (therefore possibly custom ids)
-                _idx = test_id.index('[')
-            except ValueError:
-                return test_id.split('::')[-1]
-            else:
-                return test_id[:_idx].split('::')[-1] + test_id[_idx:]
-
-    elif test_id_format == 'class':
-        def test_id_format(test_id):
-            """
-            from: path/to/test_file.py::TestClass::test_fun[param-param2]
-            to:                         TestClass::test_fun[param-param2]
-            note: if no class is there, this will be function
-            """
-            return '::'.join(test_id.split('::')[1:])
-    elif test_id_format == 'module':
-        def test_id_format(test_id):
-            """
-            from: path/to/test_file.py::TestClass::test_fun[param-param2]
-            to:           test_file.py::TestClass::test_fun[param-param2]
-            """
-            return test_id.replace('\\', '/').split('/')[-1]
-    elif test_id_format == 'full':
-        def test_id_format(test_id):
-            """ path/to/test_file.py::TestClass::test_fun[param-param2] """
-            return test_id
-    elif callable(test_id_format):
-        pass  # use it directly
-    else:
-        raise ValueError("`test_id_format` should be one of {'function', 'class', 'module', 'full'} or be a custom "
-                         "function. Found '%s'" % test_id_format)
+    # remember the options before they are transformed, this is the synthesis cache key. A custom test id formatter
+    # is not kept in the key, it is referenced by its identity as the fixture stores (see `SynthesisCache.get_rows`)
+    custom_test_id_format = not isinstance(test_id_format, str)
+    key_objects = (test_id_format,) if custom_test_id_format else ()
+    options_key = (None if custom_test_id_format else test_id_format, status_details, durations_in_ms, pytest_prefix,
+                   flatten, _get_flatten_more_key(flatten_more))
+
+    # Optional test id formatter (memoized)
+    test_id_format = get_test_id_formatter(test_id_format, session)
 
     # Optional 'pytest_' prefix in front of status and duration
     if pytest_prefix is None:
@@ -174,21 +197,49 @@ def get_session_synthesis_dct(session_or_request,
     else:
         pytest_prefix = ''
 
+    # Optional baseline from the results history (see the --harvest-history option)
+    results_baseline = getattr(session, RESULTS_BASELINE_ATTR, None)
+
     # Optional filter
-    filtered_items = filter_session_items(session, filter)
+    if items is None:
+        filtered_items = filter_session_items(session, filter)
+    elif filter is None:
+        filtered_items = items
+    else:
+        filtered_items = [item for item in items if pytest_item_matches_filter(item, filter)]
 
     # fixture store check
     if fixture_store is not None:
-        try:
-            fixture_store_items = fixture_store.items()
-        except AttributeError:
+        if hasattr(fixture_store, 'items'):
+            stores = (fixture_store,)
+        else:
             # not a dict: an iterable of dict
-            fixture_store_items = list(chain(store.items() for store in fixture_store))
+            stores = tuple(fixture_store)
+        # the inverted {nodeid: fixture keys} index of each store
+        stores_and_indexes = tuple((store, get_nodeid_index(store)) for store in stores)
+    else:
+        stores = ()
+
+    # nested dictionaries in the rows, that should be copied when a row is read from or written to the cache
+    nested_keys = () if flatten else (pytest_prefix + "status_details", pytest_prefix + "params", 'fixtures')
+
+    # Optional synthesis cache
+    cached_rows = None
+    if use_cache:
+        key_objects += stores
+        options_key += (tuple(id(o) for o in key_objects),)
+        try:
+            hash(options_key)
+        except TypeError:
+            # a flatten_more option that is not hashable: do not use the cache
+            pass
+        else:
+            cached_rows = get_synthesis_cache(session).get_rows(options_key, stores, key_objects)
 
     # flatten_more check
     if flatten_more is not None:
         if isinstance(flatten_more, dict):
-            flatten_more_prefixes_dct = flatten_more.items()
+            flatten_more_prefixes_dct = flatten_more
         elif isinstance(flatten_more, str):
             # single name ?
             flatten_more_prefixes_dct = {flatten_more: ''}
@@ -198,23 +249,44 @@ def get_session_synthesis_dct(session_or_request,
 
     # For each item add an entry
     for item in filtered_items:
-        item_dct = OrderedDict()
-
-        # Fill the dictionary with information about this test node
-        # -- test object
-        item_dct[PYTEST_OBJ_NAME] = item.obj
+        if cached_rows is not None:
+            try:
+                test_id, item_dct = cached_rows[item.nodeid]
+            except KeyError:
+                pass
+            else:
+                if columns is not None:
+                    columns.new_row(test_id).update(item_dct)
+                else:
+                    yield test_id, _copy_synthesis_row(item_dct, nested_keys)
+                continue
 
         # -- test status: this information is available thanks to our hook in plugin.py
         (test_status, test_duration), status_dct = get_pytest_status(item, durations_in_ms=durations_in_ms,
                                                                      current_request=request)
 
         if test_status not in {'pending', 'unknown'} or not filter_incomplete:
+            test_id = test_id_format(item.nodeid)
+            cache_row = cached_rows is not None and test_status not in {'pending', 'unknown'}
+            if columns is None or cache_row:
+                item_dct = OrderedDict()
+            else:
+                # write the values directly in the columns
+                item_dct = columns.new_row(test_id)
+
+            # Fill the row with information about this test node
+            # -- test object
+            item_dct[PYTEST_OBJ_NAME] = item.obj
+
             # -- parameters (of tests and fixtures)
             param_dct = get_pytest_params(item)
 
             # Fill according to mode
             item_dct[pytest_prefix + "status"] = test_status
             item_dct[pytest_prefix + "duration_" + ('ms' if durations_in_ms else 's')] = test_duration
+            if results_baseline is not None:
+                results_baseline.fill_row(item_dct, item.nodeid, test_duration, durations_in_ms=durations_in_ms,
+                                          pytest_prefix=pytest_prefix)
             if flatten:
                 if status_details:
                     for k, v in status_dct.items():
@@ -234,13 +306,9 @@ def get_session_synthesis_dct(session_or_request,
                 if not flatten:
                     item_dct['fixtures'] = OrderedDict()
 
-                for fixture_name, fixture_dct in fixture_store_items:
-
-                    # if this fixture is available for this test
-                    if item.nodeid in fixture_dct:
-                        # get the fixture value for this test
-                        fix_val = fixture_dct[item.nodeid]
-
+                for store, nodeid_index in stores_and_indexes:
+                    # the fixtures values available for this test
+                    for fixture_name, fix_val in nodeid_index.get_entries(store, item.nodeid):
                         # store it in the appropriate format
                         if flatten:
                             if flatten_more is not None and fixture_name in flatten_more_prefixes_dct:
@@ -253,10 +321,581 @@ def get_session_synthesis_dct(session_or_request,
                         else:
                             item_dct['fixtures'][fixture_name] = fix_val
 
-            # Finally store in the main dictionary
-            res_dct[test_id_format(item.nodeid)] = item_dct
+            # Finally store in the cache if the node is complete
+            if cache_row:
+                cached_rows[item.nodeid] = (test_id, item_dct)
+                if columns is not None:
+                    columns.new_row(test_id).update(item_dct)
+                    continue
+                item_dct = _copy_synthesis_row(item_dct, nested_keys)
+            if columns is None:
+                yield test_id, item_dct
+
+
+TEST_ID_COLUMN = 'test_id'
+
+
+def get_session_synthesis_columns(session_or_request,
+                                  test_id_format='full',   # type: str
+                                  status_details=False,    # type: bool
+                                  durations_in_ms=False,   # type: bool
+                                  pytest_prefix=None,      # type: bool
+                                  filter=None,             # type: Any
+                                  filter_incomplete=True,  # type: bool
+                                  fixture_store=None,      # type: Union[Mapping[str, Any], Iterable[Mapping[str, Any]]]
+                                  flatten_more=None,       # type: Union[str, Iterable[str], Mapping[str, str]]
+                                  use_cache=False          # type: bool
+                                  ):
+    # type: (...) -> Mapping[str, List[Any]]
+    """
+    Columnar version of `get_session_synthesis_dct(flatten=True)`: returns a dictionary containing one list per field
+    of the flattened synthesis, instead of one dictionary per test node. The first column is always `'test_id'`,
+    followed by all other fields in order of first appearance (`'pytest_obj'`, status, duration, parameters, fixtures,
+    ...). When a field is not available for a test node, the corresponding cell is `None`.
+
+    Values are appended to the columns directly while the synthesis is computed, without creating a dictionary per
+    row (except for the rows stored in the synthesis cache when `use_cache=True`).
+    As in `get_session_synthesis_dct`, if several nodes have the same test id, only the last one is kept (at the
+    position of the first one).
+
+    This is typically useful for analytics consumers, for example to build a `pandas.DataFrame` or an arrow table
+    directly. All options have the same meaning than in `get_session_synthesis_dct`, see this function for details.
+
+    :return: a dictionary {column_name: list of values}, where all lists have the same length.
+    """
+    columns = _SynthesisColumns()
+    for _ in _iter_session_synthesis(session_or_request, test_id_format, status_details, durations_in_ms,
+                                     pytest_prefix, filter, filter_incomplete, True, fixture_store, flatten_more,
+                                     use_cache, None, columns=columns):
+        pass
+    return columns.get_columns()
+
+
+def synthesis_rows_to_columns(rows  # type: Iterable[Tuple[str, Mapping[str, Any]]]
+                              ):
+    # type: (...) -> Mapping[str, List[Any]]
+    """
+    Transforms an iterable of flattened synthesis `(test_id, row)` tuples (see `iter_session_synthesis`) into a
+    columnar synthesis, consuming the rows one by one. See `get_session_synthesis_columns` for details.
+
+    :param rows: an iterable of `(test_id, row)` tuples
+    :return: a dictionary {column_name: list of values}, where all lists have the same length.
+    """
+    columns = _SynthesisColumns()
+    for test_id, row in rows:
+        columns.new_row(test_id).update(row)
+    return columns.get_columns()
+
+
+class _SynthesisColumns(object):
+    """
+    A columnar synthesis being built: flattened synthesis rows are written directly into per-column lists, through
+    the same `row[key] = value` and `row.update(dct)` calls than a row dictionary. Columns are padded with None lazily.
+    """
+    __slots__ = ('_columns', '_test_ids', '_positions', '_i')
+
+    def __init__(self):
+        self._test_ids = []
+        self._columns = OrderedDict([(TEST_ID_COLUMN, self._test_ids)])
+        self._positions = dict()  # {test_id: position}
+        self._i = None            # the position of the current row
+
+    def new_row(self, test_id):
+        """Starts writing the row of `test_id` and returns self. If `test_id` already has a row, it is overwritten."""
+        i = self._positions.get(test_id)
+        if i is None:
+            i = self._positions[test_id] = len(self._test_ids)
+            self._test_ids.append(test_id)
+        else:
+            # duplicate test id: overwrite the row
+            for k, col in self._columns.items():
+                if k != TEST_ID_COLUMN and len(col) > i:
+                    col[i] = None
+        self._i = i
+        return self
+
+    def __setitem__(self, k, v):
+        i = self._i
+        try:
+            col = self._columns[k]
+        except KeyError:
+            col = self._columns[k] = []
+        n = len(col)
+        if n == i:
+            col.append(v)
+        elif n > i:
+            col[i] = v
+        else:
+            col.extend([None] * (i - n))
+            col.append(v)
+
+    def update(self, row):
+        for k, v in row.items():
+            self[k] = v
+
+    def get_columns(self):
+        # type: (...) -> Mapping[str, List[Any]]
+        """Returns the columns {column_name: list of values}, all padded to the same length"""
+        nb_rows = len(self._test_ids)
+        for col in self._columns.values():
+            if len(col) < nb_rows:
+                col.extend([None] * (nb_rows - len(col)))
+        return self._columns
+
+
+def _get_flatten_more_key(flatten_more):
+    """Returns a hashable representation of the `flatten_more` option of `get_session_synthesis_dct`"""
+    if flatten_more is None or isinstance(flatten_more, str):
+        return flatten_more
+    elif isinstance(flatten_more, dict):
+        return tuple(flatten_more.items())
+    else:
+        return tuple(flatten_more)
+
+
+def _copy_synthesis_row(item_dct, nested_keys):
+    """Copies a synthesis row (and its nested dictionaries) so that the cached row can not be modified by users"""
+    row = OrderedDict(item_dct)
+    for k in nested_keys:
+        if k in row:
+            row[k] = row[k].copy()
+    return row
+
+
+class _WeaklyKeyedCache(object):
+    """
+    Base class of the caches whose keys contain the identity of some objects (fixture stores, custom test id
+    formatters). The cached contents of a key are released when one of its objects is garbage-collected, so that they
+    do not stay in memory until the end of the session, and can not be returned for another object with the same id.
+    """
+    __slots__ = ('_refs', '_released_keys')
+
+    def __init__(self):
+        self._refs = dict()          # {cache_key: weak references to its objects}
+        self._released_keys = []     # the keys whose objects were garbage-collected
+
+    def _register_key(self, cache_key, key_objects):
+        """
+        Remembers that `cache_key` relies on the identity of `key_objects`, and returns True. Returns False if one of
+        them can not be weakly referenced (e.g. a plain `dict`): `cache_key` should then not be cached.
+        """
+        if cache_key in self._refs:
+            return True
+
+        def _on_release(_, released_keys=self._released_keys):
+            # note: this may be called at any time, the key is actually released at the next cache access
+            released_keys.append(cache_key)
+
+        try:
+            self._refs[cache_key] = tuple(ref(o, _on_release) for o in key_objects)
+        except TypeError:
+            return False
+        return True
+
+    def _purge_released_keys(self):
+        """Releases the contents of the keys whose objects were garbage-collected"""
+        while self._released_keys:
+            cache_key = self._released_keys.pop()
+            if self._refs.pop(cache_key, None) is not None:
+                self._release_key(cache_key)
+
+    def _release_key(self, cache_key):
+        """Removes all cached contents for `cache_key`"""
+        raise NotImplementedError()
+
+    def clear(self):
+        """Removes all cached contents"""
+        self._refs.clear()
+        del self._released_keys[:]
+
+
+class SynthesisCache(_WeaklyKeyedCache):
+    """
+    An incremental cache of synthesis rows, used by `get_session_synthesis_dct(use_cache=True)`.
+
+    For each combination of synthesis options, it contains a dictionary {nodeid: (test_id, row)} for all completed
+    nodes. A row is removed as soon as the node is invalidated (our `pytest_runtest_makereport` hook does it each
+    time a new report is available) or as soon as new entries are added to the fixture store for this node id, so
+    that each synthesis call only has to recompute the rows that changed since the previous call.
+    """
+    __slots__ = ('_rows', '_store_sizes')
+
+    def __init__(self):
+        super(SynthesisCache, self).__init__()
+        self._rows = dict()         # {options_key: {nodeid: (test_id, row)}}
+        self._store_sizes = dict()  # {options_key: {(id(store), fixture_name): nb_entries}}
+
+    def get_rows(self, options_key, stores, key_objects):
+        """
+        Returns the (mutable) dictionary of cached rows for the given options, after having invalidated the rows
+        related to the entries added in `stores` since the last call. The rows are released when one of `key_objects`
+        (the objects whose identity is in `options_key`) is garbage-collected.
+
+        :param options_key: a hashable representation of the synthesis options
+        :param stores: a tuple of fixture stores
+        :param key_objects: the objects whose identity is in `options_key`, typically the fixture stores and the custom
+            test id formatter if any
+        :return: a dictionary {nodeid: (test_id, row)}, or None if these options can not be cached
+        """
+        self._purge_released_keys()
+        if not self._register_key(options_key, key_objects):
+            return None
+
+        sizes = _get_store_sizes(stores)
+        try:
+            rows = self._rows[options_key]
+        except KeyError:
+            rows = self._rows[options_key] = dict()
+        else:
+            new_nodeids = _get_new_store_nodeids(stores, self._store_sizes[options_key], sizes)
+            if new_nodeids is None:
+                rows.clear()
+            else:
+                for nodeid in new_nodeids:
+                    rows.pop(nodeid, None)
+
+        self._store_sizes[options_key] = sizes
+        return rows
+
+    def invalidate(self, nodeid):
+        """Removes all cached rows for node `nodeid`"""
+        for rows in self._rows.values():
+            rows.pop(nodeid, None)
+
+    def evict(self, nodeid, store, fixture_names):
+        """
+        Removes all cached rows for node `nodeid`, whose entries for `fixture_names` were removed from `store` (see
+        `evict_saved_fixtures`). These removals are expected by the next `get_rows` calls, so that they do not remove
+        all the cached rows.
+        """
+        self.invalidate(nodeid)
+        _record_removals(self._store_sizes.values(), store, fixture_names)
+
+    def _release_key(self, cache_key):
+        self._rows.pop(cache_key, None)
+        self._store_sizes.pop(cache_key, None)
+
+    def clear(self):
+        """Removes all cached rows"""
+        super(SynthesisCache, self).clear()
+        self._rows.clear()
+        self._store_sizes.clear()
+
+
+def _get_store_sizes(stores):
+    """Returns a dictionary {(id(store), fixture name): number of entries} for the given fixture stores"""
+    return {(id(store), fixture_name): len(fixture_dct)
+            for store in stores for fixture_name, fixture_dct in store.items()}
+
+
+def _get_new_store_nodeids(stores, old_sizes, sizes):
+    """
+    Returns the node ids of the entries added in `stores` since their sizes were `old_sizes` (see `_get_store_sizes`),
+    or None if this can not be determined (for example because some entries were removed).
+    """
+    if any(k not in sizes for k in old_sizes):
+        # a fixture was removed from a store
+        return None
+    stores_by_id = {id(store): store for store in stores}
+    new_nodeids = []
+    for (store_id, fixture_name), nb in sizes.items():
+        nb_new = nb - old_sizes.get((store_id, fixture_name), 0)
+        if nb_new == 0:
+            continue
+        elif nb_new < 0:
+            # some entries were removed
+            return None
+        try:
+            # stores are ordered dictionaries: the new entries are the last ones
+            new_nodeids.extend(islice(reversed(stores_by_id[store_id][fixture_name]), nb_new))
+        except TypeError:
+            # not reversible
+            return None
+    return new_nodeids
+
+
+def _record_removals(all_sizes, store, fixture_names):
+    """
+    Updates the store sizes in `all_sizes` (an iterable of dictionaries returned by `_get_store_sizes`) after one
+    entry was removed from `store` for each of `fixture_names`, so that `_get_new_store_nodeids` does not consider it
+    as an unknown removal. Note: if the entry was added after the sizes were recorded, an older entry is considered
+    as new instead, so at worst a few more results are recomputed.
+    """
+    store_id = id(store)
+    for sizes in all_sizes:
+        for fixture_name in fixture_names:
+            size_key = (store_id, fixture_name)
+            if sizes.get(size_key, 0) > 0:
+                sizes[size_key] -= 1
+
+
+def get_synthesis_cache(session):
+    """
+    Returns the `SynthesisCache` associated with pytest session `session`, creating it if needed.
+
+    :param session: a pytest session
+    :return:
+    """
+    try:
+        return session._harvest_synthesis_cache
+    except AttributeError:
+        cache = session._harvest_synthesis_cache = SynthesisCache()
+        return cache
+
+
+class ModuleResultsCache(_WeaklyKeyedCache):
+    """
+    A cache of the `module_results_dct` and `module_results_df` contents, per module.
+
+    The cached results of a module are removed as soon as one of its items is completed or becomes incomplete again
+    (our `pytest_runtest_makereport` hook does it) or as soon as new entries are added to the fixture stores for one of
+    its complete items. Other modules are not affected, so that several "report" tests at the
+    end of a module only have to look at the items of this module, and not at the whole session.
+    """
+    __slots__ = ('_results', '_store_sizes')
+
+    def __init__(self):
+        super(ModuleResultsCache, self).__init__()
+        self._results = dict()      # {module_name: {cache_key: results}}
+        self._store_sizes = dict()  # {cache_key: {(id(store), fixture_name): nb_entries}}
+
+    def get(self, session, module_name, key, stores):
+        """
+        Returns the cached results for `module_name`, `key` and `stores`, or None, after having invalidated the results
+        related to the entries added in `stores` since the last call with the same `key` and `stores`. The results are
+        released when one of the stores is garbage-collected, and are not cached if a store can not be weakly
+        referenced.
+
+        :param session: the pytest session, used to find the module of each item
+        :param module_name: the name of the module
+        :param key: a hashable representation of the kind of results and of their options
+        :param stores: a tuple of fixture stores
+        :return:
+        """
+        self._purge_released_keys()
+        cache_key = _get_module_results_key(key, stores)
+        if not self._register_key(cache_key, stores):
+            return None
+
+        sizes = _get_store_sizes(stores)
+        old_sizes = self._store_sizes.get(cache_key, None)
+        if old_sizes is not None:
+            new_nodeids = _get_new_store_nodeids(stores, old_sizes, sizes)
+            if new_nodeids is None:
+                self._invalidate_key(cache_key, None)
+            else:
+                items_index = get_session_items_index(session)
+                for nodeid in new_nodeids:
+                    item = items_index.get_item(nodeid)
+                    if item is None:
+                        self._invalidate_key(cache_key, None)
+                    elif not is_pytest_incomplete(item):
+                        # the module results only contain complete items
+                        self._invalidate_key(cache_key, get_item_module_name(item))
+        self._store_sizes[cache_key] = sizes
+
+        return self._results.get(module_name, {}).get(cache_key, None)
+
+    def set(self, module_name, key, stores, results):
+        """Stores the results for `module_name`, `key` and `stores`, if they can be cached (see `get`)"""
+        cache_key = _get_module_results_key(key, stores)
+        if cache_key in self._refs:
+            self._results.setdefault(module_name, dict())[cache_key] = results
+
+    def _invalidate_key(self, cache_key, module_name):
+        """Removes the cached results for `cache_key` in module `module_name`, or in all modules if it is None"""
+        if module_name is None:
+            for module_results in self._results.values():
+                module_results.pop(cache_key, None)
+        else:
+            self._results.get(module_name, {}).pop(cache_key, None)
+
+    def invalidate_module(self, module_name):
+        """Removes all cached results for module `module_name`. If it is None, all results are removed."""
+        if module_name is None:
+            self._results.clear()
+        else:
+            self._results.pop(module_name, None)
+
+    def evict(self, module_name, store, fixture_names):
+        """
+        Removes all cached results for module `module_name`, after the entries of one of its items for
+        `fixture_names` were removed from `store` (see `evict_saved_fixtures`). These removals are expected by the
+        next `get` calls, so that they do not remove the cached results of the other modules.
+        """
+        self.invalidate_module(module_name)
+        _record_removals(self._store_sizes.values(), store, fixture_names)
+
+    def _release_key(self, cache_key):
+        self._invalidate_key(cache_key, None)
+        self._store_sizes.pop(cache_key, None)
+
+    def clear(self):
+        """Removes all cached results"""
+        super(ModuleResultsCache, self).clear()
+        self._results.clear()
+        self._store_sizes.clear()
+
+
+def _get_module_results_key(key, stores):
+    """The key of module results in the `ModuleResultsCache`: `key`, and the identity of the fixture stores"""
+    return key + (tuple(id(store) for store in stores),)
+
+
+def get_module_results_cache(session):
+    """
+    Returns the `ModuleResultsCache` associated with pytest session `session`, creating it if needed.
+
+    :param session: a pytest session
+    :return:
+    """
+    try:
+        return session._harvest_module_results_cache
+    except AttributeError:
+        cache = session._harvest_module_results_cache = ModuleResultsCache()
+        return cache
+
+
+def get_item_module_name(item):
+    """
+    Returns the name of the module of a session item, as used by module filters (the module of its test object), or
+    None if it can not be determined.
+    """
+    try:
+        return item.obj.__module__
+    except AttributeError:
+        return None
+
+
+# ------------ test ids -------------
+def _function_test_id(test_id):
+    """
+    from: path/to/test_file.py::TestClass::test_fun[param-param2]
+    to:                                    test_fun[param-param2]
+    """
+    # Old
+    # return test_id.split('::')[-1]
+    # New: resistant to '::' in param names
+    try:
+        # is there a bracket indicating parameters (therefore possibly custom ids)
+        _idx = test_id.index('[')
+    except ValueError:
+        return test_id.split('::')[-1]
+    else:
+        return test_id[:_idx].split('::')[-1] + test_id[_idx:]
+
+
+def _class_test_id(test_id):
+    """
+    from: path/to/test_file.py::TestClass::test_fun[param-param2]
+    to:                         TestClass::test_fun[param-param2]
+    note: if no class is there, this will be function
+    """
+    return '::'.join(test_id.split('::')[1:])
+
+
+def _module_test_id(test_id):
+    """
+    from: path/to/test_file.py::TestClass::test_fun[param-param2]
+    to:           test_file.py::TestClass::test_fun[param-param2]
+    """
+    return test_id.replace('\\', '/').split('/')[-1]
+
+
+def _full_test_id(test_id):
+    """ path/to/test_file.py::TestClass::test_fun[param-param2] """
+    return test_id
+
+
+def _memoized(test_id_formatter, cache):
+    """Returns a version of `test_id_formatter` storing its results in dict `cache`"""
+    def _memoized_formatter(test_id):
+        try:
+            return cache[test_id]
+        except KeyError:
+            formatted_id = cache[test_id] = test_id_formatter(test_id)
+            return formatted_id
 
-    return res_dct
+    return _memoized_formatter
+
+
+_TEST_ID_FORMATTERS = {
+    'function': _function_test_id,
+    'class': _class_test_id,
+    'module': _module_test_id,
+    'full': _full_test_id,
+}
+
+
+def _get_test_ids_cache(session, test_id_format):
+    """
+    Returns the dictionary {nodeid: test id} memoizing the test ids formatted with `test_id_format` in `session`, or
+    None if they can not be memoized. The caches are attached to the session so that they are released with it, and the
+    caches of custom formatters are also released when the formatter is garbage-collected.
+    """
+    try:
+        builtin_caches, custom_caches = session._harvest_test_ids_caches
+    except AttributeError:
+        builtin_caches, custom_caches = session._harvest_test_ids_caches = dict(), WeakKeyDictionary()
+
+    if isinstance(test_id_format, str):
+        return builtin_caches.setdefault(test_id_format, dict())
+    try:
+        return custom_caches.setdefault(test_id_format, dict())
+    except TypeError:
+        # this custom formatter can not be weakly referenced: do not memoize
+        return None
+
+
+def get_test_id_formatter(test_id_format,
+                          session=None,  # type: Any
+                          ):
+    """
+    Returns a function formatting pytest node ids according to `test_id_format` (see `get_session_synthesis_dct`).
+    If a `session` is provided, results are memoized in this session, so that each node id is formatted only once
+    per format.
+
+    :param test_id_format: one of 'function', 'class', 'module', or 'full', or a custom test id processing function.
+    :param session: an optional pytest session
+    :return: a function transforming a node id into a test id
+    """
+    try:
+        test_id_formatter = _TEST_ID_FORMATTERS[test_id_format]
+    except (KeyError, TypeError):
+        if callable(test_id_format):
+            test_id_formatter = test_id_format
+        else:
+            raise ValueError("`test_id_format` should be one of {'function', 'class', 'module', 'full'} or be a "
+                             "custom function. Found '%s'" % test_id_format)
+
+    if session is None or test_id_formatter is _full_test_id:
+        return test_id_formatter
+    cache = _get_test_ids_cache(session, test_id_format)
+    return test_id_formatter if cache is None else _memoized(test_id_formatter, cache)
+
+
+def format_test_ids(nodeids,                # type: Iterable[str]
+                    test_id_format='full',  # type: Union[str, Callable[[str], str]]
+                    session=None            # type: Any
+                    ):
+    # type: (...) -> List[str]
+    """
+    Formats all node ids in `nodeids` according to `test_id_format` (see `get_session_synthesis_dct` for details).
+    Each distinct node id is formatted once, and results are memoized in `session` if it is provided, as in
+    `get_test_id_formatter`.
+
+    :param nodeids: an iterable of pytest node ids
+    :param test_id_format: one of 'function', 'class', 'module', or 'full' (default), or a custom test id processing
+        function.
+    :param session: an optional pytest session
+    :return: a list of test ids, in the same order
+    """
+    if test_id_format == 'full':
+        return list(nodeids)
+    test_id_formatter = get_test_id_formatter(test_id_format, session)
+    if session is None:
+        test_id_formatter = _memoized(test_id_formatter, dict())
+    return [test_id_formatter(nodeid) for nodeid in nodeids]
 
 
 def filter_session_items(session,
@@ -277,12 +916,85 @@ def filter_session_items(session,
     """
     if filter is not None:
         filterset = _get_filterset(filter)
-        filtered_items = tuple(item for item in session.items if _pytest_item_matches_filter(item, filterset))
+        filtered_items = get_session_items_index(session).filter(filterset)
     else:
         filtered_items = session.items
     return filtered_items
 
 
+class SessionItemsIndex(object):
+    """
+    An index of the items of a pytest session, by test object, unbound function (for methods) and module name, so that
+    `filter_session_items` only has to look at the items matching the filter instead of all session items.
+
+    It is built by our `pytest_collection_finish` hook, and rebuilt by `get_session_items_index` if `session.items`
+    changes (for example when xdist worker items are restored on the master).
+    """
+    __slots__ = ('items', 'nb_items', '_by_obj', '_by_unbound', '_by_module', '_unindexed', '_items_by_nodeid')
+
+    def __init__(self, items):
+        self.items = items
+        self.nb_items = len(items)
+        self._by_obj = dict()      # {item.obj: [positions]}
+        self._by_unbound = dict()  # {item.obj.__func__: [positions]}
+        self._by_module = dict()   # {item.obj.__module__: [positions]}
+        self._unindexed = []       # [positions] of items that can not be indexed
+        self._items_by_nodeid = None    # {nodeid: item}, built on demand
+
+        for i, item in enumerate(items):
+            try:
+                item_obj = item.obj
+                self._by_obj.setdefault(item_obj, []).append(i)
+                if item_obj is None:
+                    # This can happen with DoctestItem
+                    continue
+                not_bound_fct = getattr(item_obj, '__func__', None)
+                if not_bound_fct is not None:
+                    self._by_unbound.setdefault(not_bound_fct, []).append(i)
+                self._by_module.setdefault(item_obj.__module__, []).append(i)
+            except (AttributeError, TypeError):
+                # no test object, no module or unhashable object: use `_pytest_item_matches_filter` at filtering time
+                self._unindexed.append(i)
+
+    def is_valid_for(self, session):
+        """Returns True if this index still corresponds to the items of `session`"""
+        return session.items is self.items and len(session.items) == self.nb_items
+
+    def get_item(self, nodeid):
+        """Returns the item with node id `nodeid`, or None"""
+        if self._items_by_nodeid is None:
+            self._items_by_nodeid = {item.nodeid: item for item in self.items}
+        return self._items_by_nodeid.get(nodeid, None)
+
+    def filter(self, filterset):
+        """
+        Returns a tuple containing all items matching the filter set, in the session order.
+
+        :param filterset: a set of pytest objects and/or module names (see `_get_filterset`)
+        :return:
+        """
+        positions = set()
+        for f in filterset:
+            positions.update(self._by_obj.get(f, ()))
+            positions.update(self._by_unbound.get(f, ()))
+            positions.update(self._by_module.get(f, ()))
+        positions.update(i for i in self._unindexed if _pytest_item_matches_filter(self.items[i], filterset))
+        return tuple(self.items[i] for i in sorted(positions))
+
+
+def get_session_items_index(session):
+    """
+    Returns the `SessionItemsIndex` associated with pytest session `session`, (re)building it if needed.
+
+    :param session: a pytest session
+    :return:
+    """
+    items_index = getattr(session, '_harvest_items_index', None)
+    if items_index is None or not items_index.is_valid_for(session):
+        items_index = session._harvest_items_index = SessionItemsIndex(session.items)
+    return items_index
+
+
 def get_all_pytest_param_names(session,
                                filter=None,              # type: Any
                                filter_incomplete=False,  # type: bool
@@ -311,9 +1023,9 @@ def get_all_pytest_param_names(session,
     # relies on the fact that dset.add() always returns None
     # thanks https://stackoverflow.com/questions/6197409/ordered-sets-python-2-7
     return [k for item in filter_session_items(session, filter=filter)
-            for k in get_pytest_params(item)
-            if k not in dset and not (filter_incomplete and is_pytest_incomplete(item))
-               and not dset.add(k)]
+            if not (filter_incomplete and is_pytest_incomplete(item))
+            for k in get_pytest_param_names(item)
+            if k not in dset and not dset.add(k)]
 
 
 def get_all_pytest_fixture_names(session,
@@ -344,9 +1056,9 @@ def get_all_pytest_fixture_names(session,
     # relies on the fact that dset.add() always returns None
     # thanks https://stackoverflow.com/questions/6197409/ordered-sets-python-2-7
     return [k for item in filter_session_items(session, filter=filter)
+            if not (filter_incomplete and is_pytest_incomplete(item))
             for k in get_pytest_fixture_names(item)
-            if k not in dset and not (filter_incomplete and is_pytest_incomplete(item))
-               and not dset.add(k)]
+            if k not in dset and not dset.add(k)]
 
 
 # ------------ item-related -------------
@@ -410,6 +1122,108 @@ def _get_pytest_status_keys(item):
     return [k for k in vars(item) if k.startswith(HARVEST_PREFIX)]
 
 
+STATUS_RECORD_ATTR = '_harvest_status'
+
+
+class PytestStatusRecord(object):
+    """
+    A compact record of the pytest status of an item, maintained by our `pytest_runtest_makereport` hook (see
+    `update_pytest_status`) so that `get_pytest_status` and `is_pytest_incomplete` do not have to look for the reports
+    attached to the item and recompute the summary each time.
+
+    It contains the outcome and duration (in seconds) of each phase (setup/call/teardown) in the order in which they
+    were reported, as well as the worst status of all phases and the duration of the "call" phase.
+    """
+    __slots__ = ('phases', 'status', 'duration')
+
+    def __init__(self):
+        self.phases = []      # [(when, outcome, duration)]
+        self.status = None    # the worst status of all phases so far
+        self.duration = None  # the duration of the "call" phase
+
+    def add(self, when, outcome, duration):
+        """Adds or replaces the information for phase `when`, and updates the summary"""
+        for i, (_when, _, _) in enumerate(self.phases):
+            if _when == when:
+                # this phase was already reported (e.g. test rerun): replace it
+                self.phases[i] = (when, outcome, duration)
+                break
+        else:
+            self.phases.append((when, outcome, duration))
+
+        # update global test status: the worst one
+        self.status = 'passed'
+        for _, _outcome, _ in self.phases:
+            if self.status == 'passed' or (self.status == 'skipped' and _outcome != 'passed'):
+                self.status = _outcome
+
+        # global test duration is the duration of the "call" step only
+        if when == "call":
+            self.duration = duration
+
+    def is_complete(self):
+        """Returns True if the three phases setup/call/teardown are available"""
+        return len(self.phases) >= 3
+
+
+class SlimReport(object):
+    """
+    A slim version of a pytest `TestReport`, containing only what `pytest-harvest` needs. When the
+    `--harvest-slim-reports` option is set, it is attached to the items instead of the full report, so that the report
+    contents (`longrepr` tracebacks, captured output `sections`, user properties...) can be garbage-collected and
+    xdist worker dumps are smaller.
+    """
+    __slots__ = ('when', 'outcome', 'duration', 'start', 'stop')
+
+    def __init__(self, when, outcome, duration, start=None, stop=None):
+        self.when = when
+        self.outcome = outcome
+        self.duration = duration
+        self.start = start
+        self.stop = stop
+
+    @classmethod
+    def from_report(cls, report):
+        """Creates a `SlimReport` from a pytest report"""
+        return cls(report.when, report.outcome, report.duration,
+                   start=getattr(report, 'start', None), stop=getattr(report, 'stop', None))
+
+    def __repr__(self):
+        return "SlimReport(when=%r, outcome=%r, duration=%r)" % (self.when, self.outcome, self.duration)
+
+
+def update_pytest_status(item, report):
+    """
+    Updates the `PytestStatusRecord` of `item` with the information from `report`. This is called by our
+    `pytest_runtest_makereport` hook.
+
+    :param item: a pytest item
+    :param report: a pytest report for that item
+    :return:
+    """
+    try:
+        status_record = getattr(item, STATUS_RECORD_ATTR)
+    except AttributeError:
+        status_record = PytestStatusRecord()
+        setattr(item, STATUS_RECORD_ATTR, status_record)
+    status_record.add(report.when, report.outcome, report.duration)
+
+
+def _get_status_record(item):
+    """
+    Returns the `PytestStatusRecord` of `item`, or builds one from the reports attached to the item if it was not
+    maintained (for example if reports were attached by other means).
+    """
+    try:
+        return getattr(item, STATUS_RECORD_ATTR)
+    except AttributeError:
+        status_record = PytestStatusRecord()
+        for k in _get_pytest_status_keys(item):
+            statusreport = getattr(item, k)
+            status_record.add(statusreport.when, statusreport.outcome, statusreport.duration)
+        return status_record
+
+
 def is_pytest_incomplete(item):
     """
     Returns `True` if a pytest item is incomplete - in other words if at least one of the 3 steps (setup/call/teardown)
@@ -418,7 +1232,7 @@ def is_pytest_incomplete(item):
     :param item:
     :return:
     """
-    return len(_get_pytest_status_keys(item)) < 3
+    return not _get_status_record(item).is_complete()
 
 
 def get_pytest_status(item, durations_in_ms=False, current_request=None):
@@ -440,9 +1254,9 @@ def get_pytest_status(item, durations_in_ms=False, current_request=None):
     :return: a tuple ((test_status, test_duration), status_dct)
     """
 
-    # the status keys that have been stored by our plugin.py module
-    status_keys = _get_pytest_status_keys(item)
-    if len(status_keys) == 0:
+    # the status record that has been maintained by our plugin.py module
+    status_record = _get_status_record(item)
+    if len(status_record.phases) == 0:
         if current_request is not None and current_request.node == item:
             # do not raise a warning: it is normal that there is no information, the node is being called.
             test_status = 'pending'
@@ -460,21 +1274,13 @@ def get_pytest_status(item, durations_in_ms=False, current_request=None):
         duration_factor = (1000 if durations_in_ms else 1)
 
         # create the status dictionary for that item
-        status_dct = OrderedDict()
-        test_status = 'passed'
-        test_duration = None
-        for k in status_keys:
-            statusreport = getattr(item, k)
-            status_dct[statusreport.when] = (statusreport.outcome, statusreport.duration * duration_factor)
-            # update global test status
-            if test_status == 'passed' \
-                    or (test_status == 'skipped' and statusreport.outcome != 'passed'):
-                test_status = statusreport.outcome
-            # global test duration is the duration of the "call" step only
-            if statusreport.when == "call":
-                test_duration = statusreport.duration * duration_factor
-
-        if len(status_keys) < 3:
+        status_dct = OrderedDict((when, (outcome, duration * duration_factor))
+                                 for when, outcome, duration in status_record.phases)
+        test_duration = None if status_record.duration is None else status_record.duration * duration_factor
+
+        if status_record.is_complete():
+            test_status = status_record.status
+        else:
             # this is an incomplete test
             test_status = 'pending'
 
@@ -483,59 +1289,66 @@ def get_pytest_status(item, durations_in_ms=False, current_request=None):
 
 def get_pytest_param_names(item):
     """ Returns a list containing a pytest session item's parameters """
-    return list(get_pytest_params(item).keys())
+    return [param_name for param_name, _ in _get_pytest_fixture_info(item)[1]]
 
 
 def get_pytest_params(item):
     """ Returns a dictionary containing a pytest session item's parameters """
-
-    if isinstance(item, _MinimalItem):
-        # Our special _MinimalItem object - when xdist is used and worker states have been saved + restored
-        return item.get_pytest_params()
-    elif isinstance(item, DoctestItem):
-        # No fixtures or parameters
-        return OrderedDict()
-    else:
-        param_dct = OrderedDict()
-        for param_name in item.fixturenames:  # note: item.funcargnames gives the exact same list
-            if hasattr(item, 'callspec'):
-                if param_name in item.callspec.params:
-                    param_value = item.callspec.params[param_name]
-                    if is_lazy_value_or_tupleitem_with_int_base(param_value):
-                        # remove the int base so that pandas does not interprete it as an int.
-                        param_value = param_value.clone(remove_int_base=True)
-                    arg = item if pytest81 else item.nodeid
-                    if item.session._fixturemanager.getfixturedefs(param_name, arg) is not None:
-                        # Fixture parameters have the same name than the fixtures themselves! change it
-                        param_dct[param_name + '_param'] = param_value
-                    else:
-                        # Non-fixture parameter: ok
-                        param_dct[param_name] = param_value
-                else:
-                    # this is a non-parametrized fixture: it is not available by default in item, this is normal pytest
-                    # behaviour (hence the @saved_fixture decorator)
-                    pass
-
-        return param_dct
+    return OrderedDict(_get_pytest_fixture_info(item)[1])
 
 
 def get_pytest_fixture_names(item):
     """ Returns a list containing a pytest session item's fixture names """
+    return list(_get_pytest_fixture_info(item)[0])
+
 
-    if isinstance(item, _MinimalItem):
-        # Our special _MinimalItem object - when xdist is used and worker states have been saved + restored
-        return item.get_pytest_fixture_names()
+def _get_pytest_fixture_info(item):
+    """
+    Returns a tuple (fixture_names, params) for a pytest session item, where `fixture_names` is a tuple containing the
+    names of the fixtures used by the item, and `params` is a tuple of (param_name, param_value) pairs.
+
+    Resolving fixture names requires the session's fixture manager, so it is done only once per item: the result is
+    memoized on the item. Our special `_MinimalItem` objects (when xdist is used and worker states have been saved +
+    restored) carry this information from the worker.
+    """
+    try:
+        return item._harvest_fixture_info
+    except AttributeError:
+        pass
+
+    fixture_names = []
+    params = []
+    if hasattr(item, 'callspec'):
+        callspec_params = item.callspec.params
     else:
-        # "normal" item
-        fixture_names = []
-        for param_name in item.fixturenames:  # note: item.funcargnames gives the exact same list
-            # if hasattr(item, 'callspec'):  # NO! it would only return fixtures when they are parametrized
-                # if param_name in item.callspec.params: NO ! it would only return fixtures when they are *directly* parametrized
-            arg = item if pytest81 else item.nodeid
-            if item.session._fixturemanager.getfixturedefs(param_name, arg) is not None:
-                fixture_names.append(param_name)
+        # this is a non-parametrized item
+        callspec_params = {}
+    from _pytest.doctest import DoctestItem  # pylint: disable=import-outside-toplevel
+    is_doctest = isinstance(item, DoctestItem)
+    fixturemanager = item.session._fixturemanager
+    arg = item if pytest81 else item.nodeid
+
+    for param_name in item.fixturenames:  # note: item.funcargnames gives the exact same list
+        is_fixture = fixturemanager.getfixturedefs(param_name, arg) is not None
+        if is_fixture:
+            fixture_names.append(param_name)
+
+        # note: a non-parametrized fixture is not available in callspec, this is normal pytest behaviour (hence the
+        # @saved_fixture decorator). Doctests have no parameters.
+        if not is_doctest and param_name in callspec_params:
+            param_value = callspec_params[param_name]
+            if is_lazy_value_or_tupleitem_with_int_base(param_value):
+                # remove the int base so that pandas does not interprete it as an int.
+                param_value = param_value.clone(remove_int_base=True)
+            if is_fixture:
+                # Fixture parameters have the same name than the fixtures themselves! change it
+                params.append((param_name + '_param', param_value))
+            else:
+                # Non-fixture parameter: ok
+                params.append((param_name, param_value))
 
-        return fixture_names
+    item._harvest_fixture_info = fixture_info = (tuple(fixture_names), tuple(params))
+    return fixture_info
 
 
 # --- misc
@@ -570,6 +1383,16 @@ def get_persistable_session_items(session):
     return [_MinimalItem(item) for item in session.items]
 
 
+def get_persistable_session_item(item):
+    """
+    Returns a minimal representation of a single session item, see `get_persistable_session_items`.
+
+    :param item: a pytest session item
+    :return:
+    """
+    return _MinimalItem(item)
+
+
 _MinimalCallSpec = namedtuple('_MinimalCallSpec', ('params',))
 
 
@@ -592,17 +1415,20 @@ class _MinimalItem(object):
         self.fixturenames = tuple(item.fixturenames)
 
         # We do not store the session object so everything that depends on it should be retrieved:
-        self._validated_pytest_params = get_pytest_params(item)
-        self._validated_fix_names = get_pytest_fixture_names(item)
+        self._harvest_fixture_info = _get_pytest_fixture_info(item)
 
         # all pytest-harvest attributes
         for k, v in vars(item).items():
             if k.startswith(HARVEST_PREFIX):
                 # v is a TestReport object
                 setattr(self, k, v)
+        try:
+            setattr(self, STATUS_RECORD_ATTR, getattr(item, STATUS_RECORD_ATTR))
+        except AttributeError:
+            pass
 
     def get_pytest_params(self):
-        return self._validated_pytest_params
+        return get_pytest_params(self)
 
     def get_pytest_fixture_names(self):
-        return self._validated_fix_names
+        return get_pytest_fixture_names(self)
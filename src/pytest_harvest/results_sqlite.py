@@ -0,0 +1,286 @@
+import json
+import sqlite3
+from collections import OrderedDict
+from time import time
+
+try:  # python 3.5+
+    from typing import Any, Iterable, List, Mapping, Optional, Tuple
+except ImportError:
+    pass
+
+from pytest_harvest.common import get_qualified_name, new_run_id
+from pytest_harvest.results_bags import ResultsBag
+from pytest_harvest.results_jsonl import _to_json_value
+from pytest_harvest.results_session import PYTEST_OBJ_NAME, synthesis_rows_to_columns
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created REAL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    module TEXT,
+    pytest_obj TEXT,
+    status TEXT,
+    duration_ms REAL,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE INDEX IF NOT EXISTS tests_nodeid ON tests (nodeid);
+CREATE INDEX IF NOT EXISTS tests_module ON tests (module);
+CREATE INDEX IF NOT EXISTS tests_status ON tests (status);
+CREATE TABLE IF NOT EXISTS phases (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    outcome TEXT,
+    duration_ms REAL
+);
+CREATE INDEX IF NOT EXISTS phases_node ON phases (run_id, nodeid);
+CREATE TABLE IF NOT EXISTS params (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value,
+    is_json INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS params_node ON params (run_id, nodeid);
+CREATE INDEX IF NOT EXISTS params_name_value ON params (name, value);
+CREATE TABLE IF NOT EXISTS fixtures (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value,
+    is_json INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fixtures_node ON fixtures (run_id, nodeid);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    bag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value,
+    is_json INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_node ON results (run_id, nodeid);
+CREATE INDEX IF NOT EXISTS results_name ON results (bag, name);
+"""
+
+
+def _to_sql_value(value):
+    """Returns a tuple (sql_value, is_json) where `sql_value` is `value` itself if sqlite supports it, or json."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value, 0
+    else:
+        return json.dumps(value, default=_to_json_value), 1
+
+
+def _from_sql_value(sql_value, is_json):
+    """Inverse of `_to_sql_value`"""
+    return json.loads(sql_value) if is_json else sql_value
+
+
+class SqliteResultsStore(object):
+    """
+    A local SQLite database where the results of test sessions are stored, one `run_id` per session, so that results
+    of many past runs can be queried with SQL without loading them all in memory.
+
+    Rows in the same format than `get_session_results_dct` are written with `write_rows`. For each test node,
+
+     - the test status and duration are stored in table `tests` (indexed by node id, module and status),
+     - the status of each pytest phase is stored in table `phases`,
+     - the parameters are stored in table `params` (indexed by parameter name and value),
+     - each entry of the results bags (`ResultsBag` fixture values) is stored in table `results`,
+     - other saved fixture values are stored in table `fixtures`.
+
+    Values that sqlite does not support natively are stored as json, with column `is_json` set to 1. Inserts are done
+    in a transaction that is committed every `batch_size` test nodes, and when `commit` or `close` are called.
+
+    `get_results_dct` and `get_results_df` read the results of a run back, in the same formats than
+    `get_session_results_dct` and `get_session_results_df`.
+    """
+    __slots__ = ('path', 'run_id', 'batch_size', '_conn', '_nb_pending')
+
+    def __init__(self,
+                 path,           # type: str
+                 run_id=None,    # type: str
+                 batch_size=100  # type: int
+                 ):
+        """
+        :param path: the path of the sqlite database file. It is created if needed.
+        :param run_id: the id of the run where rows are written by `write_rows`. By default a new run id is created
+            with `new_run_id`.
+        :param batch_size: the number of test nodes written in each transaction.
+        """
+        self.path = path
+        self.run_id = run_id if run_id is not None else new_run_id()
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.executescript(_SCHEMA)
+        self._nb_pending = 0
+
+    def write_rows(self,
+                   rows  # type: Iterable[Tuple[str, Mapping[str, Any]]]
+                   ):
+        """
+        Writes `(nodeid, row)` tuples to the current run, where rows are in the same format than the values of
+        `get_session_results_dct` (non-flattened, without 'pytest_' prefix, with status details and durations in ms).
+
+        :param rows: an iterable of `(nodeid, row)` tuples
+        """
+        conn = self._conn
+        run_id = self.run_id
+        if self._nb_pending == 0:
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, created) VALUES (?, ?)", (run_id, time()))
+
+        for nodeid, row in rows:
+            pytest_obj = row.get(PYTEST_OBJ_NAME)
+            module = getattr(pytest_obj, '__module__', None)
+            conn.execute("INSERT OR REPLACE INTO tests VALUES (?, ?, ?, ?, ?, ?)",
+                         (run_id, nodeid, module, get_qualified_name(pytest_obj), row.get('status'),
+                          row.get('duration_ms')))
+            for table in ('phases', 'params', 'fixtures', 'results'):
+                conn.execute("DELETE FROM %s WHERE run_id = ? AND nodeid = ?" % table, (run_id, nodeid))
+
+            conn.executemany("INSERT INTO phases VALUES (?, ?, ?, ?, ?)",
+                             [(run_id, nodeid, when, outcome, duration)
+                              for when, (outcome, duration) in row.get('status_details', {}).items()])
+            conn.executemany("INSERT INTO params VALUES (?, ?, ?, ?, ?)",
+                             [(run_id, nodeid, name) + _to_sql_value(value)
+                              for name, value in row.get('params', {}).items()])
+
+            fixture_rows, results_rows = [], []
+            for name, value in row.get('fixtures', {}).items():
+                if isinstance(value, ResultsBag):
+                    results_rows += [(run_id, nodeid, name, k) + _to_sql_value(v) for k, v in value.items()]
+                else:
+                    fixture_rows.append((run_id, nodeid, name) + _to_sql_value(value))
+            conn.executemany("INSERT INTO fixtures VALUES (?, ?, ?, ?, ?)", fixture_rows)
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", results_rows)
+
+            self._nb_pending += 1
+            if self._nb_pending >= self.batch_size:
+                self.commit()
+
+    def commit(self):
+        """Commits the rows written so far"""
+        self._conn.commit()
+        self._nb_pending = 0
+
+    def close(self):
+        """Commits the rows written so far and closes the database connection"""
+        self.commit()
+        self._conn.close()
+
+    def get_run_ids(self):
+        # type: (...) -> List[str]
+        """Returns the ids of all runs stored in the database, from the oldest to the most recent"""
+        return [r[0] for r in self._conn.execute("SELECT run_id FROM runs ORDER BY created, rowid")]
+
+    def _select_nodes(self, run_id, module, status, params):
+        """Returns the selected rows of table `tests`, using the indexes of the tables"""
+        if run_id is None:
+            run_ids = self.get_run_ids()
+            if len(run_ids) == 0:
+                return run_id, []
+            run_id = run_ids[-1]
+
+        query = "SELECT nodeid, pytest_obj, status, duration_ms FROM tests WHERE run_id = ?"
+        args = [run_id]
+        if module is not None:
+            query += " AND module = ?"
+            args.append(module)
+        if status is not None:
+            query += " AND status = ?"
+            args.append(status)
+        for name, value in (params or {}).items():
+            query += " AND EXISTS (SELECT 1 FROM params p WHERE p.run_id = tests.run_id AND p.nodeid = tests.nodeid " \
+                     "AND p.name = ? AND p.value = ?)"
+            args += [name, _to_sql_value(value)[0]]
+        return run_id, self._conn.execute(query + " ORDER BY rowid", args).fetchall()
+
+    def _get_node_contents(self, run_id, table, cols):
+        """Returns a dictionary {nodeid: [rows]} with the contents of `table` for run `run_id`"""
+        contents = dict()
+        for r in self._conn.execute("SELECT nodeid, %s FROM %s WHERE run_id = ? ORDER BY rowid" % (cols, table),
+                                    (run_id,)):
+            contents.setdefault(r[0], []).append(r[1:])
+        return contents
+
+    def get_results_dct(self,
+                        run_id=None,  # type: Optional[str]
+                        module=None,  # type: Optional[str]
+                        status=None,  # type: Optional[str]
+                        params=None   # type: Optional[Mapping[str, Any]]
+                        ):
+        # type: (...) -> Mapping[str, Mapping[str, Any]]
+        """
+        Reads the results of a run back, in the same format than `get_session_results_dct`. Note that the
+        `pytest_obj` entry contains the qualified name of the test function, and that values that were stored as
+        json are read back as json types (dicts, lists, strings...).
+
+        :param run_id: the id of the run to read. By default the most recent run is used.
+        :param module: an optional module name, to only read the tests of this module.
+        :param status: an optional status ('passed', 'failed', 'skipped'), to only read the tests with this status.
+        :param params: an optional dictionary {param_name: value}, to only read the tests with these parameter values.
+        :return: an ordered dictionary {nodeid: row}
+        """
+        run_id, nodes = self._select_nodes(run_id, module, status, params)
+        if len(nodes) == 0:
+            return OrderedDict()
+
+        phases = self._get_node_contents(run_id, 'phases', 'phase, outcome, duration_ms')
+        params_contents = self._get_node_contents(run_id, 'params', 'name, value, is_json')
+        fixtures = self._get_node_contents(run_id, 'fixtures', 'name, value, is_json')
+        results = self._get_node_contents(run_id, 'results', 'bag, name, value, is_json')
+
+        results_dct = OrderedDict()
+        for nodeid, pytest_obj, test_status, duration in nodes:
+            fixtures_dct = OrderedDict((name, _from_sql_value(v, j)) for name, v, j in fixtures.get(nodeid, ()))
+            for bag, name, v, j in results.get(nodeid, ()):
+                fixtures_dct.setdefault(bag, ResultsBag())[name] = _from_sql_value(v, j)
+
+            status_dct = OrderedDict((when, (outcome, d)) for when, outcome, d in phases.get(nodeid, ()))
+            params_dct = OrderedDict((name, _from_sql_value(v, j)) for name, v, j in params_contents.get(nodeid, ()))
+
+            results_dct[nodeid] = OrderedDict([(PYTEST_OBJ_NAME, pytest_obj), ('status', test_status),
+                                               ('duration_ms', duration), ('status_details', status_dct),
+                                               ('params', params_dct), ('fixtures', fixtures_dct)])
+        return results_dct
+
+    def get_results_df(self,
+                       run_id=None,     # type: Optional[str]
+                       module=None,     # type: Optional[str]
+                       status=None,     # type: Optional[str]
+                       params=None,     # type: Optional[Mapping[str, Any]]
+                       engine='pandas'  # type: str
+                       ):
+        # type: (...) -> pd.DataFrame
+        """
+        Reads the results of a run back, as a pandas `DataFrame` similar to the one of `get_session_results_df`: the
+        parameters, saved fixtures and results bag entries are columns. See `get_results_dct` for the arguments.
+
+        :param engine: the dataframe library to use, one of 'pandas' (default), 'polars' or 'arrow'. See
+            `columns_to_frame` for details.
+        :return: a pandas `DataFrame` indexed by test id
+        """
+        from pytest_harvest.plugin import columns_to_frame  # pylint: disable=import-outside-toplevel
+
+        param_names = []
+        flat_rows = []
+        for nodeid, row in self.get_results_dct(run_id=run_id, module=module, status=status, params=params).items():
+            flat_row = OrderedDict((k, row[k]) for k in (PYTEST_OBJ_NAME, 'status', 'duration_ms'))
+            flat_row.update(row['params'])
+            param_names += [p for p in row['params'] if p not in param_names]
+            for name, value in row['fixtures'].items():
+                if isinstance(value, ResultsBag):
+                    flat_row.update(value)
+                else:
+                    flat_row[name] = value
+            flat_rows.append((nodeid, flat_row))
+
+        columns = synthesis_rows_to_columns(flat_rows)
+        return columns_to_frame(columns, param_names=param_names, engine=engine,
+                                what="`SqliteResultsStore.get_results_df`")
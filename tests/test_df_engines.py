@@ -0,0 +1,74 @@
+import pytest
+
+from pytest_harvest import columns_to_frame
+
+
+COLUMNS = {'test_id': ['t1', 't2', 't3'], 'pytest_obj': [columns_to_frame] * 3, 'status': ['passed', 'failed', 'passed'],
+           'duration_ms': [1., 2., None], 'p': ['a', 'b', 'a'], 'q': [1, 2, 1], 'o': [object(), 1, None]}
+
+
+def test_polars_engine():
+    """The polars frame has the same contents and dtypes rules than the pandas one"""
+    pl = pytest.importorskip('polars')
+    df = columns_to_frame(COLUMNS, param_names=('p', 'q'), engine='polars')
+    assert df.columns == ['test_id', 'pytest_obj', 'status', 'duration_ms', 'p', 'q', 'o']
+    assert df['pytest_obj'][0] == 'pytest_harvest.plugin.columns_to_frame'
+    assert df.schema['status'] == pl.Categorical
+    assert df.schema['p'] == pl.Categorical
+    assert df.schema['q'] == pl.Int64
+    assert df.schema['o'] == pl.String
+    assert df['duration_ms'].to_list() == [1., 2., None]
+
+
+def test_arrow_engine():
+    """The arrow engine returns an arrow table"""
+    pa = pytest.importorskip('pyarrow')
+    table = columns_to_frame(COLUMNS, param_names=('p', 'q'), engine='arrow')
+    assert isinstance(table, pa.Table)
+    assert table.column_names == list(COLUMNS)
+
+
+def test_invalid_engine():
+    with pytest.raises(ValueError):
+        columns_to_frame(COLUMNS, engine='foo')
+
+
+TEST_FILE = """
+import pytest
+from pytest_harvest import get_session_results_df, get_module_results_df
+
+
+@pytest.mark.parametrize('p', ['a', 'b'])
+def test_engines_foo(p, results_bag):
+    results_bag.size = len(p)
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'polars', 'arrow'])
+def test_synthesis(request, engine):
+    session_df = get_session_results_df(request, engine=engine)
+    module_df = get_module_results_df(request.session, module_name=__name__, engine=engine)
+    if engine != 'pandas':
+        # no index: the test id is the first column
+        assert list(session_df.column_names if engine == 'arrow' else session_df.columns)[0] == 'test_id'
+    assert len(module_df) == len(session_df) >= 2
+"""
+
+
+def test_engines_in_session(testdir):
+    """The results df helpers accept an engine argument"""
+    pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+    testdir.makepyfile(TEST_FILE)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=5)
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'polars', 'arrow'])
+def test_engines_dtypes(engine):
+    """Known dtypes (e.g. from a results bag schema) are used instead of inferring them"""
+    pytest.importorskip({'pandas': 'pandas', 'polars': 'polars', 'arrow': 'pyarrow'}[engine])
+    df = columns_to_frame(COLUMNS, param_names=('p', 'q'), engine=engine, dtypes={'q': float, 'duration_ms': object})
+    if engine == 'arrow':
+        assert str(df.schema.field('q').type) == 'double'
+    else:
+        assert str(df['q'].dtype) in ('float64', 'Float64')
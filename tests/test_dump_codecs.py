@@ -0,0 +1,76 @@
+import gzip
+import pickle
+import sys
+from io import BytesIO
+
+import pytest
+
+from pytest_harvest.dump_codecs import DUMP_MAGIC, parse_codec, read_dump, write_dump, append_segment, iter_segments
+
+
+@pytest.mark.parametrize('codec', ['none', 'gzip', 'gzip:1', 'zlib', 'lzma', 'lz4', 'zstd'])
+def test_dump_codecs(codec):
+    """Dumps are read back whatever their codec, which is detected from their header"""
+    if codec == 'lz4':
+        pytest.importorskip('lz4.frame')
+    elif codec == 'zstd':
+        try:
+            from compression import zstd  # noqa
+        except ImportError:
+            pytest.importorskip('zstandard')
+
+    obj = ([{'nodeid': 'test_foo[%s]' % i} for i in range(100)], {'results_bag': {'a': 'b' * 1000}})
+    f = BytesIO()
+    write_dump(f, obj, codec)
+    assert f.getvalue().startswith(DUMP_MAGIC)
+    if codec != 'none':
+        # the data is compressed
+        assert len(f.getvalue()) < len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    f.seek(0)
+    assert read_dump(f) == obj
+
+
+def test_gzip_codec():
+    """The 'gzip' codec (and its 'zlib' alias) writes standard gzip data after the header"""
+    for codec in ('gzip', 'zlib'):
+        f = BytesIO()
+        write_dump(f, {'a': 1}, codec)
+        header = DUMP_MAGIC + bytes((1, 4)) + b'gzip'
+        assert f.getvalue().startswith(header)
+        assert pickle.loads(gzip.decompress(f.getvalue()[len(header):])) == {'a': 1}
+
+
+def test_zstd_codec_zstandard(monkeypatch):
+    """Without `compression.zstd` (python < 3.14), the 'zstd' codec uses `zstandard` to write and read the dumps"""
+    zstandard = pytest.importorskip('zstandard')
+    monkeypatch.setitem(sys.modules, 'compression', None)
+
+    obj = [{'nodeid': 'test_foo[%s]' % i} for i in range(100)]
+    f = BytesIO()
+    write_dump(f, obj, 'zstd:1')
+    header = DUMP_MAGIC + bytes((1, 4)) + b'zstd'
+    assert pickle.loads(zstandard.ZstdDecompressor().decompressobj().decompress(f.getvalue()[len(header):])) == obj
+    f.seek(0)
+    assert read_dump(f) == obj
+
+
+def test_read_plain_pickle():
+    """Dumps written without header (plain pickle) can still be read"""
+    assert read_dump(BytesIO(pickle.dumps({'a': 1}))) == {'a': 1}
+
+
+@pytest.mark.parametrize('codec', ['bz2', 'gzip:fast'])
+def test_invalid_codec(codec):
+    with pytest.raises(ValueError):
+        parse_codec(codec)
+
+
+def test_segments():
+    """Segments are read back in order, and a truncated last segment is ignored"""
+    f = BytesIO()
+    append_segment(f, [1, 2])
+    append_segment(f, {'a': 3}, 'gzip')
+    append_segment(f, 'truncated')
+    f.truncate(f.tell() - 1)
+    f.seek(0)
+    assert list(iter_segments(f)) == [[1, 2], {'a': 3}]
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _get_imported_modules(statement):
+    """Returns the modules imported by `statement` in a new python process where pytest is already imported"""
+    code = "import sys, pytest; before = set(sys.modules); %s; print(' '.join(sorted(set(sys.modules) - before)))" \
+           % statement
+    return subprocess.check_output([sys.executable, "-c", code], universal_newlines=True).split()
+
+
+def test_package_import_is_lazy():
+    """Importing the package does not import any submodule nor dependency"""
+    assert _get_imported_modules("import pytest_harvest") == ['pytest_harvest']
+
+
+@pytest.mark.parametrize('module', ['pytest_harvest.results_arrow', 'pytest_harvest.results_jsonl',
+                                    'pytest_harvest.results_sqlite', 'pytest_harvest.results_history',
+                                    'pytest_harvest.mmap_store', 'pytest_harvest.dump_codecs', 'mmap',
+                                    'sqlite3', 'statistics', 'packaging', 'setuptools_scm', 'pandas',
+                                    '_pytest.doctest'])
+def test_plugin_import_is_minimal(module):
+    """Loading the plugin (as pytest does in each process) does not import the optional features modules"""
+    assert module not in _get_imported_modules("import pytest_harvest.plugin")
+
+
+def test_lazy_symbols():
+    """Public symbols and submodules are still available"""
+    code = "import pytest_harvest as ph; from pytest_harvest import *; " \
+           "assert all(hasattr(ph, name) for name in ph.__all__); " \
+           "assert ph.SqliteResultsStore is ph.results_sqlite.SqliteResultsStore; print(ph.__version__)"
+    assert subprocess.check_output([sys.executable, "-c", code], universal_newlines=True).strip()
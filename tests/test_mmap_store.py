@@ -0,0 +1,77 @@
+import os
+
+from pytest_harvest import MmapFixtureStore, evict_saved_fixtures
+from pytest_harvest.fixture_cache import get_nodeid_index
+
+
+def test_mmap_store(tmpdir):
+    """Values are kept in memory until they are spilled, then loaded from the segment file at each access"""
+    path = str(tmpdir.join('store.seg'))
+    store = MmapFixtureStore(path)
+    store['my_fix'] = {'n1': [1, 2]}
+    store['my_fix']['n2'] = {'a': 'b'}
+    assert store.segment.size == 0
+
+    store.spill('n1')
+    assert store.segment.size > 0
+    assert store['my_fix']['n1'] == [1, 2]
+    # a new object is loaded at each access
+    assert store['my_fix']['n1'] is not store['my_fix']['n1']
+
+    store.spill()
+    store['my_fix']['n3'] = 3
+    assert list(store['my_fix'].items()) == [('n1', [1, 2]), ('n2', {'a': 'b'}), ('n3', 3)]
+    assert list(reversed(store['my_fix'])) == ['n3', 'n2', 'n1']
+
+    # the store can be used as any other fixture store
+    assert get_nodeid_index(store).get_keys('n2') == ['my_fix']
+    assert evict_saved_fixtures(store, 'n2') == ['my_fix']
+    assert list(store['my_fix']) == ['n1', 'n3']
+
+    store.close()
+
+
+def test_mmap_store_temporary_file():
+    """By default a temporary segment file is used, and removed when the store is closed"""
+    store = MmapFixtureStore()
+    path = store.segment.path
+    assert os.path.exists(path)
+    store.close()
+    assert not os.path.exists(path)
+
+
+TEST_FILE = """
+import pytest
+from pytest_harvest import MmapFixtureStore, create_results_bag_fixture, saved_fixture, get_session_results_df
+
+STORE = MmapFixtureStore()
+my_bag = create_results_bag_fixture(STORE, name='my_bag')
+
+
+@pytest.fixture
+@saved_fixture(STORE)
+def my_array():
+    return list(range(1000))
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_mmap_foo(p, my_bag, my_array):
+    my_bag.total = sum(my_array) + p
+
+
+def test_synthesis(request):
+    # the values of the completed tests have been moved to the segment file
+    assert STORE['my_bag']._pending == {}
+    assert STORE.segment.size > 0
+
+    df = get_session_results_df(request, fixture_store=STORE, results_bag_fixture_name='my_bag')
+    assert list(df['total']) == [499501, 499502]
+    assert [len(a) for a in df['my_array']] == [1000, 1000]
+"""
+
+
+def test_mmap_store_in_session(testdir):
+    """A `MmapFixtureStore` can be used to save fixtures and results bags"""
+    testdir.makepyfile(TEST_FILE)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
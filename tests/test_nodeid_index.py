@@ -0,0 +1,59 @@
+import pickle
+from collections import OrderedDict
+
+from pytest_harvest.fixture_cache import get_nodeid_index, _store_fixture_and_views
+
+
+def test_nodeid_index_incremental():
+    """The index attached to an OrderedDict store is maintained when fixtures are saved"""
+    store = OrderedDict([('a', OrderedDict()), ('b', OrderedDict()), ('c', OrderedDict())])
+    nodeid_index = get_nodeid_index(store)
+    assert nodeid_index.get_keys('t1') == ()
+
+    _store_fixture_and_views(store, 't1', 'b', 1, views=None, save_raw=True)
+    _store_fixture_and_views(store, 't1', 'a', 2, views=None, save_raw=True)
+    _store_fixture_and_views(store, 't2', 'a', 3, views={'c': str}, save_raw=True)
+    assert get_nodeid_index(store) is nodeid_index
+
+    # keys are returned in the store order
+    assert nodeid_index.get_keys('t1') == ['a', 'b']
+    assert nodeid_index.get_keys('t2') == ['a', 'c']
+
+
+def test_nodeid_index_modified_store():
+    """Stores modified directly, or that can not hold the index (plain dict), are supported"""
+    store = OrderedDict([('a', OrderedDict(t1=1))])
+    assert list(get_nodeid_index(store).get_keys('t1')) == ['a']
+
+    store['a']['t2'] = 2
+    store['b'] = {'t2': 3}
+    assert get_nodeid_index(store).get_keys('t2') == ['a', 'b']
+
+    del store['a']
+    assert list(get_nodeid_index(store).get_keys('t1')) == []
+
+    plain_store = {'a': {'t1': 1}}
+    assert list(get_nodeid_index(plain_store).get_keys('t1')) == ['a']
+
+
+def test_nodeid_index_replaced_entries():
+    """Fixture dictionaries replaced or modified in place without changing their size are detected"""
+    store = OrderedDict([('a', OrderedDict(t1=1))])
+    assert list(get_nodeid_index(store).get_keys('t1')) == ['a']
+
+    store['a'] = OrderedDict(t2=2)
+    assert get_nodeid_index(store).get_entries(store, 't2') == [('a', 2)]
+
+    del store['a']['t2']
+    store['a']['t3'] = 3
+    nodeid_index = get_nodeid_index(store)
+    assert nodeid_index.get_entries(store, 't2') == []
+    assert nodeid_index.get_entries(store, 't3') == [('a', 3)]
+
+
+def test_nodeid_index_not_pickled():
+    """The index is not stored in the store, so it is not pickled with it (for example in xdist workers dumps)"""
+    store = OrderedDict([('a', OrderedDict(t1=1))])
+    get_nodeid_index(store)
+    assert vars(store) == {}
+    assert len(pickle.dumps(store)) == len(pickle.dumps(OrderedDict([('a', OrderedDict(t1=1))])))
@@ -0,0 +1,77 @@
+import pytest
+
+from pytest_harvest import columns_to_arrow_table, write_synthesis_parquet, TEST_ID_COLUMN, PYTEST_OBJ_NAME
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def test_columns_to_arrow_table():
+    """Types are inferred by arrow, test functions and unsupported objects are converted to strings"""
+    columns = {TEST_ID_COLUMN: ['a', 'b'], PYTEST_OBJ_NAME: [test_columns_to_arrow_table, None],
+               'x': [1, None], 'y': [object(), 'hello']}
+    table = columns_to_arrow_table(columns)
+    assert table.column_names == [TEST_ID_COLUMN, PYTEST_OBJ_NAME, 'x', 'y']
+    assert table.column(PYTEST_OBJ_NAME).to_pylist() == ['%s.test_columns_to_arrow_table' % __name__, None]
+    assert table.column('x').type == pa.int64()
+    assert table.column('y').type == pa.string()
+
+
+def test_write_synthesis_parquet(tmpdir):
+    """Rows are written in several batches, with a schema unified across batches"""
+    rows = [('t%s' % i, dict(i=i, f=(i if i < 3 else i + 0.5), s=(i if i < 3 else 'str'))) for i in range(5)]
+    rows.append(('t5', dict(i=5, late=True)))
+
+    path = str(tmpdir.join('results.parquet'))
+    assert write_synthesis_parquet(path, lambda: iter(rows), batch_size=2) == 6
+
+    pf = pq.ParquetFile(path)
+    assert pf.metadata.num_row_groups == 3
+    table = pf.read()
+    assert table.column_names == [TEST_ID_COLUMN, 'i', 'f', 's', 'late']
+    assert table.column('i').type == pa.int64()
+    assert table.column('f').to_pylist() == [0., 1., 2., 3.5, 4.5, None]
+    assert table.column('s').to_pylist() == ['0', '1', '2', 'str', 'str', None]
+    assert table.column('late').to_pylist() == [None] * 5 + [True]
+
+
+TEST_FILE = """
+import pytest
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+"""
+
+
+def test_harvest_parquet_option(testdir):
+    """The --harvest-parquet option writes the session results at the end of the session"""
+    testdir.makepyfile(TEST_FILE)
+    path = testdir.tmpdir.join('out.parquet')
+    result = testdir.runpytest('--harvest-parquet=%s' % path)
+    result.assert_outcomes(passed=2)
+
+    table = pq.read_table(str(path))
+    assert table.column('status').to_pylist() == ['passed', 'passed']
+    assert table.column('p').to_pylist() == [1, 2]
+    assert table.column('p_squared').to_pylist() == [1, 4]
+
+
+CACHE_TEST_FILE = TEST_FILE + """
+
+def test_write(request, tmpdir):
+    from pytest_harvest import write_session_results_parquet
+    from pytest_harvest.results_session import get_synthesis_cache
+
+    assert write_session_results_parquet(request, str(tmpdir.join('out.parquet'))) == 2
+    # the rows are streamed, not kept in the session synthesis cache
+    assert get_synthesis_cache(request.session)._rows == {}
+"""
+
+
+def test_write_session_results_parquet_no_cache(testdir):
+    """Writing the session results to parquet does not keep the synthesis rows in memory"""
+    testdir.makepyfile(CACHE_TEST_FILE)
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=3)
@@ -1,4 +1,8 @@
-from pytest_harvest import ResultsBag
+import pickle
+
+import pytest
+
+from pytest_harvest import ResultsBag, TypedResultsBag, create_results_bag_fixture
 
 
 def test_results_bag_basic():
@@ -19,3 +23,32 @@ def test_results_bag_basic():
     # We need to call hash(), because id() might return a result outside of the
     # range of hash(), Py_hash_t/Py_ssize_t. hash() is idempotent.
     assert hash(r) == hash(id(r))
+
+
+def test_typed_results_bag():
+    """Values of the schema fields are validated and coerced, also in the constructor, `update` and `setdefault`"""
+    r = TypedResultsBag({'a': float, 'n': int, 'ok': bool}, a=1)
+    assert r == {'a': 1.} and type(r['a']) is float
+
+    r.update(n=2.0, other='x')
+    assert r == {'a': 1., 'n': 2, 'other': 'x'} and type(r['n']) is int
+    assert r.setdefault('ok', 1) is True
+
+    for field, value in (('n', 1.5), ('a', 'foo'), ('ok', 2)):
+        with pytest.raises(TypeError):
+            r[field] = value
+    r.n = None
+    assert r.n is None
+
+    # the schema is kept when pickling (for example in xdist dumps)
+    r2 = pickle.loads(pickle.dumps(r))
+    assert r2 == r
+    with pytest.raises(TypeError):
+        r2.n = 1.5
+
+
+def test_typed_results_bag_invalid_schema():
+    with pytest.raises(TypeError):
+        TypedResultsBag({'a': 'float'})
+    with pytest.raises(ValueError):
+        create_results_bag_fixture('fixture_store', name='typed_bag', bag_type=ResultsBag, schema={'a': float})
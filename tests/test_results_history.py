@@ -0,0 +1,95 @@
+import pytest
+
+from pytest_harvest import ResultsHistory, ResultsBaseline
+from pytest_harvest.results_history import get_numeric_fields
+
+
+class DictCache(dict):
+    """A minimal replacement for `config.cache`"""
+    def get(self, key, default):
+        return dict.get(self, key, default)
+
+    def set(self, key, value):
+        self[key] = value
+
+
+def test_history_baselines():
+    """The baseline can be the last run, the median of all runs, or a tagged run"""
+    history = ResultsHistory(max_runs=2)
+    assert history.get_baseline('last') is None
+    history.add_run({'a': 1., 'b': 2.}, fields={'acc': {'a': 0.5}}, tag='v1')
+    history.add_run({'a': 3.})
+    history.add_run({'a': 2., 'b': 4.})
+    assert history.get_baseline('last') == {'a': 2., 'b': 4.}
+    assert history.get_baseline('median') == {'a': 2., 'b': 3.}
+    assert history.get_baseline('v1') == {'a': 1., 'b': 2.}
+    assert history.get_baseline('v1', field='acc') == {'a': 0.5}
+    assert history.get_baseline('v2') is None
+
+    # tagged runs are kept
+    history.add_run({'a': 5.})
+    assert [run['tag'] for run in history.runs] == ['v1', None, None]
+    assert history.get_baseline('median') == {'a': 2., 'b': 3.}
+
+    cache = DictCache()
+    history.save(cache)
+    assert ResultsHistory.load(cache).runs == history.runs
+
+
+def test_baseline_slowdowns():
+    """Slowdowns are flagged above the threshold, and never for very short tests"""
+    baseline = ResultsBaseline({'a': 1., 'b': 1., 'c': 0.0001}, fields={'acc': {'a': 0.5}}, threshold=0.2)
+    assert baseline.get_slowdowns({'a': 1.1, 'b': 2., 'c': 0.0005, 'd': 3.}) == [('b', 1., 2., 1.)]
+
+    row = dict()
+    baseline.fill_row(row, 'a', 1500., durations_in_ms=True, pytest_prefix='pytest_')
+    assert row == {'pytest_baseline_duration_ms': 1000., 'pytest_duration_change': 0.5, 'pytest_slowdown': True,
+                   'baseline_acc': 0.5}
+
+
+def test_numeric_fields():
+    bags = {'a': {'acc': 1, 'ok': True, 'name': 'x'}, 'b': {'acc': 0.5}}
+    assert get_numeric_fields(bags, ['acc', 'ok', 'name']) == {'acc': {'a': 1., 'b': 0.5}, 'ok': {}, 'name': {}}
+
+
+TEST_FILE = """
+import os
+import time
+import pytest
+from pytest_harvest import get_session_synthesis_dct
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_history_foo(p, results_bag):
+    results_bag.accuracy = p / 10
+    if p == 2:
+        time.sleep(float(os.environ.get('HARVEST_TEST_SLEEP', '0.01')))
+
+
+def test_synthesis(request):
+    synth = get_session_synthesis_dct(request, filter=test_history_foo, durations_in_ms=True)
+    row = synth[list(synth)[1]]
+    with open('synthesis.txt', 'w') as f:
+        f.write(repr((row['pytest_baseline_duration_ms'] is not None, row['pytest_slowdown'],
+                      row['baseline_accuracy'])))
+"""
+
+
+def test_harvest_history_option(testdir, monkeypatch):
+    """The --harvest-history option compares the durations with the previous run"""
+    testdir.makepyfile(TEST_FILE)
+    testdir.makeini("[pytest]\nharvest_history_fields = accuracy\nharvest_slowdown_min_duration = 0.1\n")
+
+    # note: a subprocess is used since the default fixture store is shared in-process
+    monkeypatch.setenv('HARVEST_TEST_SLEEP', '0.01')
+    result = testdir.runpytest_subprocess('--harvest-history', '--harvest-history-tag=ref')
+    result.assert_outcomes(passed=3)
+    assert 'slowdown(s)' not in result.stdout.str()
+    assert testdir.tmpdir.join('synthesis.txt').read() == "(False, False, None)"
+
+    monkeypatch.setenv('HARVEST_TEST_SLEEP', '0.2')
+    result = testdir.runpytest_subprocess('--harvest-history', '--harvest-baseline=ref')
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*pytest-harvest: 1 slowdown(s) compared to baseline 'ref'*",
+                                 "*test_history_foo?2?: *ms -> *ms (+*%)"])
+    assert testdir.tmpdir.join('synthesis.txt').read() == "(True, True, 0.2)"
@@ -0,0 +1,135 @@
+import json
+import os
+import signal
+from collections import OrderedDict
+
+import pytest
+
+from pytest_harvest import JsonlResultsSink, read_jsonl_results, evict_saved_fixtures
+from pytest_harvest.fixture_cache import get_nodeid_index
+
+
+def test_jsonl_sink(tmpdir):
+    """Rows are written immediately, and a truncated last line is ignored when reading"""
+    path = str(tmpdir.join('results.jsonl'))
+    sink = JsonlResultsSink(path, fsync_interval=60)
+    sink.write_row('t1', OrderedDict([('pytest_obj', test_jsonl_sink), ('status', 'passed'), ('o', object)]))
+    assert read_jsonl_results(path) == {
+        't1': {'pytest_obj': '%s.test_jsonl_sink' % __name__, 'status': 'passed', 'o': 'builtins.object'}
+    }
+    sink.write_row('t2', {'status': 'failed', 'x': 1.5})
+    assert list(read_jsonl_results(path)) == ['t1', 't2']
+
+    # the session is killed while writing a line
+    sink.write_row('t3', {'status': 'passed'})
+    sink.close()
+    with open(path, 'a') as f:
+        f.write('{"test_id": "t4", "sta')
+    assert list(read_jsonl_results(path)) == ['t1', 't2', 't3']
+    assert sink.nb_rows == 3
+
+
+def test_evict_saved_fixtures():
+    """Entries of a node are removed from the store and from its index"""
+    store = OrderedDict([('a', OrderedDict([('n1', 1), ('n2', 2)])), ('b', OrderedDict([('n1', 3)]))])
+    assert sorted(evict_saved_fixtures(store, 'n1')) == ['a', 'b']
+    assert store == {'a': {'n2': 2}, 'b': {}}
+    assert evict_saved_fixtures(store, 'n1') == []
+    assert get_nodeid_index(store).get_keys('n2') == ['a']
+
+
+TEST_FILE = """
+import pytest
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+
+
+def test_store(fixture_store):
+    nb_entries = len([nodeid for nodeid in fixture_store['results_bag'] if nodeid.startswith('{module_name}.py')])
+    assert nb_entries == {expected_entries}
+"""
+
+
+@pytest.mark.parametrize('evict', [False, True], ids=['keep', 'evict'])
+def test_harvest_jsonl_option(testdir, evict):
+    """The --harvest-jsonl option writes the rows as tests complete, --harvest-jsonl-evict empties the store"""
+    # note: the module name is different for each run since the default fixture store is shared in-process
+    module_name = 'test_jsonl_%s' % ('evict' if evict else 'keep')
+    testdir.makepyfile(**{module_name: TEST_FILE.format(module_name=module_name, expected_entries=0 if evict else 2)})
+    args = ['--harvest-jsonl=out.jsonl'] + (['--harvest-jsonl-evict'] if evict else [])
+    result = testdir.runpytest(*args)
+    result.assert_outcomes(passed=3)
+
+    with open(str(testdir.tmpdir.join('out.jsonl'))) as f:
+        rows = [json.loads(line) for line in f]
+    assert [r['test_id'].split('::')[-1] for r in rows] == ['test_foo[1]', 'test_foo[2]', 'test_store']
+    assert [r['status'] for r in rows] == ['passed'] * 3
+    assert [r.get('p_squared') for r in rows] == [1, 4, None]
+    assert rows[0]['pytest_obj'] == '%s.test_foo' % module_name
+
+
+KILLED_TEST_FILE = """
+import os
+import signal
+
+
+def test_foo_1(results_bag):
+    results_bag.p = 1
+
+
+def test_foo_2(results_bag):
+    results_bag.p = 2
+
+
+def test_killed():
+    os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="SIGKILL is not available")
+def test_harvest_jsonl_killed_session(testdir):
+    """The rows of the tests completed before the session is killed are in the file"""
+    testdir.makepyfile(KILLED_TEST_FILE)
+    result = testdir.runpytest_subprocess('--harvest-jsonl=out.jsonl', '-p', 'no:cacheprovider')
+    assert result.ret != 0
+    rows = read_jsonl_results(os.path.join(str(testdir.tmpdir), 'out.jsonl'))
+    assert [(test_id.split('::')[-1], row['p']) for test_id, row in rows.items()] == [('test_foo_1', 1),
+                                                                                      ('test_foo_2', 2)]
+
+
+EVICT_CACHE_TEST_FILE = """
+from pytest_harvest import get_session_synthesis_dct
+from pytest_harvest.results_session import get_synthesis_cache
+
+CACHED_ROWS = []
+
+
+def test_foo(results_bag):
+    results_bag.p = 1
+
+
+def _get_cached_row(request, fixture_store):
+    get_session_synthesis_dct(request, fixture_store=fixture_store, flatten=True, use_cache=True)
+    rows, = get_synthesis_cache(request.session)._rows.values()
+    nodeid, = [nodeid for nodeid in rows if nodeid.endswith('test_foo')]
+    return rows[nodeid]
+
+
+def test_read_1(request, fixture_store, results_bag):
+    CACHED_ROWS.append(_get_cached_row(request, fixture_store))
+
+
+def test_read_2(request, fixture_store):
+    # the entries of test_read_1 were evicted in between: the row of test_foo was not recomputed
+    assert _get_cached_row(request, fixture_store) is CACHED_ROWS[0]
+"""
+
+
+def test_harvest_jsonl_evict_cache(testdir):
+    """Evicting the entries of a node does not remove the cached synthesis rows of the other nodes"""
+    testdir.makepyfile(test_jsonl_evict_cache=EVICT_CACHE_TEST_FILE)
+    result = testdir.runpytest('--harvest-jsonl=out.jsonl', '--harvest-jsonl-evict')
+    result.assert_outcomes(passed=3)
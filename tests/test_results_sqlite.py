@@ -0,0 +1,95 @@
+import sqlite3
+from collections import OrderedDict
+
+import pytest
+
+from pytest_harvest import SqliteResultsStore, ResultsBag
+
+
+def test_function():
+    pass
+
+
+def _row(status, p, bag):
+    return OrderedDict([('pytest_obj', test_function), ('status', status), ('duration_ms', 1.5),
+                        ('status_details', OrderedDict([('setup', ('passed', 0.1)), ('call', (status, 1.5)),
+                                                        ('teardown', ('passed', 0.1))])),
+                        ('params', OrderedDict([('p', p), ('t', (p, 'a'))])),
+                        ('fixtures', OrderedDict([('my_fix', {'a': p}), ('results_bag', ResultsBag(**bag))]))])
+
+
+def test_sqlite_store(tmpdir):
+    """Rows are written in batches, then read back and queried by status and parameters"""
+    path = str(tmpdir.join('results.db'))
+
+    store = SqliteResultsStore(path, run_id='run1', batch_size=2)
+    store.write_rows([('n1', _row('passed', 1, dict(acc=0.5))), ('n2', _row('failed', 2, dict(acc=0.1)))])
+    store.write_rows([('n3', _row('passed', 3, dict(acc=0.9, name='x')))])
+    assert store._nb_pending == 1
+    store.close()
+
+    store = SqliteResultsStore(path, batch_size=2)
+    store.write_rows([('n1', _row('passed', 1, dict(acc=0.6)))])
+    store.close()
+
+    store = SqliteResultsStore(path)
+    assert store.get_run_ids() == ['run1', store.get_run_ids()[-1]]
+    assert list(store.get_results_dct()) == ['n1']
+
+    results_dct = store.get_results_dct(run_id='run1')
+    assert list(results_dct) == ['n1', 'n2', 'n3']
+    expected_row = _row('passed', 3, dict(acc=0.9, name='x'))
+    # the test object is stored with its name, and non-sqlite values are read back as json
+    expected_row['pytest_obj'] = '%s.test_function' % __name__
+    expected_row['params']['t'] = [3, 'a']
+    assert results_dct['n3'] == expected_row
+    assert type(results_dct['n1']['fixtures']['results_bag']) is ResultsBag
+
+    assert list(store.get_results_dct(run_id='run1', status='passed')) == ['n1', 'n3']
+    assert list(store.get_results_dct(run_id='run1', params={'p': 2})) == ['n2']
+    assert list(store.get_results_dct(run_id='run1', module=__name__, params={'t': (3, 'a')})) == ['n3']
+
+    # the indexes are used
+    plan = store._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM params WHERE name = 'p' AND value = 2").fetchall()
+    assert 'params_name_value' in str(plan)
+    store.close()
+
+
+def test_sqlite_store_df(tmpdir):
+    """Results can be read back as a pandas DataFrame"""
+    pytest.importorskip('pandas')
+    store = SqliteResultsStore(str(tmpdir.join('results.db')))
+    store.write_rows([('n1', _row('passed', 1, dict(acc=0.5))), ('n2', _row('failed', 2, dict(acc=0.1)))])
+    df = store.get_results_df()
+    assert list(df.index) == ['n1', 'n2']
+    assert list(df.columns) == ['pytest_obj', 'status', 'duration_ms', 'p', 't', 'my_fix', 'acc']
+    assert list(df['acc']) == [0.5, 0.1]
+    store.close()
+
+
+TEST_FILE = """
+import pytest
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_sqlite_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+"""
+
+
+def test_harvest_sqlite_option(testdir):
+    """The --harvest-sqlite option stores each session in a new run"""
+    testdir.makepyfile(TEST_FILE)
+    path = str(testdir.tmpdir.join('results.db'))
+    for _ in range(2):
+        # note: a subprocess is used since the default fixture store is shared in-process
+        result = testdir.runpytest_subprocess('--harvest-sqlite=%s' % path)
+        result.assert_outcomes(passed=2)
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM runs").fetchone() == (2,)
+        assert conn.execute("SELECT status, COUNT(*) FROM tests GROUP BY status").fetchall() == [('passed', 4)]
+        assert conn.execute("SELECT phase FROM phases GROUP BY phase ORDER BY phase").fetchall() \
+            == [('call',), ('setup',), ('teardown',)]
+        assert conn.execute("SELECT value FROM results WHERE name = 'p_squared' ORDER BY rowid").fetchall() \
+            == [(1,), (4,), (1,), (4,)]
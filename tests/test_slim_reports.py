@@ -0,0 +1,32 @@
+import pytest
+
+
+TEST_FILE = """
+from pytest_harvest import HARVEST_PREFIX, get_session_synthesis_dct
+from pytest_harvest.results_session import SlimReport
+
+
+def test_foo():
+    print("hello")
+
+
+def test_slim_reports(request):
+    foo_item = request.session.items[0]
+    for when in ('setup', 'call', 'teardown'):
+        rep = getattr(foo_item, HARVEST_PREFIX + when)
+        assert isinstance(rep, SlimReport) == {slim}
+        assert rep.when == when and rep.outcome == 'passed' and rep.duration >= 0
+
+    synth_dct = get_session_synthesis_dct(request.session, filter=test_foo, status_details=True)
+    assert list(synth_dct.values())[0]['pytest_status'] == 'passed'
+"""
+
+
+@pytest.mark.parametrize('how', ['option', 'ini', 'none'])
+def test_slim_reports(testdir, how):
+    """The --harvest-slim-reports option (or its ini equivalent) replaces the reports with slim ones"""
+    testdir.makepyfile(TEST_FILE.format(slim=how != 'none'))
+    if how == 'ini':
+        testdir.makeini("[pytest]\nharvest_slim_reports = true\n")
+    result = testdir.runpytest(*(('--harvest-slim-reports',) if how == 'option' else ()))
+    result.assert_outcomes(passed=2)
@@ -0,0 +1,43 @@
+from collections import namedtuple
+
+import pytest
+
+from pytest_harvest import HARVEST_PREFIX, get_pytest_status, is_pytest_incomplete
+from pytest_harvest.results_session import update_pytest_status
+
+
+_Report = namedtuple('_Report', ('when', 'outcome', 'duration'))
+
+
+class _Item(object):
+    """A minimal item with reports attached"""
+
+
+@pytest.mark.parametrize('with_record', [True, False], ids="with_record={}".format)
+def test_status_record(with_record):
+    """The compact status record gives the same results than the reports attached to the item"""
+    item = _Item()
+
+    def report(when, outcome, duration):
+        rep = _Report(when, outcome, duration)
+        setattr(item, HARVEST_PREFIX + when, rep)
+        if with_record:
+            update_pytest_status(item, rep)
+
+    assert get_pytest_status(item) == (('unknown', None), {})
+    assert is_pytest_incomplete(item)
+
+    report('setup', 'passed', 0.5)
+    report('call', 'skipped', 1)
+    assert get_pytest_status(item, durations_in_ms=True) == (('pending', 1000),
+                                                             {'setup': ('passed', 500), 'call': ('skipped', 1000)})
+    assert is_pytest_incomplete(item)
+
+    report('teardown', 'passed', 0)
+    assert get_pytest_status(item)[0] == ('skipped', 1)
+    assert not is_pytest_incomplete(item)
+
+    # a phase reported again replaces the previous one
+    report('call', 'failed', 2)
+    assert get_pytest_status(item) == (('failed', 2), {'setup': ('passed', 0.5), 'call': ('failed', 2),
+                                                       'teardown': ('passed', 0)})
@@ -0,0 +1,42 @@
+import pytest
+
+from pytest_harvest import get_test_id_formatter, format_test_ids
+
+
+NODEIDS = ['path/to/test_file.py::TestClass::test_fun[a::0-b]', 'path\\to\\test_file.py::test_other']
+
+
+@pytest.mark.parametrize('test_id_format, expected', [
+    ('full', NODEIDS),
+    ('function', ['test_fun[a::0-b]', 'test_other']),
+    ('class', ['TestClass::test_fun[a::0-b]', 'test_other']),
+    ('module', ['test_file.py::TestClass::test_fun[a::0-b]', 'test_file.py::test_other']),
+], ids=str)
+def test_builtin_formats(test_id_format, expected):
+    """Built-in formats, on a single node id or in batch"""
+    test_id_formatter = get_test_id_formatter(test_id_format)
+    assert [test_id_formatter(nodeid) for nodeid in NODEIDS] == expected
+    assert format_test_ids(NODEIDS, test_id_format) == expected
+    assert format_test_ids(iter(NODEIDS), test_id_format) == expected
+
+
+def test_custom_format_memoized(request):
+    """Custom formatters are memoized too, in the session if provided"""
+    calls = []
+
+    def custom(test_id):
+        calls.append(test_id)
+        return test_id.lower()
+
+    assert format_test_ids(NODEIDS * 2, custom) == [n.lower() for n in NODEIDS] * 2
+    assert calls == NODEIDS
+
+    del calls[:]
+    assert format_test_ids(NODEIDS, custom, request.session) == [n.lower() for n in NODEIDS]
+    assert get_test_id_formatter(custom, request.session)(NODEIDS[0]) == NODEIDS[0].lower()
+    assert calls == NODEIDS
+
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        get_test_id_formatter('foo')
@@ -0,0 +1,206 @@
+import json
+
+import pytest
+
+
+TEST_FILE = """
+import pytest
+
+
+@pytest.mark.parametrize('p', [1, 2, 3, 4])
+def test_xdist_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+"""
+
+CONFTEST = """
+import json
+import os
+from pytest_harvest import get_session_results_dct, is_main_process
+
+
+def pytest_sessionfinish(session):
+    if is_main_process(session):
+        results = get_session_results_dct(session)
+        with open('results.json', 'w') as f:
+            json.dump({'results': sorted([row['status'], row['fixtures']['results_bag']['p_squared']]
+                                         for row in results.values()),
+                       'harvest_dir_used': os.path.exists('.xdist_harvested')}, f)
+"""
+
+
+def _run_xdist_session(testdir, *args):
+    """Runs the test file with 2 xdist workers and returns what the master has gathered"""
+    pytest.importorskip('xdist')
+    testdir.makepyfile(TEST_FILE)
+    testdir.makeconftest(CONFTEST)
+    result = testdir.runpytest_subprocess('-n', '2', *args)
+    result.assert_outcomes(passed=4)
+    with open(str(testdir.tmpdir.join('results.json'))) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('args', [(), ('-o', 'harvest_xdist_dump_codec=lzma'),
+                                  ('-o', 'harvest_xdist_checkpoint_tests=1'), ('--harvest-xdist-stream',)],
+                         ids=['default', 'lzma', 'checkpoints', 'stream'])
+def test_xdist_harvesters(testdir, args):
+    """The master gathers the results of all workers, with the default (possibly compressed) and streaming harvesters"""
+    gathered = _run_xdist_session(testdir, *args)
+    assert gathered['results'] == [['passed', p ** 2] for p in range(1, 5)]
+    # the streaming harvester does not use the disk
+    assert gathered['harvest_dir_used'] == ('--harvest-xdist-stream' not in args)
+
+
+OTHER_TEST_FILE = """
+def test_xdist_bar(results_bag):
+    results_bag.p_squared = 0
+"""
+
+LAZY_CONFTEST = """
+import json
+import pytest
+from pytest_harvest import get_module_results_dct, get_session_results_dct, is_main_process
+
+LOADED_WORKERS = []
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_harvest_xdist_load():
+    outcome = yield
+    LOADED_WORKERS.append(sorted(outcome.get_result()))
+
+
+def pytest_sessionfinish(session):
+    if is_main_process(session):
+        results = get_module_results_dct(session, 'test_xdist_lazy_load')
+        nb_workers_loaded = len(session._harvest_restored_workers)
+        # a full load then only loads the remaining worker
+        get_session_results_dct(session)
+        with open('results.json', 'w') as f:
+            json.dump({'results': sorted(results), 'nb_workers_loaded': nb_workers_loaded,
+                       'loaded_workers': LOADED_WORKERS}, f)
+"""
+
+
+def test_xdist_lazy_load(testdir):
+    """Only the workers that ran tests in a module are loaded to get its results"""
+    pytest.importorskip('xdist')
+    testdir.makepyfile(TEST_FILE, test_xdist_other=OTHER_TEST_FILE)
+    testdir.makeconftest(LAZY_CONFTEST)
+    # note: with --dist loadfile each module is run by a single worker
+    result = testdir.runpytest_subprocess('-n', '2', '--dist', 'loadfile')
+    result.assert_outcomes(passed=5)
+    with open(str(testdir.tmpdir.join('results.json'))) as f:
+        gathered = json.load(f)
+    assert gathered['results'] == ['test_xdist_foo[%s]' % p for p in range(1, 5)]
+    assert gathered['nb_workers_loaded'] == 1
+    (first_load, ), (second_load, ) = gathered['loaded_workers']
+    assert first_load != second_load
+
+
+CRASH_TEST_FILE = """
+import os
+
+
+def test_xdist_before_crash(results_bag):
+    results_bag.p_squared = 1
+
+
+def test_xdist_crash():
+    os._exit(1)
+
+
+def test_xdist_after_crash(results_bag):
+    results_bag.p_squared = 4
+"""
+
+
+def test_xdist_checkpoints_worker_crash(testdir):
+    """The results checkpointed by a worker before it crashed are gathered, along with the ones of its replacement"""
+    pytest.importorskip('xdist')
+    testdir.makepyfile(CRASH_TEST_FILE)
+    testdir.makeconftest(CONFTEST)
+    result = testdir.runpytest_subprocess('-n', '1', '--max-worker-restart', '1',
+                                          '-o', 'harvest_xdist_checkpoint_tests=1')
+    result.assert_outcomes(passed=2, failed=1)
+    with open(str(testdir.tmpdir.join('results.json'))) as f:
+        gathered = json.load(f)
+    assert gathered['results'] == [['passed', 1], ['passed', 4]]
+
+
+def test_xdist_harvest_dir(testdir):
+    """Each session uses its own subfolder of the harvest folder, and does not remove the ones of other sessions"""
+    other_run_dir = testdir.tmpdir.join('harvest', 'other-run').ensure(dir=True)
+    gathered = _run_xdist_session(testdir, '--harvest-xdist-dir', 'harvest')
+    assert gathered['results'] == [['passed', p ** 2] for p in range(1, 5)]
+    assert not gathered['harvest_dir_used']
+    assert testdir.tmpdir.join('harvest').listdir() == [other_run_dir]
+
+
+@pytest.mark.parametrize('exists', [True, False], ids=['user_dir', 'new_dir'])
+def test_xdist_harvest_dir_removal(testdir, exists):
+    """An empty harvest folder is removed at the end of the session only if it was created by the session"""
+    harvest_dir = testdir.tmpdir.join('harvest')
+    if exists:
+        harvest_dir.ensure(dir=True)
+    gathered = _run_xdist_session(testdir, '--harvest-xdist-dir', 'harvest')
+    assert gathered['results'] == [['passed', p ** 2] for p in range(1, 5)]
+    assert harvest_dir.exists() == exists
+    if exists:
+        assert harvest_dir.listdir() == []
+
+
+OBSERVING_CONFTEST = CONFTEST + """
+
+SESSION = []
+
+
+def pytest_sessionstart(session):
+    SESSION.append(session)
+
+
+def pytest_runtest_logreport(report):
+    # the results are read on the master during the session
+    if report.when == 'teardown' and is_main_process(SESSION[0]):
+        get_session_results_dct(SESSION[0])
+"""
+
+
+def test_xdist_stream_results_read_during_session(testdir):
+    """When the master reads the streamed results during the session, the records received afterwards are added"""
+    pytest.importorskip('xdist')
+    testdir.makepyfile(TEST_FILE)
+    testdir.makeconftest(OBSERVING_CONFTEST)
+    result = testdir.runpytest_subprocess('-n', '2', '--harvest-xdist-stream')
+    result.assert_outcomes(passed=4)
+    with open(str(testdir.tmpdir.join('results.json'))) as f:
+        gathered = json.load(f)
+    assert gathered['results'] == [['passed', p ** 2] for p in range(1, 5)]
+
+
+WORKER_CONFTEST = """
+import json
+
+
+def pytest_sessionfinish(session):
+    workerinput = getattr(session.config, 'workerinput', None)
+    if workerinput is not None:
+        # the number of records still kept in the teardown reports of the items run on this worker
+        nb_records = sum(hasattr(getattr(item, 'harvest_rep_teardown', None), 'harvest_record')
+                         for item in session.items)
+        with open('records_%s.json' % workerinput['workerid'], 'w') as f:
+            json.dump(nb_records, f)
+"""
+
+
+def test_xdist_stream_records_not_kept(testdir):
+    """The records sent to the master are not kept in the reports of the worker items"""
+    pytest.importorskip('xdist')
+    testdir.makepyfile(TEST_FILE)
+    testdir.makeconftest(WORKER_CONFTEST)
+    result = testdir.runpytest_subprocess('-n', '2', '--harvest-xdist-stream')
+    result.assert_outcomes(passed=4)
+    records_files = testdir.tmpdir.listdir('records_*.json')
+    assert len(records_files) == 2
+    for records_file in records_files:
+        with open(str(records_file)) as f:
+            assert json.load(f) == 0
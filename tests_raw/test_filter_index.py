@@ -0,0 +1,33 @@
+# META
+# {'passed': 9, 'skipped': 0, 'failed': 0}
+# END META
+import pytest
+
+from pytest_harvest import filter_session_items, pytest_item_matches_filter, get_session_items_index
+
+
+@pytest.mark.parametrize('p', [1, 2])
+def test_foo(p):
+    pass
+
+
+class TestX:
+    def test_easy(self):
+        pass
+
+
+def doctestable():
+    """
+    >>> 1 + 1
+    2
+    """
+
+
+@pytest.mark.parametrize('flt', [test_foo, TestX.test_easy, __name__, (test_foo, TestX.test_easy), 'unknown_module'],
+                         ids=str)
+def test_filter_index(request, flt):
+    """The indexed filter returns the same items, in the same order, as the item-by-item filter"""
+    ref = tuple(item for item in request.session.items if pytest_item_matches_filter(item, flt))
+    assert filter_session_items(request.session, flt) == ref
+    # the index was built at collection time and is still valid
+    assert get_session_items_index(request.session).items is request.session.items
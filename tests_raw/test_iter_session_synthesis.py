@@ -0,0 +1,26 @@
+# META
+# {'passed': 4, 'skipped': 0, 'failed': 0}
+# END META
+from types import GeneratorType
+
+import pytest
+
+from pytest_harvest import get_session_synthesis_dct, iter_session_synthesis
+
+
+@pytest.mark.parametrize('p', [1, 2], ids=str)
+def test_gen_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+
+
+@pytest.mark.parametrize('flatten', [False, True], ids="flatten={}".format)
+def test_iter_session_synthesis(request, fixture_store, flatten):
+    """The generator yields the same rows than get_session_synthesis_dct, lazily"""
+    kw = dict(status_details=True, filter=test_gen_foo, fixture_store=fixture_store, flatten=flatten,
+              flatten_more='results_bag')
+    rows_gen = iter_session_synthesis(request.session, **kw)
+    assert isinstance(rows_gen, GeneratorType)
+
+    rows = list(rows_gen)
+    assert [test_id for test_id, _ in rows] == [item.nodeid for item in request.session.items][:2]
+    assert rows == list(get_session_synthesis_dct(request.session, **kw).items())
@@ -0,0 +1,58 @@
+# META
+# {'passed': 6, 'skipped': 0, 'failed': 0}
+# END META
+import pytest
+
+from pytest_harvest import get_module_results_cache, get_module_results_dct
+
+
+@pytest.mark.parametrize('p', [1, 2], ids=str)
+def test_modcache_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+
+
+def test_modcache_is_filled(request, module_results_dct):
+    """The results of this module are now in the cache"""
+    assert list(module_results_dct) == ['test_modcache_foo[1]', 'test_modcache_foo[2]']
+
+    # modifying the returned dictionary does not modify the cache
+    module_results_dct['test_modcache_foo[1]']['fixtures']['results_bag'] = None
+    del module_results_dct['test_modcache_foo[2]']
+
+    cache = get_module_results_cache(request.session)
+    assert list(cache._results) == [__name__]
+
+
+def test_modcache_is_invalidated(request, module_results_dct):
+    """The previous test now appears, and the cached results were not modified"""
+    assert len(module_results_dct) == 3
+    assert module_results_dct['test_modcache_foo[1]']['fixtures']['results_bag'] == {'p_squared': 1}
+
+    # other modules do not invalidate the results of this module
+    cache = get_module_results_cache(request.session)
+    cache.invalidate_module('some_other_module')
+    assert __name__ in cache._results
+
+
+def test_modcache_store_modified_out_of_band(request, fixture_store):
+    """Entries added directly in the store for an item of the module are taken into account"""
+    results_dct = get_module_results_dct(request.session, __name__)
+    assert 'hello' not in results_dct['test_modcache_foo[1]']['fixtures']
+
+    foo_1_id = [item.nodeid for item in request.session.items if item.name == 'test_modcache_foo[1]'][0]
+    fixture_store['hello'] = {foo_1_id: 'world'}
+    results_dct = get_module_results_dct(request.session, __name__)
+    assert results_dct['test_modcache_foo[1]']['fixtures']['hello'] == 'world'
+    del fixture_store['hello']
+
+
+def test_modcache_fixture_stores(request):
+    """Results obtained with different fixture stores are cached separately"""
+    foo_1_id = [item.nodeid for item in request.session.items if item.name == 'test_modcache_foo[1]'][0]
+    store_a = {'a': {foo_1_id: 1}}
+    store_b = {'b': {foo_1_id: 2}}
+    results_a = get_module_results_dct(request.session, __name__, fixture_store=store_a)
+    results_b = get_module_results_dct(request.session, __name__, fixture_store=store_b)
+    assert results_a['test_modcache_foo[1]']['fixtures'] == {'a': 1}
+    assert results_b['test_modcache_foo[1]']['fixtures'] == {'b': 2}
+    assert get_module_results_dct(request.session, __name__, fixture_store=store_a) == results_a
@@ -0,0 +1,49 @@
+# META
+# {'passed': 10, 'skipped': 0, 'failed': 0}
+# END META
+import pytest
+
+from pytest_harvest import get_params_indexed_results_df
+
+
+@pytest.fixture(params=['A', 'B'])
+def dataset(request):
+    return request.param
+
+
+@pytest.mark.parametrize('algo_param', [1, 2, 3], ids=str)
+def test_grid_bench(algo_param, dataset, results_bag):
+    results_bag.accuracy = algo_param / 10
+
+
+def test_grid_other(results_bag):
+    results_bag.accuracy = 0.
+
+
+def test_params_indexed_df(request):
+    """The results are indexed by function name and parameters, and can be pivoted directly"""
+    df = get_params_indexed_results_df(request, filter=[test_grid_bench, test_grid_other])
+    assert [i[0] for i in df.index] == ['test_grid_bench'] * 6 + ['test_grid_other']
+    df = get_params_indexed_results_df(request, filter=[test_grid_bench, test_grid_other], sort=True)
+    assert df.index.names == ['function', 'algo_param', 'dataset_param']
+    assert list(df.columns[:3]) == ['test_id', 'pytest_obj', 'status']
+    assert len(df) == 7
+
+    # levels are categorical (only the codes are stored)
+    assert list(df.index.levels[1]) == [1, 2, 3]
+    assert list(df.index.levels[2]) == ['A', 'B']
+
+    # the test without parameters has missing values in the param levels
+    assert df.loc['test_grid_other', 'accuracy'].tolist() == [0.]
+
+    # pivot
+    grid = df.loc['test_grid_bench', 'accuracy'].unstack('dataset_param')
+    assert list(grid.columns) == ['A', 'B']
+    assert grid.loc[2, 'B'] == 0.2
+
+
+@pytest.mark.parametrize('mode', ['x', 'y'])
+def test_params_indexed_df_incomplete(request, mode):
+    """The parameters of incomplete tests (here, the current test) are not in the index"""
+    df = get_params_indexed_results_df(request, filter=[test_grid_bench, test_params_indexed_df_incomplete])
+    assert df.index.names == ['function', 'algo_param', 'dataset_param'] + (['mode'] if mode == 'y' else [])
@@ -0,0 +1,47 @@
+# META
+# {'passed': 4, 'skipped': 0, 'failed': 0}
+# END META
+import pytest
+
+from pytest_harvest import get_session_synthesis_dct, get_all_pytest_param_names, get_all_pytest_fixture_names, \
+    get_pytest_params
+
+
+@pytest.fixture(params=[1, 2])
+def a(request):
+    return request.param
+
+
+@pytest.mark.parametrize('p', ['x'])
+def test_foo(p, a):
+    pass
+
+
+def test_memoized_resolution(request, monkeypatch):
+    """Fixture names and parameters are resolved once per item, the fixture manager is not used anymore after that"""
+    assert get_all_pytest_param_names(request.session, filter=test_foo) == ['p', 'a_param']
+    assert get_all_pytest_fixture_names(request.session, filter=test_foo) == ['a']
+    synth_dct = get_session_synthesis_dct(request.session, filter=test_foo, flatten=True)
+
+    calls = []
+    fixturemanager = request.session._fixturemanager
+    orig_getfixturedefs = fixturemanager.getfixturedefs
+
+    def getfixturedefs(*args, **kwargs):
+        calls.append(args)
+        return orig_getfixturedefs(*args, **kwargs)
+
+    monkeypatch.setattr(fixturemanager, 'getfixturedefs', getfixturedefs)
+
+    assert get_session_synthesis_dct(request.session, filter=test_foo, flatten=True) == synth_dct
+    assert get_all_pytest_param_names(request.session, filter=test_foo) == ['p', 'a_param']
+    assert get_all_pytest_fixture_names(request.session, filter=test_foo) == ['a']
+    assert len(calls) == 0
+
+
+def test_returned_params_are_copies(request):
+    """Users modifying the returned parameters do not modify the memoized ones"""
+    item = [item for item in request.session.items if item.name.startswith('test_foo')][0]
+    params = get_pytest_params(item)
+    params['p'] = 'y'
+    assert get_pytest_params(item) == {'p': 'x', 'a_param': 1}
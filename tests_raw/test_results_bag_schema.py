@@ -0,0 +1,36 @@
+# META
+# {'passed': 4, 'skipped': 0, 'failed': 0}
+# END META
+from collections import OrderedDict
+
+import pytest
+
+from pytest_harvest import create_results_bag_fixture, get_filtered_results_df, TypedResultsBag
+
+
+# a store in a global variable
+STORE = OrderedDict()
+
+typed_bag = create_results_bag_fixture(STORE, name='typed_bag', schema={'accuracy': float, 'nb_iter': int})
+
+
+@pytest.mark.parametrize('p', [1, 2, 3], ids=str)
+def test_typed_foo(p, typed_bag):
+    assert isinstance(typed_bag, TypedResultsBag)
+    typed_bag.accuracy = 1  # coerced to float
+    if p < 3:
+        typed_bag.nb_iter = p * 10
+    typed_bag.other = 'hello'
+    with pytest.raises(TypeError):
+        typed_bag.nb_iter = 'hello'
+
+
+def test_typed_synthesis(request):
+    """The columns declared in the schema have a native dtype, even when some values are missing"""
+    results_df = get_filtered_results_df(request.session, filter=test_typed_foo, fixture_store=STORE,
+                                         results_bag_fixture_name='typed_bag')
+    assert list(results_df['accuracy']) == [1., 1., 1.]
+    assert str(results_df['accuracy'].dtype) == 'float64'
+    assert str(results_df['nb_iter'].dtype) == 'Int64'
+    assert list(results_df['nb_iter'].isna()) == [False, False, True]
+    assert results_df['nb_iter'].sum() == 30
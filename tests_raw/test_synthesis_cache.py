@@ -0,0 +1,73 @@
+# META
+# {'passed': 6, 'skipped': 0, 'failed': 0}
+# END META
+import gc
+from collections import OrderedDict
+
+import pytest
+
+from pytest_harvest import get_session_synthesis_dct, get_synthesis_cache
+
+
+@pytest.mark.parametrize('p', [1, 2], ids=str)
+def test_foo(p, results_bag):
+    results_bag.p_squared = p ** 2
+
+
+def test_cache_is_filled(request, session_results_dct):
+    """The rows of the completed nodes are now in the cache"""
+    assert [v['status'] for v in session_results_dct.values()] == ['passed', 'passed']
+
+    # modifying the returned dictionary does not modify the cache
+    first_id = list(session_results_dct)[0]
+    session_results_dct[first_id]['fixtures']['results_bag'] = None
+    session_results_dct[first_id]['params']['p'] = -1
+    del session_results_dct[first_id]
+
+    cache = get_synthesis_cache(request.session)
+    assert sum(len(rows) for rows in cache._rows.values()) == 2
+
+
+def test_cache_is_invalidated(request, session_results_dct):
+    """The previous test now appears, and the rows from the cache were not modified"""
+    assert len(session_results_dct) == 3
+    first_row = list(session_results_dct.values())[0]
+    assert first_row['fixtures']['results_bag'] == {'p_squared': 1}
+    assert first_row['params'] == {'p': 1}
+
+
+def test_cache_store_modified_out_of_band(request, fixture_store):
+    """Entries added directly in the store for an already cached node are taken into account"""
+    kw = dict(test_id_format='function', fixture_store=fixture_store, flatten=True, use_cache=True)
+    synth_dct = get_session_synthesis_dct(request.session, **kw)
+    assert 'hello' not in synth_dct['test_foo[1]']
+
+    foo_1_id = [item.nodeid for item in request.session.items if item.name == 'test_foo[1]'][0]
+    fixture_store['hello'] = {foo_1_id: 'world'}
+
+    synth_dct = get_session_synthesis_dct(request.session, **kw)
+    assert synth_dct['test_foo[1]']['hello'] == 'world'
+    assert 'hello' not in synth_dct['test_foo[2]']
+
+    # the cached results are identical to the non-cached ones
+    kw['use_cache'] = False
+    assert get_session_synthesis_dct(request.session, **kw) == synth_dct
+    del fixture_store['hello']
+
+
+def test_cache_released_with_key_objects(request):
+    """The rows cached for a custom formatter or a temporary store are released when they are garbage-collected"""
+    cache = get_synthesis_cache(request.session)
+    get_session_synthesis_dct(request.session, use_cache=True)
+    nb_keys = len(cache._rows)
+
+    get_session_synthesis_dct(request.session, test_id_format=lambda test_id: test_id.upper(),
+                              fixture_store=OrderedDict(), use_cache=True)
+    assert len(cache._rows) == nb_keys + 1
+    gc.collect()
+    get_session_synthesis_dct(request.session, use_cache=True)
+    assert len(cache._rows) == nb_keys
+
+    # a plain dict can not be weakly referenced: its rows are not cached
+    get_session_synthesis_dct(request.session, fixture_store=dict(), use_cache=True)
+    assert len(cache._rows) == nb_keys
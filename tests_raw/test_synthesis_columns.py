@@ -0,0 +1,71 @@
+# META
+# {'passed': 7, 'skipped': 0, 'failed': 0}
+# END META
+import pytest
+
+from pytest_harvest import get_session_synthesis_dct, get_session_synthesis_columns, get_session_results_df
+
+
+@pytest.mark.parametrize('q', ['x'])
+@pytest.mark.parametrize('p', [1, 2], ids=str)
+def test_col_foo(p, q, results_bag):
+    results_bag.p_squared = p ** 2
+
+
+def test_col_bar(results_bag):
+    results_bag.name = 'bar'
+
+
+def test_synthesis_columns(request, fixture_store):
+    """The columnar synthesis contains the same information than the flattened synthesis dictionary"""
+    kw = dict(status_details=True, filter=[test_col_foo, test_col_bar], fixture_store=fixture_store,
+              flatten_more='results_bag')
+    columns = get_session_synthesis_columns(request.session, **kw)
+    synth_dct = get_session_synthesis_dct(request.session, flatten=True, **kw)
+
+    assert list(columns)[0] == 'test_id'
+    assert columns['test_id'] == list(synth_dct)
+    assert list(columns)[1:] == ['pytest_obj', 'status', 'duration_s', 'status__setup', 'status__call',
+                                 'status__teardown', 'p', 'q', 'p_squared', 'name']
+    assert columns['p_squared'] == [1, 4, None]
+    assert columns['name'] == [None, None, 'bar']
+    for i, row in enumerate(synth_dct.values()):
+        assert {k: col[i] for k, col in columns.items() if col[i] is not None and k != 'test_id'} == row
+
+
+def test_synthesis_columns_duplicate_ids(request):
+    """When test ids are identical, the last row is kept at the first position, as in the synthesis dictionary"""
+    kw = dict(filter=[test_col_foo, test_col_bar], test_id_format=lambda test_id: test_id.split('[')[0])
+    columns = get_session_synthesis_columns(request.session, **kw)
+    synth_dct = get_session_synthesis_dct(request.session, flatten=True, **kw)
+    assert columns['test_id'] == list(synth_dct) == [k for k in synth_dct]
+    assert columns['p'] == [2, None]
+
+
+def test_synthesis_columns_cache(request, fixture_store):
+    """The columns are the same whether rows are computed, stored in the synthesis cache, or read from it"""
+    kw = dict(filter=[test_col_foo, test_col_bar], fixture_store=fixture_store, flatten_more='results_bag')
+    columns = get_session_synthesis_columns(request.session, **kw)
+    assert get_session_synthesis_columns(request.session, use_cache=True, **kw) == columns
+    assert get_session_synthesis_columns(request.session, use_cache=True, **kw) == columns
+
+
+def test_results_df(request):
+    """The dataframe built from the columns has the same contents as before, with better dtypes"""
+    import pandas as pd
+
+    df = get_session_results_df(request)
+    synth_dct = get_session_synthesis_dct(request.session, durations_in_ms=True, status_details=False,
+                                          fixture_store=request.getfixturevalue('fixture_store'), flatten=True,
+                                          flatten_more='results_bag')
+    ref_df = pd.DataFrame.from_dict(synth_dct, orient='index')
+    ref_df = ref_df.loc[list(synth_dct.keys()), :]
+    ref_df.index.name = 'test_id'
+    pd.testing.assert_frame_equal(df, ref_df, check_dtype=False, check_categorical=False)
+
+    # status and repeated non-numeric parameters are categorical, numeric columns are numeric
+    assert isinstance(df['status'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['q'].dtype, pd.CategoricalDtype)
+    assert df['p'].dtype == float
+    assert df['p_squared'].dtype == float
+    assert df['duration_ms'].dtype == float